@@ -2,93 +2,186 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from database import get_db
 from dependencies import get_current_user
-from models import User
-import random
+from models import User, HealthProfile, FoodItem
+from rollups import NUTRIENTS, user_daily_nutrition
 from datetime import datetime, timedelta
+import json
 
 router = APIRouter(
     prefix="/api/analytics",
     tags=["analytics"]
 )
 
+# Daily reference limits used by every chart on health-analytics.html
+LIMITS = {
+    "calories": 2000,
+    "sugar": 50,
+    "sodium": 2300,
+    "protein": 60,
+    "carbs": 250,
+    "fat": 70
+}
+
+# (condition, nutrient, True if the risk comes from too much of it)
+RISK_MARKERS = [
+    ("Diabetes", "sugar", True),
+    ("Hypertension", "sodium", True),
+    ("Obesity", "calories", True),
+    ("Anemia", "protein", False),
+]
+
+
+def _daily_series(db: Session, user_id: int, days: int):
+    """One entry per day (oldest first) from the per-user daily nutrition table.
+
+    Dates are UTC, matching Order.created_at. Days without orders are zero.
+    """
+    today = datetime.utcnow().date()
+    start = today - timedelta(days=days - 1)
+    rows = user_daily_nutrition(db, user_id, start.isoformat(), today.isoformat())
+
+    series = []
+    for i in range(days):
+        d = start + timedelta(days=i)
+        row = rows.get(d.isoformat())
+        entry = {"day": d.isoformat(), "day_name": d.strftime("%a"), "orders": row.orders if row else 0}
+        for n in NUTRIENTS:
+            entry[n] = round(getattr(row, n) or 0, 1) if row else 0
+        series.append(entry)
+    return series
+
+
+def _average(series, nutrient):
+    return sum(d[nutrient] for d in series) / len(series) if series else 0
+
+
+def _user_conditions(db: Session, user_id: int):
+    profile = db.query(HealthProfile).filter(HealthProfile.user_id == user_id).first()
+    if not profile or not profile.disease:
+        return set()
+    try:
+        return {d.title() for d in json.loads(profile.disease)}
+    except (json.JSONDecodeError, TypeError, AttributeError):
+        return set()
+
+
+def _day_score(day):
+    """0-100 score for a single day: points lost for every % over a limit."""
+    over = 0
+    for n in ("sugar", "sodium", "calories"):
+        over += max(0, day[n] / LIMITS[n] - 1) * 50
+    return max(0, min(100, round(100 - over)))
+
+
 @router.get("/nutrition")
-async def get_nutrition_analytics(
-    days: int = Query(7),
+def get_nutrition_analytics(
+    days: int = Query(7, ge=1, le=366),
+    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    # Generates mock nutrition data based on days
-    daily_data = []
-    base_date = datetime.now()
-    
-    for i in range(days):
-        date = base_date - timedelta(days=days-1-i)
-        daily_data.append({
-            "day": date.strftime("%Y-%m-%d"),
-            "day_name": date.strftime("%a"),
-            "calories": random.randint(1800, 2400),
-            "protein": random.randint(50, 100),
-            "carbs": random.randint(200, 300),
-            "fat": random.randint(40, 80),
-            "sugar": random.randint(30, 60),
-            "sodium": random.randint(1500, 2500)
-        })
-    
+    daily_data = _daily_series(db, current_user.id, days)
+
+    # Share of energy from each macro (4/4/9 kcal per gram)
+    kcal = {
+        "protein": sum(d["protein"] for d in daily_data) * 4,
+        "carbs": sum(d["carbs"] for d in daily_data) * 4,
+        "fat": sum(d["fat"] for d in daily_data) * 9,
+    }
+    total_kcal = sum(kcal.values())
+    macro_distribution = {
+        k: round(v / total_kcal * 100) if total_kcal else 0 for k, v in kcal.items()
+    }
+
     return {
         "daily_data": daily_data,
-        "limits": {
-            "calories": 2000,
-            "sugar": 50,
-            "sodium": 2300,
-            "protein": 60,
-            "carbs": 250,
-            "fat": 70
-        },
-        "macro_distribution": {
-            "protein": 25,
-            "carbs": 50,
-            "fat": 25
-        }
+        "limits": LIMITS,
+        "macro_distribution": macro_distribution
     }
 
 @router.get("/risk")
-async def get_health_risks(current_user: User = Depends(get_current_user)):
-    return [
-        {"name": "Diabetes", "risk_score": 12, "trend": "down", "message": "Improving thanks to low sugar choices."},
-        {"name": "Hypertension", "risk_score": 45, "trend": "up", "message": "Sodium intake high this week."},
-        {"name": "Obesity", "risk_score": 28, "trend": "stable", "message": "Calorie intake matching burn rate."},
-        {"name": "Anemia", "risk_score": 5, "trend": "down", "message": "Iron-rich foods added to diet."}
-    ]
+def get_health_risks(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    series = _daily_series(db, current_user.id, 14)
+    last_week, this_week = series[:7], series[7:]
+    has_data = any(d["orders"] for d in series)
+    conditions = _user_conditions(db, current_user.id)
+
+    risks = []
+    for name, nutrient, excess in RISK_MARKERS:
+        now, before = _average(this_week, nutrient), _average(last_week, nutrient)
+        ratio = now / LIMITS[nutrient]
+        score = 0
+        if has_data:
+            score = round(min(ratio, 2) * 40) if excess else round(max(0, 1 - ratio) * 40)
+        if name in conditions:
+            score += 20
+
+        if before and now > before * 1.05:
+            trend = "up" if excess else "down"
+        elif before and now < before * 0.95:
+            trend = "down" if excess else "up"
+        else:
+            trend = "stable"
+
+        pct = round(ratio * 100)
+        if not has_data:
+            message = "No canteen orders in the last two weeks."
+        elif excess:
+            message = f"Average {nutrient} intake is {pct}% of your daily limit this week."
+        else:
+            message = f"Average {nutrient} intake covers {pct}% of your daily target this week."
+
+        risks.append({"name": name, "risk_score": min(score, 100), "trend": trend, "message": message})
+    return risks
 
 @router.get("/prediction")
-async def get_health_predictions(current_user: User = Depends(get_current_user)):
-    return [
-        {
-            "id": "PRED-001",
+def get_health_predictions(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    week = _daily_series(db, current_user.id, 7)
+    predictions = []
+
+    # Project this week's daily average onto the weekly limit
+    for nutrient, label, column in (("sodium", "Sodium", FoodItem.sodium), ("sugar", "Sugar", FoodItem.sugar), ("calories", "Calorie", FoodItem.calories)):
+        projected = round(_average(week, nutrient) / LIMITS[nutrient] * 100)
+        if projected <= 100:
+            continue
+        alternative = db.query(FoodItem.name).filter(FoodItem.is_available == True).order_by(column.asc()).first()
+        predictions.append({
+            "id": f"PRED-{len(predictions) + 1:03d}",
             "type": "warning",
-            "title": "Sodium Overload Warning",
-            "description": "At current rate, you will exceed your weekly sodium limit by 35%. This may increase blood pressure.",
-            "suggestion": "Switch your afternoon Ramen for a Fresh Salad.",
-            "intensity": 75
-        },
-        {
-            "id": "PRED-002",
+            "title": f"{label} Overload Warning",
+            "description": f"At current rate, you will exceed your weekly {nutrient} limit by {projected - 100}%.",
+            "suggestion": f"Try the {alternative[0]} for your next meal." if alternative else "Choose lighter options for your next meals.",
+            "intensity": min(projected, 100)
+        })
+
+    if not predictions:
+        predictions.append({
+            "id": "PRED-001",
             "type": "success",
-            "title": "Fiber Goal on Track",
-            "description": "Consistent intake of Quinoa and Vegetables has stabilized your glucose levels.",
+            "title": "Intake Within Limits",
+            "description": "Your sugar, sodium and calorie intake this week is on track to stay within your weekly limits.",
             "suggestion": "Keep up the great work!",
             "intensity": 90
-        }
-    ]
+        })
+    return predictions
 
 @router.get("/timeline")
-async def get_health_timeline(current_user: User = Depends(get_current_user)):
-    base_date = datetime.now()
+def get_health_timeline(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    series = _daily_series(db, current_user.id, 20)
     timeline = []
-    for i in range(10):
-        date = base_date - timedelta(days=i*2)
+    for day in series[1::2]:   # every second day, ending today
+        if not day["orders"]:
+            event = "No Canteen Orders"
+        elif day["sodium"] > LIMITS["sodium"]:
+            event = "High Sodium Day"
+        elif day["sugar"] > LIMITS["sugar"]:
+            event = "High Sugar Day"
+        elif day["calories"] > LIMITS["calories"]:
+            event = "Calorie Surplus"
+        else:
+            event = "Optimal Nutrition"
         timeline.append({
-            "date": date.strftime("%b %d"),
-            "score": random.randint(75, 95),
-            "event": "Profile Updated" if i == 9 else ("High Sodium Day" if i % 3 == 0 else "Optimal Nutrition")
+            "date": datetime.strptime(day["day"], "%Y-%m-%d").strftime("%b %d"),
+            "score": _day_score(day),
+            "event": event
         })
-    return timeline[::-1]
+    return timeline
@@ -3,145 +3,204 @@ HealthBite Smart Canteen - Main Application Entry Point
 ========================================================
 FastAPI backend server that powers the Smart Canteen system.
 Serves both the API endpoints and the frontend static files.
-"""
-
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from database import engine, Base
-import models  # MUST import models before create_all so all tables are registered
-import os
-
-# Create all database tables
-Base.metadata.create_all(bind=engine)
-
-# Initialize FastAPI application
-app = FastAPI(
-    title="HealthBite Smart Canteen",
-    description="AI-Powered Health-Aware Canteen System",
-    version="2.0.0"
-)
-
-# CORS Middleware - Allow all origins for development
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# --- Import and Register Routers ---
-from auth import router as auth_router
-import health
-import menu
-from chatbot import router as chatbot_router
-from analytics import router as analytics_router
-from routes import (
-    admin_dashboard,
-    admin_foods,
-    admin_inventory,
-    admin_orders,
-    admin_users,
-    admin_analytics_routes,
-    admin_ai,
-    admin_reports,
-    admin_audit,
-)
-
-app.include_router(auth_router)
-app.include_router(health.router)
-app.include_router(menu.router)
-app.include_router(chatbot_router)
-app.include_router(analytics_router)
-
-# Admin routes
-app.include_router(admin_dashboard.router)
-app.include_router(admin_foods.router)
-app.include_router(admin_inventory.router)
-app.include_router(admin_orders.router)
-app.include_router(admin_users.router)
-app.include_router(admin_analytics_routes.router)
-app.include_router(admin_ai.router)
-app.include_router(admin_reports.router)
-app.include_router(admin_audit.router)
-
-# Print all registered routes for debugging
-print("\n--- REGISTERED ROUTES ---")
-for route in app.routes:
-    if hasattr(route, "path"):
-        print(f"{route.path} [{', '.join(route.methods) if hasattr(route, 'methods') else 'N/A'}]")
-print("------------------------\n")
-
-# --- Serve Frontend Static Files ---
-FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend")
-
-# Mount static files (CSS, JS, images, etc.)
-app.mount("/frontend", StaticFiles(directory=FRONTEND_DIR), name="frontend")
 
+create_app() builds the application. Importing this module does no work:
+`app` is built on first access, so `uvicorn app:app` and `from app import app`
+keep working. Everything that touches the database or the disk runs in the
+lifespan startup hook, before the server reports ready:
 
-@app.get("/")
-async def serve_index():
-    """Serve the main login/landing page"""
-    return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
+- prepare_database(): tables, new columns, indexes and one-off data fixes (PREPARE_DB=0
+  skips it, e.g. in serve.py workers whose master already ran it)
+- the frontend asset store (read, hashed and precompressed)
+- menu image pregeneration (background thread)
+- warmup.run() when WARMUP=1
 
+Routers are imported inside create_app(). Forgot-password email (utils.py,
+fastapi_mail) is imported on its first use.
 
-@app.get("/{filename}.html")
-async def serve_html(filename: str):
-    """Serve any HTML page from the frontend directory"""
-    filepath = os.path.join(FRONTEND_DIR, f"{filename}.html")
-    if os.path.exists(filepath):
-        return FileResponse(filepath)
-    return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
-
-
-@app.get("/{filename}.css")
-async def serve_css(filename: str):
-    """Serve CSS files"""
-    filepath = os.path.join(FRONTEND_DIR, f"{filename}.css")
-    if os.path.exists(filepath):
-        return FileResponse(filepath, media_type="text/css")
-
+    python scripts/bench_startup.py    # import time and time-to-first-request
+"""
 
-@app.get("/{filename}.js")
-async def serve_js(filename: str):
-    """Serve JavaScript files"""
-    filepath = os.path.join(FRONTEND_DIR, f"{filename}.js")
-    if os.path.exists(filepath):
-        return FileResponse(filepath, media_type="application/javascript")
+import logging
+import os
+from contextlib import asynccontextmanager
 
+logger = logging.getLogger("app")
 
-@app.get("/images/{filename}")
-async def serve_image(filename: str):
-    """Serve image files"""
-    filepath = os.path.join(FRONTEND_DIR, "images", filename)
-    if os.path.exists(filepath):
-        return FileResponse(filepath)
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend")
 
 
-@app.get("/{full_path:path}")
-async def serve_nested(full_path: str):
-    """Catch-all: serve any file from the frontend directory (supports nested paths)"""
-    filepath = os.path.join(FRONTEND_DIR, full_path)
-    if os.path.exists(filepath) and os.path.isfile(filepath):
-        # Determine media type
-        if filepath.endswith(".css"):
-            return FileResponse(filepath, media_type="text/css")
-        elif filepath.endswith(".js"):
-            return FileResponse(filepath, media_type="application/javascript")
-        elif filepath.endswith(".html"):
-            return FileResponse(filepath, media_type="text/html")
-        return FileResponse(filepath)
-    # Fallback to index
-    return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
+def prepare_database():
+    """Create missing tables, columns and indexes and run the one-off data fixes (idempotent)."""
+    from database import engine, Base, SessionLocal, add_missing_columns, create_missing_indexes
+    import models  # noqa: F401  (MUST import models before create_all so all tables are registered)
+    import daily_logs
+    import rollups
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    db = SessionLocal()
+    try:
+        # Duplicate daily logs would block the unique (user_id, date) index
+        daily_logs.merge_duplicates(db)
+        create_missing_indexes()
+        # Populate the sales rollup for databases created before it existed
+        rollups.backfill_if_empty(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    from starlette.concurrency import run_in_threadpool
+    import image_service
+    import warmup
+
+    if os.environ.get("PREPARE_DB", "1") == "1":
+        await run_in_threadpool(prepare_database)
+    # Read, hash and precompress the whole frontend before the first visitor
+    await run_in_threadpool(app.state.frontend_assets.ensure_built)
+    # Build the menu-card image sizes without delaying startup
+    image_service.pregenerate_in_background()
+    # The server reports this worker ready only after startup returns (serve.py sets WARMUP=1)
+    if warmup.ENABLED:
+        await run_in_threadpool(warmup.run)
+    yield
+
+
+def create_app():
+    """Build the FastAPI application: middleware, routers and frontend routes."""
+    import log_config
+
+    # Route all logging through the background JSON writer before anything logs
+    log_config.configure()
+
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.responses import PlainTextResponse
+    from fastapi.middleware.cors import CORSMiddleware
+    from static_assets import StaticAssets
+    from json_response import FastJSONResponse
+    from database import engine
+    import image_service
+    import cache
+    import metrics
+    import query_stats
+    import profiler
+
+    # Initialize FastAPI application
+    app = FastAPI(
+        title="HealthBite Smart Canteen",
+        description="AI-Powered Health-Aware Canteen System",
+        version="2.0.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan
+    )
+
+    # CORS Middleware - Allow all origins for development
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Per-route latency / status / DB-time metrics, served on /metrics
+    app.add_middleware(metrics.MetricsMiddleware)
+    query_stats.instrument(engine)
+    # Admin-armed sampling profiler; a single global check per request when disarmed
+    app.add_middleware(profiler.ProfilerMiddleware)
+    # Outermost: every log line written while serving a request carries its id
+    app.add_middleware(log_config.RequestIdMiddleware)
+
+    # --- Import and Register Routers ---
+    from auth import router as auth_router
+    import health
+    import menu
+    from chatbot import router as chatbot_router
+    from analytics import router as analytics_router
+    import me
+    from routes import (
+        admin_dashboard,
+        admin_foods,
+        admin_inventory,
+        admin_orders,
+        admin_users,
+        admin_analytics_routes,
+        admin_ai,
+        admin_reports,
+        admin_audit,
+        admin_performance,
+    )
+
+    app.include_router(auth_router)
+    app.include_router(health.router)
+    app.include_router(menu.router)
+    app.include_router(chatbot_router)
+    app.include_router(analytics_router)
+    app.include_router(me.router)
+
+    # Admin routes
+    app.include_router(admin_dashboard.router)
+    app.include_router(admin_foods.router)
+    app.include_router(admin_inventory.router)
+    app.include_router(admin_orders.router)
+    app.include_router(admin_users.router)
+    app.include_router(admin_analytics_routes.router)
+    app.include_router(admin_ai.router)
+    app.include_router(admin_reports.router)
+    app.include_router(admin_audit.router)
+    app.include_router(admin_performance.router)
+
+    # --- Serve Frontend Static Files ---
+    # Loaded by the startup hook; without one (a bare ASGI transport) on the first request
+    frontend_assets = app.state.frontend_assets = StaticAssets(FRONTEND_DIR, exclude=("images/",), preload=False)
+
+    @app.get("/")
+    async def serve_index(request: Request):
+        """Serve the main login/landing page"""
+        return frontend_assets.response(request, "index.html")
+
+    @app.get("/metrics", include_in_schema=False)
+    def serve_metrics(request: Request):
+        """Prometheus scrape endpoint; set METRICS_TOKEN to require a bearer token"""
+        token = os.environ.get("METRICS_TOKEN")
+        if token and request.headers.get("authorization") != f"Bearer {token}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return PlainTextResponse(metrics.registry.render() + cache.render(), media_type="text/plain; version=0.0.4")
+
+    @app.get("/images/{filename}")
+    @app.get("/frontend/images/{filename}")
+    def serve_image(filename: str, request: Request, w: int = None):
+        """Serve a menu image, resized to ?w= and encoded as AVIF/WebP when accepted"""
+        return image_service.serve(request, filename, w)
+
+    @app.get("/{full_path:path}")
+    async def serve_frontend(full_path: str, request: Request):
+        """Serve any frontend file (supports nested and content-hashed paths); unknown paths get index.html"""
+        return frontend_assets.response(request, full_path)
+
+    # Registered routes, for debugging (LOG_LEVELS=app=DEBUG)
+    if logger.isEnabledFor(logging.DEBUG):
+        for route in app.routes:
+            if hasattr(route, "path"):
+                logger.debug("route %s [%s]", route.path, ", ".join(sorted(getattr(route, "methods", None) or ())) or "N/A")
+
+    return app
+
+
+def __getattr__(name):
+    # `from app import app` / `uvicorn app:app`: build the application once, on first access
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- Start Server ---
 if __name__ == "__main__":
     import uvicorn
-    print("=" * 50)
-    print("  HEALTHBITE SMART CANTEEN SERVER")
-    print("  Starting on http://0.0.0.0:8000")
-    print("=" * 50)
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    application = create_app()
+    logger.info("HealthBite Smart Canteen server starting on http://0.0.0.0:8000")
+    # log_config=None keeps uvicorn on the queue-backed handlers configured above
+    uvicorn.run(application, host="0.0.0.0", port=8000, log_config=None)
@@ -0,0 +1,16 @@
+"""Micro-benchmarks for backend hot functions, with JSON baselines.
+
+Run from the backend directory:
+
+    python -m benchmarks run                        # all cases, print a table
+    python -m benchmarks run -k chatbot --quick     # subset, fewer repeats
+    python -m benchmarks run --save main            # also write baselines/main.json
+    python -m benchmarks compare main               # run now, compare with baselines/main.json
+    python -m benchmarks compare main feature.json  # compare two saved runs
+
+compare exits with status 1 when any case's median got slower than the
+baseline by more than --threshold percent (default 10). Baselines are only
+comparable on the same machine and Python version; both are recorded in the
+file. Cases live in benchmarks/cases.py, the timing harness in
+benchmarks/harness.py.
+"""
@@ -0,0 +1,83 @@
+"""python -m benchmarks {run,compare} — see benchmarks/__init__.py."""
+import argparse
+import logging
+import os
+import sys
+
+# Run from anywhere: the backend modules import each other as top-level modules
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import harness
+
+
+def _run(args):
+    logging.disable(logging.WARNING)
+    import benchmarks.cases  # noqa: F401  (registers the cases)
+    repeat, min_time = (3, 0.05) if args.quick else (args.repeat, args.min_time)
+    return harness.run(args.k, repeat=repeat, min_time=min_time)
+
+
+def _print_comparison(rows, threshold):
+    print(f"\n{'case':60} {'base us':>12} {'now us':>12} {'change':>8}  verdict")
+    for label, old, new, change, verdict in rows:
+        old_s = f"{old:12.2f}" if old is not None else f"{'-':>12}"
+        new_s = f"{new:12.2f}" if new is not None else f"{'-':>12}"
+        change_s = f"{change:+7.1f}%" if change is not None else f"{'':>8}"
+        print(f"{label:60} {old_s} {new_s} {change_s}  {verdict}")
+    regressions = [r for r in rows if r[4] == "regression"]
+    print(f"\n{len(regressions)} regression(s) above {threshold}%")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backend micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def timing_options(p):
+        p.add_argument("-k", default=None, help="only cases whose name contains this")
+        p.add_argument("--repeat", type=int, default=7)
+        p.add_argument("--min-time", type=float, default=0.2, help="seconds per timed round")
+        p.add_argument("--quick", action="store_true", help="3 short rounds per case (smoke run)")
+
+    run = sub.add_parser("run", help="run the cases")
+    timing_options(run)
+    run.add_argument("--save", metavar="NAME", help="write baselines/NAME.json (or a .json path)")
+
+    cmp = sub.add_parser("compare", help="compare against a baseline; exit 1 on regressions")
+    cmp.add_argument("baseline", help="baseline name or .json path")
+    cmp.add_argument("current", nargs="?", help="second baseline; omitted = run the cases now")
+    cmp.add_argument("--threshold", type=float, default=10.0, help="percent slowdown that counts as a regression")
+    cmp.add_argument("--metric", default="median_us", choices=("median_us", "min_us", "mean_us"))
+    timing_options(cmp)
+    cmp.add_argument("--save", metavar="NAME", help="also save the fresh run")
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = _run(args)
+        if args.save:
+            print(f"\nSaved {harness.save(report, args.save)}")
+        return 0
+
+    base = harness.load(args.baseline)
+    if args.current:
+        current = harness.load(args.current)
+    else:
+        current = _run(args)
+        if args.save:
+            print(f"\nSaved {harness.save(current, args.save)}")
+    if base["meta"].get("python") != current["meta"].get("python") or \
+            base["meta"].get("machine") != current["meta"].get("machine"):
+        print(f"warning: baseline is from Python {base['meta'].get('python')} on {base['meta'].get('machine')}, "
+              f"this run Python {current['meta'].get('python')} on {current['meta'].get('machine')}")
+    if args.k:
+        base["results"] = {k: v for k, v in base["results"].items() if args.k in k}
+        current["results"] = {k: v for k, v in current["results"].items() if args.k in k}
+    regressions = _print_comparison(harness.compare(base, current, args.threshold, args.metric), args.threshold)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Benchmark cases. Inputs are synthetic but shaped like production rows, and seeded so runs are comparable."""
+import json
+import random
+from datetime import datetime, timedelta
+
+from jose import jwt
+
+import auth
+import health
+import menu
+from chatbot_engine import HealthChatbot
+from models import HealthProfile
+from routes import admin_reports
+
+from benchmarks.harness import bench
+
+MENU_SIZES = (20, 200, 2000)
+PROFILES = ("none", "typical", "complex")
+
+_NAMES = ("Grilled Chicken", "Paneer Tikka", "Quinoa Bowl", "Cheese Pizza", "Chocolate Cake", "Lentil Soup",
+          "Almond Salad", "Beef Burger", "Masala Dosa", "Oats Porridge", "Salmon Fillet", "Veg Biryani",
+          "Egg Curry", "Broccoli Stir Fry", "Fruit Custard", "Peanut Noodles")
+_CATEGORIES = ("Main Course", "Breakfast", "Snacks", "Beverages", "Desserts", "Salads")
+
+
+def make_menu(n, seed=7):
+    """n menu dicts as menu.menu_item() builds them, with realistic nutrition spreads."""
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i + 1,
+            "name": f"{rng.choice(_NAMES)} {i}",
+            "category": rng.choice(_CATEGORIES),
+            "price": round(rng.uniform(20, 400), 2),
+            "image": "🍲",
+            "calories": rng.randint(80, 1200),
+            "sugar": rng.choice((0, rng.uniform(0, 45))),
+            "protein": rng.uniform(0, 45),
+            "sodium": rng.uniform(10, 2200),
+            "carbs": rng.uniform(0, 110),
+            "description": "",
+        }
+        for i in range(n)
+    ]
+
+
+def scoring_profile(kind):
+    """Profile dicts as menu.scoring_profile() produces them."""
+    if kind == "none":
+        return menu.scoring_profile(None)
+    if kind == "typical":
+        return {"age": 34, "disease": ["Diabetes"], "allergies": [{"name": "Nuts", "severity": "Mild"}],
+                "dietary_preference": "Non-Veg", "target_calories": 2000}
+    return {"age": 58, "disease": ["Diabetes", "Hypertension", "Obesity", "Heart Disease"],
+            "allergies": [{"name": "Nuts", "severity": "Severe"}, {"name": "Dairy", "severity": "Mild"},
+                          {"name": "Egg", "severity": "Mild"}, {"name": "Soy", "severity": "Severe"}],
+            "dietary_preference": "Veg", "target_calories": 1800}
+
+
+def profile_row(kind):
+    """Transient HealthProfile rows, as health.py reads them from the database."""
+    p = scoring_profile(kind)
+    severity = {d: ("Severe", "Moderate", "Mild")[i % 3] for i, d in enumerate(p["disease"])}
+    return HealthProfile(
+        id=1, user_id=1, age=p["age"], height_cm=170.0, weight_kg=82.0, bmi=28.4, gender="Female",
+        disease=json.dumps(p["disease"]), severity=json.dumps(severity),
+        health_values=json.dumps({"diabetes": 160, "hypertension": 145} if p["disease"] else {}),
+        diabetes_status="High" if "Diabetes" in p["disease"] else "Normal",
+        bp_status="Elevated" if "Hypertension" in p["disease"] else "Normal",
+        cholesterol_status="Normal", bmi_category="Overweight", risk_score=0, risk_level="Low",
+        allergies=json.dumps(p["allergies"]) if p["allergies"] else "None",
+        dietary_preference=p["dietary_preference"],
+    )
+
+
+def _grid(*axes):
+    params = [""]
+    for name, values in axes:
+        params = [f"{p},{name}={v}" if p else f"{name}={v}" for p in params for v in values]
+    return params
+
+
+def _args(param):
+    args = dict(pair.split("=") for pair in param.split(","))
+    return {k: int(v) if v.isdigit() else v for k, v in args.items()}
+
+
+@bench("chatbot.calculate_health_score", _grid(("menu", MENU_SIZES), ("profile", PROFILES)))
+def calculate_health_score(param):
+    args = _args(param)
+    items, profile = make_menu(args["menu"]), scoring_profile(args["profile"])
+    engine = HealthChatbot({}, items, [])
+
+    def run():
+        for item in items:
+            engine.calculate_health_score(item, profile)
+    return run
+
+
+_MESSAGES = {
+    "greeting": "hi there",
+    "safety": "is chocolate cake safe for me",
+    "analytics": "show me my health report and analysis",
+    "miss": "tell me a joke about the weather today",
+    "miss-long": "tell me about the canteen menu for today " * 20,
+}
+
+
+@bench("chatbot.detect_intent", tuple(f"message={m}" for m in _MESSAGES))
+def detect_intent(param):
+    engine = HealthChatbot({}, [], [])
+    message = _MESSAGES[_args(param)["message"]]
+    return lambda: engine.detect_intent(message)
+
+
+@bench("chatbot.get_response", _grid(("menu", MENU_SIZES), ("message", ("safety", "analytics", "miss"))))
+def get_response(param):
+    args = _args(param)
+    items = make_menu(args["menu"])
+    engine = HealthChatbot({}, items, [])
+    # A food-safety question about the last item scans the whole menu
+    message = f"is {items[-1]['name']} safe" if args["message"] == "safety" else _MESSAGES[args["message"]]
+    profile = scoring_profile("typical")
+    return lambda: engine.get_response("1", message, {}, profile)
+
+
+@bench("menu.score_menu", _grid(("menu", MENU_SIZES), ("profile", PROFILES)))
+def score_menu(param):
+    args = _args(param)
+    items, profile = make_menu(args["menu"]), scoring_profile(args["profile"])
+    return lambda: menu.score_menu(items, profile)
+
+
+@bench("health.calculate_overall_risk", tuple(f"profile={p}" for p in PROFILES))
+def calculate_overall_risk(param):
+    row = profile_row(_args(param)["profile"])
+    return lambda: health.calculate_overall_risk(row)
+
+
+@bench("health.format_health_profile", tuple(f"profile={p}" for p in PROFILES))
+def format_health_profile(param):
+    row = profile_row(_args(param)["profile"])
+    return lambda: health.format_health_profile(row, "Bench User")
+
+
+@bench("admin_reports._generate_csv_response", ("rows=100", "rows=1000", "rows=10000"))
+def generate_csv_response(param):
+    rng = random.Random(3)
+    start = datetime(2026, 1, 1)
+    rows = [
+        [i, (start + timedelta(minutes=7 * i)).isoformat(), f"Customer {rng.randint(1, 5000)}",
+         f"${rng.uniform(20, 900):.2f}", rng.choice(("completed", "pending", "cancelled"))]
+        for i in range(_args(param)["rows"])
+    ]
+    headers = ["Order ID", "Date", "Customer", "Amount", "Status"]
+    return lambda: admin_reports._generate_csv_response(rows, headers, "sales")
+
+
+def _claims():
+    return {"sub": "bench@canteen.local", "role": "USER", "user_id": 42,
+            "exp": datetime.utcnow() + timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)}
+
+
+@bench("auth.jwt_encode")
+def jwt_encode(param):
+    claims = _claims()
+    return lambda: jwt.encode(claims, auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+
+
+@bench("auth.jwt_decode")
+def jwt_decode(param):
+    token = jwt.encode(_claims(), auth.SECRET_KEY, algorithm=auth.ALGORITHM)
+    return lambda: jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+
+
+@bench("auth.verify_password")
+def verify_password(param):
+    # The other half of auth.login, and usually the larger one
+    hashed = auth.pwd_context.hash("Bench@1234")
+    return lambda: auth.pwd_context.verify("Bench@1234", hashed)
@@ -0,0 +1,109 @@
+"""Timing harness: case registry, measurement, baseline files and comparison."""
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import timeit
+from datetime import datetime
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+_cases = []
+
+
+def bench(name, params=(None,)):
+    """Register a case. The decorated function takes one param and returns the zero-arg callable to time.
+
+    Setup (building menus, profiles, rows) happens in the decorated function,
+    so only the returned callable is measured.
+    """
+    def register(setup):
+        for param in params:
+            label = name if param is None else f"{name}[{param}]"
+            _cases.append((label, setup, param))
+        return setup
+    return register
+
+
+def cases(pattern=None):
+    return [c for c in _cases if not pattern or pattern in c[0]]
+
+
+def measure(fn, repeat=7, min_time=0.2):
+    """Seconds per call: timeit autorange sizes the loop, then `repeat` timed rounds."""
+    timer = timeit.Timer(fn)
+    loops, elapsed = timer.autorange()
+    if elapsed < min_time:
+        loops = max(loops, int(loops * min_time / max(elapsed, 1e-9)))
+    gc.collect()    # timeit turns GC off while timing; start each case from a clean heap
+    rounds = [t / loops for t in timer.repeat(repeat=repeat, number=loops)]
+    return {
+        "loops": loops,
+        "min_us": round(min(rounds) * 1e6, 3),
+        "median_us": round(statistics.median(rounds) * 1e6, 3),
+        "mean_us": round(statistics.fmean(rounds) * 1e6, 3),
+        "stdev_us": round(statistics.stdev(rounds) * 1e6, 3) if len(rounds) > 1 else 0.0,
+    }
+
+
+def run(pattern=None, repeat=7, min_time=0.2, progress=print):
+    results = {}
+    for label, setup, param in cases(pattern):
+        results[label] = measure(setup(param), repeat, min_time)
+        if progress:
+            progress(f"{label:60} {results[label]['median_us']:>12.2f} us")
+    return {"meta": _meta(), "results": results}
+
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor(),
+    }
+
+
+def baseline_path(name_or_path):
+    """A bare name means benchmarks/baselines/<name>.json; anything with a separator or .json is a path."""
+    if name_or_path.endswith(".json") or os.sep in name_or_path or "/" in name_or_path:
+        return name_or_path
+    return os.path.join(BASELINE_DIR, f"{name_or_path}.json")
+
+
+def save(report, name_or_path):
+    path = baseline_path(name_or_path)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    return path
+
+
+def load(name_or_path):
+    with open(baseline_path(name_or_path)) as f:
+        return json.load(f)
+
+
+def compare(base, current, threshold=10.0, metric="median_us"):
+    """Rows of (case, base, current, change %, verdict); verdict is 'regression', 'faster', 'ok', 'new' or 'missing'."""
+    rows = []
+    for label in sorted(set(base["results"]) | set(current["results"])):
+        old = base["results"].get(label)
+        new = current["results"].get(label)
+        if old is None or new is None:
+            rows.append((label, old and old[metric], new and new[metric], None, "new" if old is None else "missing"))
+            continue
+        change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+        verdict = "regression" if change > threshold else ("faster" if change < -threshold else "ok")
+        rows.append((label, old[metric], new[metric], round(change, 1), verdict))
+    return rows
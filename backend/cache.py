@@ -0,0 +1,428 @@
+"""Tag-based application cache.
+
+    import cache
+
+    @cache.cached("menu", ttl=300)
+    def available_menu(db: Session): ...
+
+    cache.get_or_compute(("analytics/sales", start, end), compute, tags=("orders",), ttl=60)
+
+Entries are keyed by the function and its arguments. Session arguments are
+left out of the key, so pass ids and plain values rather than ORM objects.
+Each entry is tagged with the domains it was computed from: "menu",
+"orders", "inventory" or "profiles". Writers call
+cache.mark_dirty(db, "menu", ...) before committing. A session hook
+invalidates those tags once the commit succeeds, so a reader racing the
+write can never store pre-commit data as fresh.
+
+Invalidation goes by tag version. The backend keeps a counter per tag, and
+every entry records the counters of its tags as they were before it was
+computed. An entry with an out-of-date counter reads as a miss, so
+invalidating a tag is one counter bump, however many entries carry it.
+
+Backends, chosen with CACHE_BACKEND:
+- "memory" (default): a per-process LRU dict holding up to
+  CACHE_MAX_ENTRIES entries.
+- "sqlite": a shared file (CACHE_PATH, default cache.db next to this module).
+  Every worker process on the host sees the same entries and the same
+  invalidations. Values are pickled. Beyond the size bound, the oldest
+  stored entries are evicted first.
+
+With several worker processes on the memory backend, set CACHE_BUS=1. Each
+invalidation is then also published on cache_bus, and every lookup first
+applies what the other workers published. An entry is served at most
+CACHE_BUS_INTERVAL seconds after another worker invalidated it.
+
+Concurrent misses on one key are coalesced through singleflight: one caller
+computes and the rest wait for its value (counted as "coalesced" in stats()).
+Async handlers use aget_or_compute() or `await fn.in_threadpool(...)` on a
+@cached function, which compute in the threadpool instead of on the loop.
+
+Cached values are shared between requests; treat them as read-only.
+stats() feeds GET /api/admin/performance/cache and render() feeds /metrics.
+"""
+import functools
+import inspect
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import cache_bus
+import singleflight
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_TTL = 60
+MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "2048"))
+TAGS = ("menu", "orders", "inventory", "profiles")
+
+MISSING = object()
+
+
+class MemoryBackend:
+    """LRU dict of key -> (expires_at, tags, versions, value), plus tag counters."""
+
+    name = "memory"
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._versions = {}
+
+    def versions(self, tags):
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in tags)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, tags, versions, value = entry
+            if expires_at <= now or versions != tuple(self._versions.get(t, 0) for t in tags):
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags, versions, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, tags, versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tags):
+        with self._lock:
+            for t in tags:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """Entries and tag counters in a SQLite file shared by every process on the host."""
+
+    name = "sqlite"
+    TRIM_EVERY = 64     # sets between size/expiry sweeps
+
+    def __init__(self, path, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._local = threading.local()
+        self._sets = 0
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                tags TEXT NOT NULL,
+                versions TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                stored_at REAL NOT NULL,
+                value BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at ON cache_entries (stored_at);
+            CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT PRIMARY KEY, version INTEGER NOT NULL);
+        """)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: every statement is its own short transaction
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def versions(self, tags):
+        if not tags:
+            return ()
+        rows = dict(self._conn().execute(
+            f"SELECT tag, version FROM cache_tags WHERE tag IN ({','.join('?' * len(tags))})", tags
+        ).fetchall())
+        return tuple(rows.get(t, 0) for t in tags)
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT tags, versions, expires_at, value FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return MISSING
+        tags, versions, expires_at, value = row
+        tags = tuple(tags.split(",")) if tags else ()
+        if expires_at <= time.time() or versions != ",".join(map(str, self.versions(tags))):
+            return MISSING
+        return pickle.loads(value)
+
+    def set(self, key, value, tags, versions, ttl):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, tags, versions, expires_at, stored_at, value) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, ",".join(tags), ",".join(map(str, versions)), now + ttl, now,
+             pickle.dumps(value, pickle.HIGHEST_PROTOCOL)),
+        )
+        self._sets += 1
+        if self._sets % self.TRIM_EVERY == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            trimmed = conn.execute(
+                "DELETE FROM cache_entries WHERE key IN "
+                "(SELECT key FROM cache_entries ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self.evictions += max(trimmed, 0)
+
+    def invalidate(self, tags):
+        conn = self._conn()
+        for t in tags:
+            conn.execute(
+                "INSERT INTO cache_tags (tag, version) VALUES (?, 1) "
+                "ON CONFLICT(tag) DO UPDATE SET version = version + 1",
+                (t,),
+            )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache_entries")
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+def _make_backend():
+    if os.environ.get("CACHE_BACKEND", "memory") == "sqlite":
+        return SQLiteBackend(os.environ.get("CACHE_PATH", os.path.join(BASE_DIR, "cache.db")))
+    return MemoryBackend()
+
+
+backend = _make_backend()
+
+
+def _make_bus():
+    if os.environ.get("CACHE_BUS", "0") != "1" or backend.name != "memory":
+        return None
+    return cache_bus.Bus(os.environ.get("CACHE_BUS_PATH", os.path.join(BASE_DIR, "cache-bus.db")))
+
+
+bus = _make_bus()
+
+_stats_lock = threading.Lock()
+_counts = {}            # namespace -> [hits, misses, coalesced]
+_invalidations = {}     # tag -> count
+_since = time.time()
+
+
+def use(new_backend):
+    """Swap the backend (tests, or a launcher that picks one at startup)."""
+    global backend
+    backend = new_backend
+
+
+def after_fork():
+    """Reopen the sqlite backend in a forked worker (a SQLite connection must not cross a fork)."""
+    if backend.name == "sqlite":
+        use(SQLiteBackend(backend.path, backend.max_entries))
+
+
+def _sync():
+    """Apply the invalidations other workers published (no-op without a bus)."""
+    if bus is None:
+        return
+    tags = bus.poll()
+    if cache_bus.CLEAR in tags:
+        backend.clear()
+    elif tags:
+        backend.invalidate(tuple(tags))
+
+
+HIT, MISS, COALESCED = range(3)
+
+
+def _count(namespace, result):
+    with _stats_lock:
+        counts = _counts.get(namespace)
+        if counts is None:
+            counts = _counts[namespace] = [0, 0, 0]
+        counts[result] += 1
+
+
+def _fill(skey, compute, tags, ttl):
+    # Read the tag versions before computing: an invalidation that lands
+    # mid-compute leaves this entry stale on arrival
+    versions = backend.versions(tags)
+    value = compute()
+    backend.set(skey, value, tags, versions, ttl)
+    return value
+
+
+def get_or_compute(key, compute, tags=(), ttl=DEFAULT_TTL, namespace=None):
+    """Return the cached value for `key`, calling `compute()` on a miss.
+
+    `key` is a tuple of plain values and its first element names the entry
+    in stats() unless `namespace` is given.
+    """
+    if namespace is None:
+        namespace = key[0] if isinstance(key, tuple) else str(key)
+    skey = repr(key)
+    _sync()
+    value = backend.get(skey)
+    if value is not MISSING:
+        _count(namespace, HIT)
+        return value
+    value, leader = singleflight.group.do(skey, lambda: _fill(skey, compute, tuple(tags), ttl))
+    _count(namespace, MISS if leader else COALESCED)
+    return value
+
+
+async def aget_or_compute(key, compute, tags=(), ttl=DEFAULT_TTL, namespace=None):
+    """get_or_compute() for async handlers: a miss runs `compute` (sync) in the threadpool."""
+    if namespace is None:
+        namespace = key[0] if isinstance(key, tuple) else str(key)
+    skey = repr(key)
+    _sync()
+    value = backend.get(skey)
+    if value is not MISSING:
+        _count(namespace, HIT)
+        return value
+    value, leader = await singleflight.group.do_async(skey, lambda: _fill(skey, compute, tuple(tags), ttl))
+    _count(namespace, MISS if leader else COALESCED)
+    return value
+
+
+def cached(*tags, ttl=DEFAULT_TTL):
+    """Decorator: cache the function's result per distinct argument values (Session arguments excluded).
+
+    `await fn.in_threadpool(*args)` is the same cache for async callers.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+        namespace = f"{fn.__module__}.{fn.__qualname__}"
+
+        def make_key(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (namespace,) + tuple(
+                (name, value) for name, value in bound.arguments.items() if not isinstance(value, Session)
+            )
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(make_key(args, kwargs), lambda: fn(*args, **kwargs), tags, ttl, namespace)
+
+        async def in_threadpool(*args, **kwargs):
+            return await aget_or_compute(make_key(args, kwargs), lambda: fn(*args, **kwargs), tags, ttl, namespace)
+
+        wrapper.in_threadpool = in_threadpool
+        return wrapper
+    return decorate
+
+
+def invalidate(*tags):
+    """Drop every entry carrying any of `tags`, now (in every worker, with a bus)."""
+    backend.invalidate(tags)
+    if bus is not None:
+        bus.publish(tags)
+    with _stats_lock:
+        for t in tags:
+            _invalidations[t] = _invalidations.get(t, 0) + 1
+
+
+def clear():
+    """Drop every entry (in every worker, with a bus) and reset this process's counters."""
+    global _since
+    backend.clear()
+    if bus is not None:
+        bus.publish((cache_bus.CLEAR,))
+    with _stats_lock:
+        _counts.clear()
+        _invalidations.clear()
+        _since = time.time()
+
+
+def mark_dirty(db: Session, *tags):
+    """Flag the session so `tags` are invalidated once it commits."""
+    db.info.setdefault("cache_dirty", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    tags = session.info.pop("cache_dirty", None)
+    if tags:
+        invalidate(*sorted(tags))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("cache_dirty", None)
+
+
+def stats():
+    """Hit/miss/coalesced counts per namespace (this process) and backend occupancy.
+
+    A coalesced lookup missed but waited for a concurrent identical
+    computation instead of running its own.
+    """
+    with _stats_lock:
+        counts = {ns: tuple(c) for ns, c in _counts.items()}
+        invalidations = dict(_invalidations)
+    hits = sum(c[HIT] for c in counts.values())
+    misses = sum(c[MISS] for c in counts.values())
+    coalesced = sum(c[COALESCED] for c in counts.values())
+    lookups = hits + misses + coalesced
+    return {
+        "backend": backend.name,
+        "since": _since,
+        "entries": backend.size(),
+        "max_entries": backend.max_entries,
+        "evictions": backend.evictions,
+        "hits": hits,
+        "misses": misses,
+        "coalesced": coalesced,
+        "hit_rate": round(hits / lookups, 4) if lookups else None,
+        "in_flight": singleflight.group.in_flight(),
+        "namespaces": {
+            ns: {"hits": h, "misses": m, "coalesced": c, "hit_rate": round(h / (h + m + c), 4) if h + m + c else None}
+            for ns, (h, m, c) in sorted(counts.items())
+        },
+        "invalidations": invalidations,
+        "bus": bus.stats() if bus is not None else None,
+    }
+
+
+def render() -> str:
+    """Prometheus lines for /metrics."""
+    s = stats()
+    lines = [
+        "# HELP app_cache_requests_total Cache lookups by namespace and result.",
+        "# TYPE app_cache_requests_total counter",
+    ]
+    for ns, c in s["namespaces"].items():
+        lines.append(f'app_cache_requests_total{{namespace="{ns}",result="hit"}} {c["hits"]}')
+        lines.append(f'app_cache_requests_total{{namespace="{ns}",result="miss"}} {c["misses"]}')
+        lines.append(f'app_cache_requests_total{{namespace="{ns}",result="coalesced"}} {c["coalesced"]}')
+    lines += [
+        "# HELP app_cache_invalidations_total Tag invalidations.",
+        "# TYPE app_cache_invalidations_total counter",
+    ]
+    lines += [f'app_cache_invalidations_total{{tag="{t}"}} {n}' for t, n in sorted(s["invalidations"].items())]
+    lines += [
+        "# HELP app_cache_entries Entries currently stored.",
+        "# TYPE app_cache_entries gauge",
+        f"app_cache_entries {s['entries']}",
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,120 @@
+"""Cross-process invalidation bus for the in-memory cache.
+
+With several uvicorn workers and CACHE_BACKEND=memory, every worker holds
+its own copy of the menu, the scored menus and the dashboard reports. An
+admin edit commits through one worker, and only that worker's tag counters
+move. The bus carries the invalidation to the others.
+
+It is a change-log table in a small SQLite file on the host (CACHE_BUS_PATH,
+default cache-bus.db next to this module). No broker is involved.
+
+- publish(tags) appends one row per tag, stamped with the writer's pid.
+- poll() runs at most once per CACHE_BUS_INTERVAL seconds (default 1). It
+  first checks `PRAGMA data_version`, which only changes when another
+  connection has committed, so an idle bus costs one pragma per interval.
+  When it has changed, poll() reads the rows past the last id it saw and
+  returns the tags other processes published.
+
+cache.py polls at the start of every lookup. A worker therefore never serves
+an entry more than one interval after another worker invalidated it. Rows
+older than RETENTION seconds are pruned by the writers.
+
+Only the memory backend needs this. The sqlite backend keeps its tag counters
+in the shared file already.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = float(os.environ.get("CACHE_BUS_INTERVAL", "1.0"))
+RETENTION = 3600        # seconds of log kept for slow pollers
+PRUNE_EVERY = 256       # published rows between prunes
+CLEAR = "*"             # pseudo-tag: drop every entry
+
+
+class Bus:
+    def __init__(self, path, interval=INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.published = 0
+        self.received = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+        self._data_version = None
+        self._next_poll = 0.0
+        # Start from the end of the log: history is for workers already running
+        self._last_id = self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM cache_bus").fetchone()[0]
+
+    def _conn(self):
+        # A connection must not cross a fork (gunicorn --preload), so each
+        # process opens its own
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._data_version = None
+            self._db = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS cache_bus (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    origin INTEGER NOT NULL,
+                    tag TEXT NOT NULL,
+                    published_at REAL NOT NULL
+                )
+            """)
+        return self._db
+
+    def publish(self, tags):
+        """Tell the other processes that `tags` were invalidated here."""
+        if not tags:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._conn()
+                conn.executemany(
+                    "INSERT INTO cache_bus (origin, tag, published_at) VALUES (?, ?, ?)",
+                    [(self._pid, t, now) for t in tags],
+                )
+                before = self.published
+                self.published += len(tags)
+                if before // PRUNE_EVERY != self.published // PRUNE_EVERY:
+                    conn.execute("DELETE FROM cache_bus WHERE published_at < ?", (now - RETENTION,))
+        except sqlite3.Error:
+            # The local invalidation already happened; the others catch up by TTL
+            logger.exception("cache bus publish failed for %s", ",".join(tags))
+
+    def poll(self, force=False):
+        """Tags other processes invalidated since the last poll (at most once per interval)."""
+        now = time.monotonic()
+        if not force and now < self._next_poll:
+            return set()
+        with self._lock:
+            if not force and now < self._next_poll:
+                return set()
+            self._next_poll = now + self.interval
+            try:
+                conn = self._conn()
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if version == self._data_version:
+                    return set()
+                self._data_version = version
+                rows = conn.execute(
+                    "SELECT id, origin, tag FROM cache_bus WHERE id > ? ORDER BY id", (self._last_id,)
+                ).fetchall()
+            except sqlite3.Error:
+                logger.exception("cache bus poll failed")
+                return set()
+            if rows:
+                self._last_id = rows[-1][0]
+            tags = {tag for _, origin, tag in rows if origin != self._pid}
+            self.received += len(tags)
+            return tags
+
+    def stats(self):
+        return {"path": self.path, "interval": self.interval, "published": self.published, "received": self.received}
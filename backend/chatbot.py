@@ -3,15 +3,19 @@ from sqlalchemy.orm import Session
 from chatbot_engine import HealthChatbot
 from database import get_db
 from dependencies import get_current_user
-from models import User, HealthProfile, FoodItem
+from menu import available_menu
+from models import User, HealthProfile
+from schemas import ChatbotReply
 import json
+import logging
 
 router = APIRouter(prefix="/api/chatbot", tags=["Chatbot"])
+logger = logging.getLogger(__name__)
 
 # Initialize Chatbot Engine (This will be re-initialized per request with fresh food items)
 chatbot_engine = None # Placeholder, will be initialized in the endpoint
 
-@router.post("/query")
+@router.post("/query", response_model=ChatbotReply)
 async def chatbot_query(
     request: Request,
     db: Session = Depends(get_db),
@@ -39,24 +43,8 @@ async def chatbot_query(
                 "allergies": db_profile.allergies
             }
 
-        # Fetch fresh DB foods instead of the old hardcoded list
-        db_foods = db.query(FoodItem).filter(FoodItem.is_available == True).all()
-        food_items = []
-        
-        for f in db_foods:
-            food_items.append({
-                "id": f.id,
-                "name": f.name,
-                "category": f.category,
-                "price": f.price,
-                "image": f.image_emoji,
-                "calories": f.calories,
-                "sugar": f.sugar,
-                "protein": f.protein,
-                "sodium": f.sodium,
-                "carbs": f.carbs,
-                "description": f.description or ""
-            })
+        # Live DB foods, shared with the menu pages through the cache
+        food_items = available_menu(db)
 
         # Initialize Bot Engine with the live DB foods for this request
         # Assuming the chatbot_engine constructor takes profile_data as the first arg, food_items as second, and context as third
@@ -103,5 +91,5 @@ async def chatbot_query(
         return response
         
     except Exception as e:
-        print(f"Chatbot Error: {str(e)}")
+        logger.exception("chatbot query failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,157 @@
+"""Atomic writes for the water / steps / mood tracker (daily_logs).
+
+One row per (user_id, date), enforced by uq_daily_logs_user_date. Every write
+is a single INSERT ... ON CONFLICT DO UPDATE, so concurrent taps add up
+instead of overwriting each other:
+- water_intake_ml is a delta, added to the stored value;
+- steps and mood replace the stored value when given (non-zero / non-empty).
+
+Device sync (POST /api/health/ingest) streams NDJSON samples that are summed
+per (user, date) in memory and flushed with one executemany upsert per batch;
+there both steps and water are increments.
+"""
+from datetime import date as Date, datetime
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from models import DailyLog, User
+
+
+def today() -> str:
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def _combine(deltas):
+    """Collapse deltas per date: water summed, last steps/mood win."""
+    merged = {}
+    for d in deltas:
+        date = d.get("date") or today()
+        entry = merged.setdefault(date, {"water_intake_ml": 0, "steps": None, "mood": None})
+        entry["water_intake_ml"] += d.get("water_intake_ml") or 0
+        if d.get("steps"):
+            entry["steps"] = d["steps"]
+        if d.get("mood"):
+            entry["mood"] = d["mood"]
+    return merged
+
+
+def apply_deltas(db: Session, user_id: int, deltas):
+    """Upsert log deltas (dicts with water_intake_ml/steps/mood/date) and commit.
+
+    Returns the resulting rows as dicts, one per distinct date, in input order.
+    """
+    rows = []
+    for date, entry in _combine(deltas).items():
+        stmt = insert(DailyLog).values(
+            user_id=user_id,
+            date=date,
+            water_intake_ml=entry["water_intake_ml"],
+            steps=entry["steps"] or 0,
+            mood=entry["mood"] or "Neutral",
+        )
+        update = {"water_intake_ml": func.coalesce(DailyLog.water_intake_ml, 0) + stmt.excluded.water_intake_ml}
+        if entry["steps"]:
+            update["steps"] = stmt.excluded.steps
+        if entry["mood"]:
+            update["mood"] = stmt.excluded.mood
+        stmt = stmt.on_conflict_do_update(index_elements=["user_id", "date"], set_=update).returning(
+            DailyLog.id, DailyLog.user_id, DailyLog.date, DailyLog.water_intake_ml, DailyLog.steps, DailyLog.mood
+        )
+        rows.append(dict(db.execute(stmt).mappings().one()))
+    db.commit()
+    return rows
+
+
+def merge_duplicates(db: Session) -> int:
+    """Fold duplicate (user_id, date) rows into one so the unique index can be built.
+
+    Water is summed, the highest steps kept and the latest mood kept.
+    Returns the number of rows removed.
+    """
+    dupes = (
+        db.query(DailyLog.user_id, DailyLog.date)
+        .group_by(DailyLog.user_id, DailyLog.date)
+        .having(func.count(DailyLog.id) > 1)
+        .all()
+    )
+    removed = 0
+    for user_id, date in dupes:
+        logs = (
+            db.query(DailyLog)
+            .filter(DailyLog.user_id == user_id, DailyLog.date == date)
+            .order_by(DailyLog.id)
+            .all()
+        )
+        keep, extra = logs[-1], logs[:-1]
+        keep.water_intake_ml = sum(l.water_intake_ml or 0 for l in logs)
+        keep.steps = max(l.steps or 0 for l in logs)
+        for log in extra:
+            db.delete(log)
+        removed += len(extra)
+    db.commit()
+    return removed
+
+
+# Distinct (user, date) keys held in memory before an ingest batch is written
+INGEST_FLUSH_KEYS = 5000
+# A single sample line longer than this aborts the request (413); batches
+# already flushed stay committed
+INGEST_MAX_LINE_BYTES = 64 * 1024
+
+
+def _is_int(value):
+    # bool is an int subclass, but true/false is neither a count nor an id
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_sample(sample, user_id: int, any_user: bool):
+    """Validate one device sample; returns (user_id, date, water_ml, steps).
+
+    A sample looks like {"date": "2026-03-01", "steps": 1200, "water_intake_ml": 250}
+    ("timestamp" may stand in for "date"). "user_id" is only honoured for admins;
+    everyone else can only submit their own data. Raises ValueError.
+    """
+    if not isinstance(sample, dict):
+        raise ValueError("sample must be a JSON object")
+    owner = sample.get("user_id", user_id)
+    if not _is_int(owner):
+        raise ValueError("user_id must be an integer")
+    if owner != user_id and not any_user:
+        raise ValueError("user_id does not match the authenticated user")
+
+    day = str(sample.get("date") or sample.get("timestamp") or "")[:10]
+    Date.fromisoformat(day)   # raises ValueError on bad dates
+
+    water, steps = (sample.get(key) for key in ("water_intake_ml", "steps"))
+    water, steps = (0 if water is None else water), (0 if steps is None else steps)
+    if not (_is_int(water) and _is_int(steps)) or water < 0 or steps < 0:
+        raise ValueError("steps and water_intake_ml must be non-negative integers")
+    return owner, day, water, steps
+
+
+def upsert_totals(db: Session, totals: dict):
+    """Add summed samples {(user_id, date): [water_ml, steps]} to daily_logs and commit.
+
+    Unknown user ids are skipped. Returns (rows written, keys skipped).
+    """
+    user_ids = {uid for uid, _ in totals}
+    known = {uid for (uid,) in db.query(User.id).filter(User.id.in_(user_ids))}
+    params = [
+        {"user_id": uid, "date": day, "water_intake_ml": water, "steps": steps, "mood": "Neutral"}
+        for (uid, day), (water, steps) in totals.items()
+        if uid in known
+    ]
+    if params:
+        stmt = insert(DailyLog)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "date"],
+            set_={
+                "water_intake_ml": func.coalesce(DailyLog.water_intake_ml, 0) + stmt.excluded.water_intake_ml,
+                "steps": func.coalesce(DailyLog.steps, 0) + stmt.excluded.steps,
+            },
+        )
+        db.execute(stmt, params)
+    db.commit()
+    return len(params), len(totals) - len(params)
@@ -1,13 +1,15 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+import logging
 import os
 
 # Get the directory where the database file will be stored
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Database URL - Using SQLite for simplicity
-SQLALCHEMY_DATABASE_URL = f"sqlite:///{BASE_DIR}/canteen.db"
+# Database URL - Using SQLite for simplicity; DATABASE_URL points the app at
+# another file (load tests run against a throwaway copy)
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{BASE_DIR}/canteen.db")
 
 try:
     # Create database engine
@@ -26,6 +28,25 @@ try:
     # Create base class for models
     Base = declarative_base()
 
+    def create_missing_indexes():
+        """create_all() skips indexes on tables that already exist; add them here."""
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+
+    def add_missing_columns():
+        """create_all() skips new columns on tables that already exist; add them (as NULLable) here."""
+        inspector = inspect(engine)
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                if not inspector.has_table(table.name):
+                    continue
+                existing = {c["name"] for c in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name not in existing:
+                        conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} '
+                                          f'{column.type.compile(engine.dialect)}'))
+
     # Dependency function to get database session
     def get_db():
         db = SessionLocal()
@@ -34,4 +55,4 @@ try:
         finally:
             db.close()
 except Exception as e:
-    print(f"Database connection error: {e}")
+    logging.getLogger(__name__).exception("Database connection error")
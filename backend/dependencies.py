@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from models import User
 from database import get_db
 from jose import JWTError, jwt
+import logging
 import os
 
 # JWT configuration - In production, use environment variables
@@ -12,6 +13,8 @@ ALGORITHM = "HS256"
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+logger = logging.getLogger(__name__)
+
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -29,13 +32,12 @@ async def get_current_user(
     try:
         # Decode JWT token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"DEBUG: JWT Payload: {payload}")
         email: str = payload.get("sub")
         if email is None:
-            print("DEBUG: email (sub) is None in payload")
+            logger.debug("token has no subject")
             raise credentials_exception
     except JWTError as e:
-        print(f"DEBUG: JWT Decode Error: {str(e)}")
+        logger.debug("token rejected: %s", e)
         # For demo purposes, fall back to finding first user if token is fake-jwt-token
         if token == "fake-jwt-token":
             user = db.query(User).filter(User.role == "USER").first()
@@ -50,7 +52,7 @@ async def get_current_user(
     
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        print(f"DEBUG: User not found for email: {email}")
+        logger.debug("token subject does not match any user")
         raise credentials_exception
     
     return user
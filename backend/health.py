@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from models import User, HealthProfile, DailyLog
-from schemas import HealthProfileCreate, HealthProfileResponse, DailyLogCreate, DailyLogResponse, HealthStep1, HealthStep2, HealthReportResponse
+from schemas import HealthProfileCreate, HealthProfileResponse, DailyLogCreate, DailyLogResponse, DailyLogBatch, HealthStep1, HealthStep2, HealthReportResponse
 from database import get_db
 from dependencies import get_current_user
+from typing import List
+import cache
+import daily_logs
 import json
 import random
-from datetime import datetime
+import time
 
 router = APIRouter(
     prefix="/api/health",
@@ -126,6 +130,7 @@ def create_health_profile(
     
     current_user.profile_completed = 1
     current_user.onboarding_step = 3
+    cache.mark_dirty(db, "profiles")
     db.commit()
     return format_health_profile(db_profile, current_user.name)
 
@@ -176,6 +181,7 @@ def save_step1(
     profile.dietary_preference = data.dietary_preference
     
     current_user.onboarding_step = 1
+    cache.mark_dirty(db, "profiles")
     db.commit()
     return {"message": "Step 1 saved", "bmi": bmi, "bmi_category": bmi_cat}
 
@@ -198,6 +204,7 @@ def save_step2(
     profile.bp_status = calculate_status("hypertension", data.health_values.get("hypertension", 0))
     
     current_user.onboarding_step = 2
+    cache.mark_dirty(db, "profiles")
     db.commit()
     return {"message": "Step 2 saved"}
 
@@ -216,6 +223,7 @@ def finalize_profile(
     
     current_user.profile_completed = 1
     current_user.onboarding_step = 3
+    cache.mark_dirty(db, "profiles")
     db.commit()
     return {"message": "Profile finalized", "risk_score": score, "risk_level": level}
 
@@ -260,33 +268,127 @@ def get_health_report(
         "recommendations": recs
     }
 
-@router.post("/daily-log")
+@router.post("/daily-log", response_model=DailyLogResponse)
 def create_daily_log(
     log: DailyLogCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    today = datetime.now().strftime("%Y-%m-%d")
-    db_log = db.query(DailyLog).filter(DailyLog.user_id == current_user.id, DailyLog.date == today).first()
-    if db_log:
-        if log.water_intake_ml: db_log.water_intake_ml += log.water_intake_ml
-        if log.steps: db_log.steps = log.steps
-        if log.mood: db_log.mood = log.mood
-    else:
-        db_log = DailyLog(user_id=current_user.id, **log.dict())
-        db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    return db_log
+    # Only fields the client sent count, so a water tap never resets the mood
+    return daily_logs.apply_deltas(db, current_user.id, [log.model_dump(exclude_unset=True)])[0]
+
+@router.post("/daily-log/batch", response_model=List[DailyLogResponse])
+def create_daily_logs(
+    batch: DailyLogBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply several tracker deltas in one transaction; returns one row per date."""
+    # mode="json" hands the dates on as YYYY-MM-DD, the daily_logs.date format
+    entries = [e.model_dump(exclude_unset=True, mode="json") for e in batch.entries]
+    return daily_logs.apply_deltas(db, current_user.id, entries)
 
 @router.get("/daily-log")
 def get_daily_log(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    today = datetime.now().strftime("%Y-%m-%d")
-    log = db.query(DailyLog).filter(DailyLog.user_id == current_user.id, DailyLog.date == today).first()
-    return log or {"water_intake_ml": 0, "steps": 0, "mood": "Neutral"}
+    return todays_log(db, current_user.id) or {"water_intake_ml": 0, "steps": 0, "mood": "Neutral"}
+
+@router.post("/ingest")
+async def ingest_device_samples(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Bulk device sync: NDJSON body, one sample per line.
+
+    The body is read as a stream and parsed line by line; samples are summed
+    per (user, date) and written every INGEST_FLUSH_KEYS keys with a batched
+    upsert, so memory stays flat however many samples are sent. Admins may
+    include "user_id" to sync on behalf of other users.
+
+    A line over INGEST_MAX_LINE_BYTES stops the sync with a 413. Batches
+    written before it stay committed; the 413 body says how many samples and
+    rows those were, so the device can resume after them.
+    """
+    any_user = current_user.role == "ADMIN"
+    started = time.perf_counter()
+    totals = {}
+    batches = []
+    errors = []
+    stats = {"samples": 0, "accepted": 0, "rejected": 0, "rows_written": 0, "keys_skipped": 0}
+
+    async def flush():
+        t0 = time.perf_counter()
+        batch_samples = stats["accepted"] - sum(b["samples"] for b in batches)
+        written, skipped = await run_in_threadpool(daily_logs.upsert_totals, db, totals)
+        elapsed = time.perf_counter() - t0
+        stats["rows_written"] += written
+        stats["keys_skipped"] += skipped
+        batches.append({
+            "samples": batch_samples,
+            "rows": written,
+            "seconds": round(elapsed, 4),
+            "samples_per_sec": round(batch_samples / elapsed) if elapsed else None,
+        })
+        totals.clear()
+
+    def too_long():
+        return HTTPException(status_code=413, detail={
+            "error": f"NDJSON line {stats['samples'] + 1} is too long",
+            "samples_saved": sum(b["samples"] for b in batches),
+            "rows_written": stats["rows_written"],
+        })
+
+    def take(line: bytes):
+        line = line.strip()
+        if not line:
+            return
+        stats["samples"] += 1
+        try:
+            uid, day, water, steps = daily_logs.parse_sample(json.loads(line), current_user.id, any_user)
+        except ValueError as e:   # JSONDecodeError is a ValueError
+            stats["rejected"] += 1
+            if len(errors) < 20:
+                errors.append({"line": stats["samples"], "error": str(e)})
+            return
+        entry = totals.get((uid, day))
+        if entry is None:
+            totals[(uid, day)] = [water, steps]
+        else:
+            entry[0] += water
+            entry[1] += steps
+        stats["accepted"] += 1
+
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if len(line) > daily_logs.INGEST_MAX_LINE_BYTES:
+                raise too_long()
+            take(line)
+            if len(totals) >= daily_logs.INGEST_FLUSH_KEYS:
+                await flush()
+        if len(pending) > daily_logs.INGEST_MAX_LINE_BYTES:
+            raise too_long()
+    take(pending)
+    if totals:
+        await flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        **stats,
+        "seconds": round(elapsed, 3),
+        "samples_per_sec": round(stats["samples"] / elapsed) if elapsed else None,
+        "batches": batches,
+        "errors": errors,
+    }
+
+def todays_log(db: Session, user_id: int):
+    """Today's DailyLog row for the user, or None."""
+    return db.query(DailyLog).filter(DailyLog.user_id == user_id, DailyLog.date == daily_logs.today()).first()
 
 def format_health_profile(profile, user_name="User"):
     """Convert database profile to response format with JSON parsing"""
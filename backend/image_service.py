@@ -0,0 +1,156 @@
+"""Resized / re-encoded derivatives for frontend/images.
+
+GET /images/pizza.png?w=256 returns the image scaled to the nearest allowed
+width at or above `w`, encoded as AVIF or WebP when the browser's Accept
+header allows it. Derivatives are written once to CACHE_DIR under a key built
+from the source's content hash, so edits to a source image never serve a stale
+file. Pillow is optional: without it the original file is served.
+"""
+import hashlib
+import os
+import threading
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+try:
+    from PIL import Image, features
+except ImportError:  # optional dependency
+    Image = None
+    features = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(BASE_DIR, "..", "frontend", "images")
+CACHE_DIR = os.path.join(BASE_DIR, ".image_cache")
+
+# Requested widths snap up to one of these so the cache stays bounded
+ALLOWED_WIDTHS = (64, 128, 256, 384, 512, 768, 1024, 1536)
+# Sizes used by menu cards; generated in the background at startup
+PREGENERATE_WIDTHS = (256, 512)
+
+CACHE_CONTROL = "public, max-age=604800, stale-while-revalidate=86400"
+
+_FORMATS = {
+    # format: (Pillow format name, file extension, media type, save options)
+    "avif": ("AVIF", "avif", "image/avif", {"quality": 55}),
+    "webp": ("WEBP", "webp", "image/webp", {"quality": 80, "method": 6}),
+}
+
+_sources = {}                 # filename -> (path, content hash, mtime)
+_sources_lock = threading.Lock()
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+
+def _supported(fmt: str) -> bool:
+    return Image is not None and features.check(fmt)
+
+
+def _source(filename: str):
+    """Return (path, hash) for a known source image, or None."""
+    path = os.path.join(IMAGE_DIR, filename)
+    if os.path.dirname(os.path.normpath(path)) != os.path.normpath(IMAGE_DIR):
+        return None
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    cached = _sources.get(filename)
+    if cached and cached[2] == mtime:
+        return cached[0], cached[1]
+    with open(path, "rb") as fh:
+        digest = hashlib.sha256(fh.read()).hexdigest()[:16]
+    with _sources_lock:
+        _sources[filename] = (path, digest, mtime)
+    return path, digest
+
+
+def _snap_width(w):
+    if not w:
+        return None
+    for allowed in ALLOWED_WIDTHS:
+        if allowed >= w:
+            return allowed
+    return ALLOWED_WIDTHS[-1]
+
+
+def _negotiate(accept: str):
+    for fmt in ("avif", "webp"):
+        if _FORMATS[fmt][2] in accept and _supported(fmt):
+            return fmt
+    return None
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def derivative(filename: str, width=None, fmt=None):
+    """Return the path of the cached derivative, generating it if needed.
+
+    Returns the original path when nothing would change (no resize, no
+    re-encode) or when Pillow is unavailable; None for unknown images.
+    """
+    src = _source(filename)
+    if src is None:
+        return None
+    path, digest = src
+    if Image is None or (width is None and fmt is None):
+        return path
+
+    stem, ext = os.path.splitext(filename)
+    out_ext = _FORMATS[fmt][1] if fmt else ext.lstrip(".")
+    key = f"{stem}-{digest}-{width or 'orig'}.{out_ext}"
+    out = os.path.join(CACHE_DIR, key)
+    if os.path.exists(out):
+        return out
+
+    with _lock_for(key):
+        if os.path.exists(out):
+            return out
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with Image.open(path) as im:
+            if width and im.width > width:
+                im = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+            tmp = f"{out}.{threading.get_ident()}.tmp"
+            try:
+                if fmt:
+                    pil_format, _, _, options = _FORMATS[fmt]
+                    im.save(tmp, format=pil_format, **options)
+                else:
+                    im.save(tmp, format=(ext.lstrip(".").upper().replace("JPG", "JPEG")), optimize=True)
+                os.replace(tmp, out)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+    return out
+
+
+def serve(request: Request, filename: str, w: int = None) -> Response:
+    fmt = _negotiate(request.headers.get("accept", ""))
+    path = derivative(filename, _snap_width(w), fmt)
+    if path is None:
+        return Response(status_code=404)
+
+    media_type = _FORMATS[fmt][2] if fmt and Image is not None else None
+    return FileResponse(path, media_type=media_type, headers={"Cache-Control": CACHE_CONTROL, "Vary": "Accept"})
+
+
+def pregenerate():
+    """Build the common menu derivatives so the first lunch visitors hit the cache."""
+    if Image is None or not os.path.isdir(IMAGE_DIR):
+        return
+    formats = [f for f in _FORMATS if _supported(f)] or [None]
+    for name in sorted(os.listdir(IMAGE_DIR)):
+        for width in PREGENERATE_WIDTHS:
+            for fmt in formats:
+                try:
+                    derivative(name, width, fmt)
+                except (OSError, ValueError):
+                    break  # not an image Pillow can read; skip it
+
+
+def pregenerate_in_background():
+    threading.Thread(target=pregenerate, name="image-pregenerate", daemon=True).start()
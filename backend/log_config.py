@@ -0,0 +1,209 @@
+"""Structured, non-blocking logging.
+
+configure() (called first thing in app.py) installs one QueueHandler on the
+root logger. Request threads only copy the record onto an in-memory queue; a
+QueueListener thread formats it as a JSON line and writes it to stdout, which
+start_wrapper.bat redirects into backend.log. uvicorn's own loggers
+(including the access log) are routed the same way.
+
+Every line carries the request id of the request that produced it.
+RequestIdMiddleware takes it from an incoming X-Request-ID header (or
+generates one) and echoes it on the response.
+
+Levels:
+    LOG_LEVEL=INFO                                 root level (default INFO)
+    LOG_LEVELS=sqlalchemy.engine=INFO,auth=DEBUG   per-logger overrides
+
+Secrets never reach the output: RedactFilter runs on the calling thread and
+scrubs bearer tokens, JWTs and password/token/secret fields from the message
+and from any `extra=` fields before the record is queued.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+request_id: ContextVar = ContextVar("request_id", default=None)
+
+REDACTED = "[REDACTED]"
+_SENSITIVE_KEY_RE = re.compile(r"pass(word)?|token|secret|authorization|api[_-]?key", re.I)
+_SECRET_PATTERNS = (
+    # Authorization header values
+    (re.compile(r"(?i)\b(bearer)\s+[A-Za-z0-9\-._~+/]+=*"), r"\1 " + REDACTED),
+    # Anything shaped like a JWT
+    (re.compile(r"\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]*"), REDACTED),
+    # token=..., "password": "...", reset links
+    (re.compile(r"(?i)\b(token|password|passwd|secret|api[_-]?key)(['\"]?\s*[=:]\s*['\"]?)[^\s&'\",}]+"),
+     r"\1\2" + REDACTED),
+)
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+_listener = None
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _SECRET_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class RedactFilter(logging.Filter):
+    """Render the message on the calling thread and strip secrets from it."""
+
+    def filter(self, record):
+        message = record.getMessage()
+        record.msg = redact(message)
+        record.args = None
+        for key, value in list(vars(record).items()):
+            if key in _RECORD_ATTRS:
+                continue
+            if _SENSITIVE_KEY_RE.search(key):
+                setattr(record, key, REDACTED)
+            elif isinstance(value, str):
+                setattr(record, key, redact(value))
+        return True
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    """Queue a copy of the record; formatting is left to the listener thread.
+
+    Tracebacks are rendered here, since the frames they point at may be gone
+    by the time the listener gets to the record.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = redact(logging.Formatter().formatException(record.exc_info))
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, request_id, extra fields, exc."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def _parse_levels(spec: str):
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure(stream=None):
+    """Install the queue handler on the root logger and start the listener (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(RedactFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    for name, level in _parse_levels(os.environ.get("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+    # uvicorn installs its own (synchronous) console handlers before importing the app
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uv = logging.getLogger(name)
+        uv.handlers.clear()
+        uv.propagate = True
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+    return _listener
+
+
+def after_fork():
+    """Start a fresh listener in a forked worker; the parent's thread did not survive the fork."""
+    global _listener
+    _listener = None
+    return configure()
+
+
+def shutdown():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class RequestIdMiddleware:
+    """Bind a request id for the duration of each request and echo it as X-Request-ID."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        rid = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                rid = value.decode("latin-1")
+                break
+        if not rid or not _REQUEST_ID_RE.match(rid):
+            rid = uuid.uuid4().hex
+        header = (b"x-request-id", rid.encode("latin-1"))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        token = request_id.set(rid)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
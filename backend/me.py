@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from database import get_db
+from dependencies import get_current_user
+from models import User, HealthProfile, Order
+from health import format_health_profile, todays_log
+from menu import scoring_profile, scored_menu
+from rollups import user_daily_nutrition
+import daily_logs
+from schemas import BootstrapResponse
+from query_stats import query_budget
+from datetime import datetime
+
+router = APIRouter(
+    prefix="/api/me",
+    tags=["me"]
+)
+
+ORDER_FIELDS = ("id", "user_id", "items", "total_price", "total_calories", "total_sugar",
+                "total_sodium", "status", "payment_method", "created_at")
+
+
+@router.get("/bootstrap", response_model=BootstrapResponse)
+@query_budget(6)
+def bootstrap(
+    orders_limit: int = Query(20, ge=0, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Everything user.html / full-menu.html need on load, in one round trip.
+
+    Same shapes as /health/check, /health/profile, /menu/intelligent,
+    /health/daily-log and /menu/history, under one auth check and one session.
+
+    The two dates can differ around midnight: daily_log.date is the server's
+    local day (daily_logs rows), today.date the UTC day the order totals are
+    bucketed by (Order.created_at is UTC).
+    """
+    profile_db = db.query(HealthProfile).filter(HealthProfile.user_id == current_user.id).first()
+
+    log = todays_log(db, current_user.id)
+    orders = (
+        db.query(Order)
+        .filter(Order.user_id == current_user.id)
+        .order_by(Order.id.desc())
+        .limit(orders_limit)
+        .all()
+    )
+    today = datetime.utcnow().date().isoformat()   # Order.created_at is UTC
+    totals = user_daily_nutrition(db, current_user.id, today, today).get(today)
+
+    return {
+        "status": {
+            "has_profile": profile_db is not None and current_user.profile_completed == 1,
+            "onboarding_step": current_user.onboarding_step,
+            "user_id": current_user.id,
+            "name": current_user.name
+        },
+        "profile": format_health_profile(profile_db, current_user.name) if profile_db else None,
+        # Cached and single-flighted, so usually no queries at all
+        "menu": scored_menu(db, scoring_profile(profile_db)),
+        "daily_log": {
+            "date": log.date if log else daily_logs.today(),
+            "water_intake_ml": log.water_intake_ml if log else 0,
+            "steps": log.steps if log else 0,
+            "mood": log.mood if log else "Neutral"
+        },
+        "today": {
+            "date": today,
+            "orders": totals.orders if totals else 0,
+            "calories": round(totals.calories or 0, 1) if totals else 0,
+            "sugar": round(totals.sugar or 0, 1) if totals else 0,
+            "sodium": round(totals.sodium or 0, 1) if totals else 0
+        },
+        "recent_orders": [{f: getattr(o, f) for f in ORDER_FIELDS} for o in orders]
+    }
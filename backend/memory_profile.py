@@ -0,0 +1,188 @@
+"""tracemalloc snapshots, diffs and top allocating lines (admin only).
+
+Typical leak hunt on a live worker:
+    POST   /api/admin/performance/memory/start      {"frames": 10}
+    POST   /api/admin/performance/memory/snapshots  {"label": "before lunch"}
+    ... traffic ...
+    POST   /api/admin/performance/memory/snapshots  {"label": "after lunch"}
+    GET    /api/admin/performance/memory/diff?base=1&current=2
+    POST   /api/admin/performance/memory/stop
+
+tracemalloc slows allocation-heavy code noticeably and its own bookkeeping
+grows with the number of live blocks, so it is off until started (or until
+the process is launched with PYTHONTRACEMALLOC=N). Snapshots are kept in
+memory, at most MAX_SNAPSHOTS of them, oldest dropped first.
+
+All of this state belongs to one process. Under serve.py each request goes to
+whichever worker accepts it, so a trace started on one worker is not running
+on the others, and a snapshot id only exists on the worker that took it. Every
+response carries that worker's "pid"; for a leak hunt, run a single worker
+(`python serve.py --workers 1 --max-requests 0`).
+scripts/soak_memory.py drives the hot endpoints and checks that growth stays
+bounded.
+"""
+import gc
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MAX_SNAPSHOTS = 8
+
+# Allocations made by tracemalloc itself, by linecache (source lines shown in
+# reports) and by the import machinery are noise
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_lock = threading.Lock()
+_snapshots = OrderedDict()    # id -> (label, taken_at, Snapshot, traced bytes)
+_next_id = 1
+
+
+def rss_bytes():
+    """Resident set size of this process, or None where it can't be read cheaply."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return None
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        import resource
+        # ru_maxrss is the peak, in bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError):
+        return None
+
+
+def status():
+    current, peak = tracemalloc.get_traced_memory()
+    rss = rss_bytes()
+    with _lock:
+        snapshots = [
+            {"id": sid, "label": label, "taken_at": taken_at, "traced_kb": round(traced / 1024, 1)}
+            for sid, (label, taken_at, _, traced) in _snapshots.items()
+        ]
+    return {
+        "pid": os.getpid(),
+        "tracing": tracemalloc.is_tracing(),
+        "frames": tracemalloc.get_traceback_limit(),
+        "traced_kb": round(current / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+        "overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+        "rss_kb": round(rss / 1024, 1) if rss is not None else None,
+        "gc_objects": len(gc.get_objects()),
+        "snapshots": snapshots,
+    }
+
+
+def start(frames=10):
+    """Start tracing with `frames` frames per traceback (restarts if the depth changes)."""
+    if tracemalloc.is_tracing():
+        if tracemalloc.get_traceback_limit() == frames:
+            return
+        tracemalloc.stop()
+    tracemalloc.start(frames)
+
+
+def stop():
+    """Stop tracing and drop all snapshots (they can't be compared with a new trace)."""
+    tracemalloc.stop()
+    with _lock:
+        _snapshots.clear()
+
+
+def _take(collect=True):
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not running; start it first")
+    if collect:
+        gc.collect()
+    snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    return snapshot, tracemalloc.get_traced_memory()[0]
+
+
+def take_snapshot(label=None, collect=True):
+    """Store a snapshot and return its id."""
+    global _next_id
+    snapshot, traced = _take(collect)
+    with _lock:
+        sid = _next_id
+        _next_id += 1
+        _snapshots[sid] = (label or f"snapshot {sid}", time.time(), snapshot, traced)
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return sid
+
+
+def get_snapshot(sid):
+    with _lock:
+        entry = _snapshots.get(sid)
+    return entry[2] if entry else None
+
+
+def clear():
+    with _lock:
+        _snapshots.clear()
+
+
+def _where(frame):
+    filename = frame.filename
+    if filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    return f"{filename}:{frame.lineno}"
+
+
+def _describe(traceback, key_type):
+    frame = traceback[-1]     # frames run oldest first
+    entry = {"where": _where(frame) if key_type != "filename" else frame.filename}
+    if key_type == "lineno":
+        entry["code"] = linecache.getline(frame.filename, frame.lineno).strip()
+    elif key_type == "traceback":
+        entry["traceback"] = [_where(f) for f in traceback]
+    return entry
+
+
+def top(snapshot, limit=20, key_type="lineno"):
+    """Biggest live allocations grouped by line, file or full traceback."""
+    return [
+        {**_describe(stat.traceback, key_type), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics(key_type)[:limit]
+    ]
+
+
+def diff(base, current=None, limit=20, key_type="lineno"):
+    """Growth from `base` to `current` (a fresh snapshot when omitted), largest first."""
+    if current is None:
+        current, _ = _take()
+    return [
+        {**_describe(stat.traceback, key_type),
+         "size_diff_kb": round(stat.size_diff / 1024, 1), "size_kb": round(stat.size / 1024, 1),
+         "count_diff": stat.count_diff, "count": stat.count}
+        for stat in current.compare_to(base, key_type)[:limit]
+    ]
@@ -1,45 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from database import get_db
 from dependencies import get_current_user
-from models import User, HealthProfile, Order, FoodItem
+from models import User, HealthProfile, Order, OrderItem, FoodItem
 
-from schemas import OrderCreate, OrderResponse
+from schemas import OrderCreate, OrderResponse, OrderHistoryPage, OrderHistorySummary, MenuItemResponse
+from typing import List, Optional, Union
 from chatbot_engine import HealthChatbot
+from collections import Counter
 import json
+import cache
+import rollups
+from query_stats import query_budget
 
 router = APIRouter(
     prefix="/api/menu",
     tags=["menu"]
 )
 
-@router.get("/intelligent")
-async def get_intelligent_menu(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    # Fetch real food items added by the admin from DB
-    db_foods = db.query(FoodItem).filter(FoodItem.is_available == True).all()
-    food_items = []
-    
-    for f in db_foods:
-        food_items.append({
-            "id": f.id,
-            "name": f.name,
-            "category": f.category,
-            "price": f.price,
-            "image": f.image_emoji,  # map image_emoji to image for the frontend
-            "calories": f.calories,
-            "sugar": f.sugar,
-            "protein": f.protein,
-            "sodium": f.sodium,
-            "carbs": f.carbs,
-            "description": f.description or ""
-        })
-
-    # Get user profile
-    profile_db = db.query(HealthProfile).filter(HealthProfile.user_id == current_user.id).first()
-    
+LOW_GI_KEYWORDS = ['quinoa', 'oats', 'lentils', 'broccoli', 'almonds', 'nuts', 'seeds']
+MENU_TTL = 300
+
+
+def menu_item(f):
+    """Plain-dict view of a FoodItem as the menu pages expect it."""
+    return {
+        "id": f.id,
+        "name": f.name,
+        "category": f.category,
+        "price": f.price,
+        "image": f.image_emoji,  # map image_emoji to image for the frontend
+        "calories": f.calories,
+        "sugar": f.sugar,
+        "protein": f.protein,
+        "sodium": f.sodium,
+        "carbs": f.carbs,
+        "description": f.description or ""
+    }
+
+
+def scoring_profile(profile_db):
+    """Profile dict used by the scoring engine; defaults when the user has none."""
     # Simple profile if none exists
     profile = {
         "age": 25,
@@ -64,7 +66,14 @@ async def get_intelligent_menu(
             "dietary_preference": profile_db.dietary_preference or "Non-Veg",
             "target_calories": 2000 
         }
+    return profile
 
+
+def score_menu(food_items, profile):
+    """Attach match score, risk level, insight and tag to each menu item.
+
+    Pure function over plain dicts, so it is safe to run off the request thread.
+    """
     # Initialize Chatbot Engine for analysis
     engine = HealthChatbot({}, food_items, [])
     
@@ -88,9 +97,8 @@ async def get_intelligent_menu(
             item_copy['insight'] = f"Restricted: {', '.join(penalties)}" if penalties else "High risk for your profile."
         
         # Assign tag based on nutrition
-        low_gi_keywords = ['quinoa', 'oats', 'lentils', 'broccoli', 'almonds', 'nuts', 'seeds']
         if item.get('sugar', 0) == 0: item_copy['tag'] = "Sugar Free"
-        elif any(k in item['name'].lower() for k in low_gi_keywords): item_copy['tag'] = "Low GI"
+        elif any(k in item['name'].lower() for k in LOW_GI_KEYWORDS): item_copy['tag'] = "Low GI"
         elif item.get('carbs', 0) < 20: item_copy['tag'] = "Low Carb"
         elif item.get('protein', 0) > 25: item_copy['tag'] = "High Protein"
         elif item.get('sugar', 0) < 5: item_copy['tag'] = "Low Sugar"
@@ -101,6 +109,29 @@ async def get_intelligent_menu(
     return intelligent_menu
 
 
+@cache.cached("menu", ttl=MENU_TTL)
+def available_menu(db: Session):
+    """menu_item() dicts for every available food. Shared between requests; don't mutate."""
+    return [menu_item(f) for f in db.query(FoodItem).filter(FoodItem.is_available == True).all()]
+
+
+@cache.cached("menu", ttl=MENU_TTL)
+def scored_menu(db: Session, profile: dict):
+    """score_menu() over the available menu, once per distinct scoring profile."""
+    return score_menu(available_menu(db), profile)
+
+
+@router.get("/intelligent", response_model=List[MenuItemResponse])
+@query_budget(3)
+async def get_intelligent_menu(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    profile_db = db.query(HealthProfile).filter(HealthProfile.user_id == current_user.id).first()
+    # Scoring (and the menu query on a miss) runs in the threadpool, coalesced per profile
+    return await scored_menu.in_threadpool(db, scoring_profile(profile_db))
+
+
 @router.post("/order")
 async def place_order(
     order_data: OrderCreate,
@@ -115,15 +146,87 @@ async def place_order(
         total_sugar=order_data.total_sugar,
         total_sodium=order_data.total_sodium
     )
+    # Snapshot line items so sales can be attributed per food/category
+    qty_by_food = Counter(order_data.items)
+    foods = db.query(FoodItem).filter(FoodItem.id.in_(list(qty_by_food))).all() if qty_by_food else []
+    for f in foods:
+        qty = qty_by_food[f.id]
+        new_order.order_items.append(OrderItem(
+            food_id=f.id,
+            food_name=f.name,
+            qty=qty,
+            unit_price=f.price,
+            subtotal=(f.price or 0) * qty,
+        ))
     db.add(new_order)
+    db.flush()
+
+    rollups.record_order(db, new_order)
     db.commit()
     db.refresh(new_order)
     return new_order
 
-@router.get("/history")
-async def get_order_history(
+def _item_count(items):
+    try:
+        return len(json.loads(items)) if items else 0
+    except (json.JSONDecodeError, TypeError):
+        return 0
+
+
+@router.get("/history", response_model=Union[OrderHistoryPage, OrderHistorySummary])
+@query_budget(2)
+def get_order_history(
+    cursor: Optional[int] = Query(None, description="Order id to continue after (from next_cursor)"),
+    limit: int = Query(20, ge=1, le=100),
+    group_by: Optional[str] = Query(None, pattern="^month$"),
+    months: int = Query(12, ge=1, le=120),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.id.desc()).all()
-    return orders
+    """Newest-first order history, one page at a time (keyset on Order.id).
+
+    With group_by=month, returns per-month order counts and totals for the
+    last `months` months that had orders instead, aggregated in SQL.
+    """
+    if group_by == "month":
+        month = func.substr(Order.created_at, 1, 7)
+        rows = (
+            db.query(
+                month.label("month"),
+                func.count(Order.id),
+                func.coalesce(func.sum(Order.total_price), 0),
+                func.coalesce(func.sum(Order.total_calories), 0),
+            )
+            .filter(Order.user_id == current_user.id)
+            .group_by(month)
+            .order_by(month.desc())
+            .limit(months)
+            .all()
+        )
+        return {"months": [
+            {"month": m, "orders": n, "total_price": round(price, 2), "total_calories": round(cal, 1)}
+            for m, n, price, cal in rows
+        ]}
+
+    q = db.query(
+        Order.id, Order.created_at, Order.items, Order.total_price, Order.total_calories, Order.status
+    ).filter(Order.user_id == current_user.id)
+    if cursor is not None:
+        q = q.filter(Order.id < cursor)
+    rows = q.order_by(Order.id.desc()).limit(limit + 1).all()
+
+    page = rows[:limit]
+    return {
+        "orders": [
+            {
+                "id": r.id,
+                "created_at": r.created_at,
+                "item_count": _item_count(r.items),
+                "total_price": r.total_price,
+                "total_calories": r.total_calories,
+                "status": r.status,
+            }
+            for r in page
+        ],
+        "next_cursor": page[-1].id if len(rows) > limit else None,
+    }
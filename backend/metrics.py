@@ -0,0 +1,132 @@
+"""Request metrics in Prometheus text format (GET /metrics).
+
+MetricsMiddleware is a plain ASGI middleware (no BaseHTTPMiddleware task
+overhead) that records, per route template and method:
+- a latency histogram (LATENCY_BUCKETS, seconds),
+- response counts by status code,
+- DB statements and DB time, counted by the query_stats engine hooks into
+  a per-request slot carried in a ContextVar (sync endpoints run in the
+  threadpool with a copy of the context, so the slot follows them),
+plus the number of requests in flight.
+
+All updates happen on the event loop thread, so no locks are taken on the hot
+path. scripts/bench_metrics_overhead.py measures the per-request cost.
+"""
+import time
+from bisect import bisect_left
+
+import query_stats
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "total", "count", "statuses", "db_queries", "db_seconds")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)   # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.statuses = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self.routes = {}      # (method, route template) -> _RouteStats
+        self.in_flight = 0
+        self.started = time.time()
+
+    def observe(self, method, route, status, seconds, db_queries, db_seconds):
+        stats = self.routes.get((method, route))
+        if stats is None:
+            stats = self.routes[(method, route)] = _RouteStats()
+        stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        stats.total += seconds
+        stats.count += 1
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.db_queries += db_queries
+        stats.db_seconds += db_seconds
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP process_start_time_seconds Start time of the process since unix epoch.",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {self.started:.3f}",
+        ]
+        routes = sorted(self.routes.items())
+
+        lines += ["# HELP http_request_duration_seconds Request latency by route.",
+                  "# TYPE http_request_duration_seconds histogram"]
+        for (method, route), s in routes:
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, s.buckets):
+                cumulative += n
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {s.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {s.total:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {s.count}")
+
+        lines += ["# HELP http_responses_total Responses by route and status code.",
+                  "# TYPE http_responses_total counter"]
+        for (method, route), s in routes:
+            for status, n in sorted(s.statuses.items()):
+                lines.append(f'http_responses_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {n}')
+
+        lines += ["# HELP http_db_queries_total SQL statements executed while serving the route.",
+                  "# TYPE http_db_queries_total counter"]
+        for (method, route), s in routes:
+            lines.append(f'http_db_queries_total{{method="{method}",route="{_escape(route)}"}} {s.db_queries}')
+
+        lines += ["# HELP http_db_seconds_total Time spent in SQL statements while serving the route.",
+                  "# TYPE http_db_seconds_total counter"]
+        for (method, route), s in routes:
+            lines.append(f'http_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {s.db_seconds:.6f}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registry = Registry()
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: Registry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        reg = self.registry
+        status = 500
+        db, token = query_stats.begin_request(scope)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        reg.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            reg.in_flight -= 1
+            query_stats.end_request(token)
+            route = scope.get("route")
+            reg.observe(scope["method"], route.path if route is not None else "<unmatched>", status, elapsed,
+                        db.count, db.seconds)
+
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, Text, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -15,6 +15,8 @@ class User(Base):
     disabled = Column(Integer, default=0)
     profile_completed = Column(Integer, default=0)
     onboarding_step = Column(Integer, default=0)
+    # ISO UTC timestamp, like Order.created_at; NULL for accounts created before it was recorded
+    created_at = Column(String, default=lambda: datetime.utcnow().isoformat())
 
     health_profile = relationship("HealthProfile", back_populates="user", uselist=False)
     orders = relationship("Order", back_populates="user")
@@ -110,12 +112,18 @@ class Order(Base):
     user = relationship("User", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order")
 
+    __table_args__ = (
+        # Serves status + date-range aggregations (top spenders, exports)
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_user_id", "user_id"),
+    )
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     food_id = Column(Integer, ForeignKey("food_items.id"), nullable=True)
     food_name = Column(String)          # snapshot at time of order
     qty = Column(Integer, default=1)
@@ -127,6 +135,53 @@ class OrderItem(Base):
     food = relationship("FoodItem", back_populates="order_items")
 
 
+# ─── SALES ROLLUP ──────────────────────────────────────────────────────────────
+
+class DailySalesRollup(Base):
+    """Pre-aggregated sales per (date, hour, category, food, status).
+
+    Rows with category "" and food_id 0 hold order-level totals (order count and
+    the order's total_price); the other rows hold per-food line totals.
+    Maintained incrementally by rollups.py — never write to it directly.
+    """
+    __tablename__ = "daily_sales_rollup"
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(String, nullable=False)           # YYYY-MM-DD taken from Order.created_at
+    hour = Column(Integer, nullable=False)
+    category = Column(String, nullable=False, default="")
+    food_id = Column(Integer, nullable=False, default=0)
+    status = Column(String, nullable=False)         # pending | completed | cancelled
+    food_name = Column(String, nullable=True)
+    orders = Column(Integer, default=0)
+    qty = Column(Integer, default=0)
+    revenue = Column(Float, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("date", "hour", "category", "food_id", "status", name="uq_daily_sales_rollup_bucket"),
+    )
+
+
+class UserDailyNutrition(Base):
+    """Per-user nutrient totals per day from non-cancelled orders (see rollups.py)."""
+    __tablename__ = "user_daily_nutrition"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    date = Column(String, nullable=False)           # YYYY-MM-DD taken from Order.created_at
+    orders = Column(Integer, default=0)
+    calories = Column(Float, default=0)
+    sugar = Column(Float, default=0)
+    sodium = Column(Float, default=0)
+    protein = Column(Float, default=0)
+    carbs = Column(Float, default=0)
+    fat = Column(Float, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", name="uq_user_daily_nutrition_day"),
+    )
+
+
 # ─── DAILY LOG ─────────────────────────────────────────────────────────────────
 
 class DailyLog(Base):
@@ -142,6 +197,11 @@ class DailyLog(Base):
 
     user = relationship("User", back_populates="daily_logs")
 
+    __table_args__ = (
+        # One row per user per day; writes go through daily_logs.apply_deltas
+        Index("uq_daily_logs_user_date", "user_id", "date", unique=True),
+    )
+
 
 # ─── AUDIT LOGS ────────────────────────────────────────────────────────────────
 
@@ -0,0 +1,263 @@
+"""On-demand sampling profiler for slow endpoints (admin toggle).
+
+An admin arms the profiler with POST /api/admin/performance/profiler, giving
+a path prefix, an optional method, a sampling rate and a time limit. While it
+is armed, ProfilerMiddleware picks matching requests at that rate. For each
+picked request, a sampler thread reads sys._current_frames() every
+interval_ms until the response is sent. It keeps the stacks of threads that
+are running backend code: the event loop for async endpoints and the
+threadpool worker for sync ones.
+
+Traces go into a ring buffer of the last MAX_TRACES. They can be downloaded as
+speedscope JSON (https://www.speedscope.app) or as collapsed stacks for
+flamegraph.pl. The sampler sees the whole process, so a request that overlaps
+other requests on the same worker can pick up their stacks too. Each trace
+records the number of requests in flight when it started. Requests to the
+profiler's own endpoints are never picked, whatever prefix is armed.
+
+Disarmed, the middleware costs one global read per request.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+
+import log_config
+import metrics
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+MAX_TRACES = 20
+MAX_STACK_DEPTH = 128
+# Polling or downloading traces must not use up captures or fill the buffer
+SELF_PREFIX = "/api/admin/performance/profiler"
+
+_settings = None          # armed Settings, or None
+_traces = deque(maxlen=MAX_TRACES)
+
+
+class Settings:
+    __slots__ = ("path_prefix", "method", "sample_rate", "interval", "expires_at", "remaining")
+
+    def __init__(self, path_prefix, method, sample_rate, interval_ms, duration_s, max_requests):
+        self.path_prefix = path_prefix
+        self.method = method.upper() if method else None
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.expires_at = time.time() + duration_s
+        self.remaining = max_requests
+
+    def as_dict(self):
+        return {
+            "path_prefix": self.path_prefix,
+            "method": self.method,
+            "sample_rate": self.sample_rate,
+            "interval_ms": self.interval * 1000,
+            "expires_at": self.expires_at,
+            "remaining": self.remaining,
+        }
+
+
+def arm(path_prefix="/api/", method=None, sample_rate=1.0, interval_ms=2.0, duration_s=300, max_requests=MAX_TRACES):
+    global _settings
+    _settings = Settings(path_prefix, method, sample_rate, interval_ms, duration_s, max_requests)
+    return _settings
+
+
+def disarm():
+    global _settings
+    _settings = None
+
+
+def status():
+    settings = _settings
+    if settings is not None and settings.expires_at < time.time():
+        disarm()
+        settings = None
+    return settings.as_dict() if settings else None
+
+
+def traces():
+    return [t.summary() for t in reversed(_traces)]
+
+
+def get_trace(trace_id):
+    for trace in _traces:
+        if trace.id == trace_id:
+            return trace
+    return None
+
+
+def clear():
+    _traces.clear()
+
+
+def _take(scope):
+    """Decide whether this request is profiled; consumes one of the remaining captures."""
+    global _settings
+    settings = _settings
+    if settings is None:
+        return None
+    if settings.expires_at < time.time() or settings.remaining <= 0:
+        _settings = None
+        return None
+    path = scope["path"]
+    if not path.startswith(settings.path_prefix) or path.startswith(SELF_PREFIX):
+        return None
+    if settings.method and scope["method"] != settings.method:
+        return None
+    if settings.sample_rate < 1 and random.random() >= settings.sample_rate:
+        return None
+    settings.remaining -= 1
+    return settings
+
+
+# --- sampling -------------------------------------------------------------
+
+def _stack(frame):
+    """Root-first tuple of (name, file, line) for a thread, or None if it isn't running backend code."""
+    frames = []
+    ours = False
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        filename = code.co_filename
+        if filename.startswith(BACKEND_DIR):
+            ours = True
+        frames.append((code.co_name, filename, code.co_firstlineno))
+        frame = frame.f_back
+    if not ours:
+        return None
+    frames.reverse()
+    return tuple(frames)
+
+
+class Trace:
+    def __init__(self, scope, interval):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.route = None
+        self.request_id = log_config.request_id.get()
+        self.interval = interval
+        self.started = time.time()
+        self.duration = 0.0
+        self.status = None
+        self.concurrent = metrics.registry.in_flight
+        self.samples = {}          # thread name -> Counter(stack -> n)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = _stack(frame)
+                if stack is None:
+                    continue
+                if ident not in names:
+                    names.update((t.ident, t.name) for t in threading.enumerate())
+                name = names.get(ident, str(ident))
+                self.samples.setdefault(name, Counter())[stack] += 1
+
+    def summary(self):
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "request_id": self.request_id,
+            "started_at": self.started,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": sum(sum(c.values()) for c in self.samples.values()),
+            "interval_ms": self.interval * 1000,
+            "concurrent_requests": self.concurrent,
+        }
+
+    def speedscope(self):
+        """speedscope file format: one sampled profile per thread, weights in milliseconds."""
+        frame_index = {}
+        frames = []
+        profiles = []
+        weight = self.interval * 1000
+        for thread, counter in self.samples.items():
+            samples, weights = [], []
+            for stack, n in counter.items():
+                indices = []
+                for name, filename, line in stack:
+                    key = (name, filename, line)
+                    idx = frame_index.get(key)
+                    if idx is None:
+                        idx = frame_index[key] = len(frames)
+                        frames.append({"name": name, "file": filename, "line": line})
+                    indices.append(idx)
+                samples.append(indices)
+                weights.append(n * weight)
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path} ({self.id})",
+            "exporter": "healthbite-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+    def collapsed(self):
+        """Brendan Gregg's collapsed-stack format (thread;frame;frame count) for flamegraph.pl."""
+        lines = []
+        for thread, counter in self.samples.items():
+            for stack, n in counter.items():
+                names = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+                lines.append(f"{thread};{names} {n}")
+        return "\n".join(lines) + "\n"
+
+
+class ProfilerMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _settings is None or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        settings = _take(scope)
+        if settings is None:
+            return await self.app(scope, receive, send)
+
+        trace = Trace(scope, settings.interval)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                trace.status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        trace.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace.stop()
+            trace.duration = time.perf_counter() - start
+            route = scope.get("route")
+            trace.route = route.path if route is not None else None
+            _traces.append(trace)
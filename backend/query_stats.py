@@ -0,0 +1,211 @@
+"""SQL statement instrumentation: per-request counts, fingerprints, slow-query log.
+
+instrument(engine) hooks before/after_cursor_execute and keeps:
+- per request (ContextVar slot opened by MetricsMiddleware): statement count
+  and DB time, and a check against the route's declared query budget;
+- process-wide: count / total / max time per statement fingerprint (literals
+  and IN-lists collapsed), for the admin top-N report;
+- a ring buffer of statements slower than SLOW_QUERY_MS with their
+  EXPLAIN QUERY PLAN, which are also logged as warnings.
+
+Budgets are declared on endpoints with @query_budget(n). Exceeding one is
+recorded and logged; with QUERY_BUDGET_STRICT=1 (or STRICT = True, as the test
+suite does) the offending statement raises QueryBudgetExceeded instead, so the
+request fails.
+"""
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+STRICT = os.environ.get("QUERY_BUDGET_STRICT", "") == "1"
+MAX_FINGERPRINTS = 1000
+SLOW_LOG_SIZE = 50
+VIOLATION_LOG_SIZE = 50
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries: int):
+    """Declare how many SQL statements an endpoint may issue (auth included)."""
+    def mark(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return mark
+
+
+class RequestSlot:
+    __slots__ = ("scope", "count", "seconds", "budget", "over")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.budget = False      # False = not looked up yet, None = no budget
+        self.over = False
+
+
+_slot: ContextVar = ContextVar("query_stats_slot", default=None)
+
+
+def begin_request(scope=None):
+    """Open a slot for the current request; returns (slot, token for end_request)."""
+    slot = RequestSlot(scope)
+    return slot, _slot.set(slot)
+
+
+def end_request(token):
+    _slot.reset(token)
+
+
+def current():
+    return _slot.get()
+
+
+# --- fingerprints ---------------------------------------------------------
+
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+_fingerprint_cache = {}
+
+
+def fingerprint(statement: str) -> str:
+    fp = _fingerprint_cache.get(statement)
+    if fp is None:
+        fp = _SPACE_RE.sub(" ", statement).strip()
+        fp = _STRING_RE.sub("?", fp)
+        fp = _NUMBER_RE.sub("?", fp)
+        fp = _IN_LIST_RE.sub("(...)", fp)
+        if len(_fingerprint_cache) < 4 * MAX_FINGERPRINTS:
+            _fingerprint_cache[statement] = fp
+    return fp
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements = {}     # fingerprint -> [count, total_s, max_s]
+        self.slow = deque(maxlen=SLOW_LOG_SIZE)
+        self.violations = deque(maxlen=VIOLATION_LOG_SIZE)
+        self.since = time.time()
+
+    def record(self, fp, seconds):
+        with self.lock:
+            entry = self.statements.get(fp)
+            if entry is None:
+                if len(self.statements) >= MAX_FINGERPRINTS:
+                    fp = "<other>"
+                entry = self.statements.setdefault(fp, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+    def top(self, limit=20, sort="total"):
+        key = {"total": lambda e: e[1][1], "count": lambda e: e[1][0], "max": lambda e: e[1][2],
+               "mean": lambda e: e[1][1] / e[1][0]}[sort]
+        with self.lock:
+            rows = sorted(self.statements.items(), key=key, reverse=True)[:limit]
+        return [
+            {"statement": fp, "count": n, "total_ms": round(total * 1000, 3),
+             "mean_ms": round(total / n * 1000, 3), "max_ms": round(worst * 1000, 3)}
+            for fp, (n, total, worst) in rows
+        ]
+
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+            self.slow.clear()
+            self.violations.clear()
+            self.since = time.time()
+
+
+stats = Stats()
+
+
+def _route_of(slot):
+    return slot.scope.get("route") if slot.scope else None
+
+
+def _check_budget(slot):
+    if slot.budget is False:
+        route = _route_of(slot)
+        slot.budget = getattr(getattr(route, "endpoint", None), "query_budget", None) if route else False
+    if not slot.budget or slot.count <= slot.budget or slot.over:
+        return
+    slot.over = True
+    route = _route_of(slot)
+    message = f"{slot.scope.get('method')} {route.path} issued more than its budget of {slot.budget} queries"
+    stats.violations.append({"route": route.path, "method": slot.scope.get("method"),
+                             "budget": slot.budget, "at": time.time()})
+    if STRICT:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def _explain(conn, statement, parameters):
+    """EXPLAIN QUERY PLAN on the raw DBAPI cursor, so the hooks don't see it."""
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:      # plans are best-effort diagnostics
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        cursor.close()
+
+
+_instrumented = weakref.WeakSet()
+
+
+def instrument(engine):
+    """Attach the statement hooks to `engine` (the app engine from database.py); idempotent."""
+    if engine in _instrumented:
+        return
+    _instrumented.add(engine)
+    perf_counter = time.perf_counter
+    record = stats.record
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_stats_start = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_stats_start", None)
+        if started is None:      # internal statements, and our own EXPLAINs
+            return
+        elapsed = perf_counter() - started
+        fp = _fingerprint_cache.get(statement) or fingerprint(statement)
+        record(fp, elapsed)
+
+        slot = _slot.get()
+        if slot is not None:
+            slot.count += 1
+            slot.seconds += elapsed
+
+        if elapsed * 1000 >= SLOW_QUERY_MS:
+            route = _route_of(slot) if slot is not None else None
+            plan = None if executemany else _explain(conn, statement, parameters)
+            stats.slow.append({"statement": fp, "ms": round(elapsed * 1000, 3), "plan": plan,
+                               "route": route.path if route else None, "at": time.time()})
+            logger.warning("slow query %.1f ms: %s | plan: %s", elapsed * 1000, fp, plan)
+
+        if slot is not None and slot.budget is not None and not slot.over:
+            _check_budget(slot)
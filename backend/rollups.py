@@ -0,0 +1,374 @@
+"""Incrementally maintained order rollups.
+
+- daily_sales_rollup: sales per (date, hour, category, food, status) for the
+  admin dashboards.
+- user_daily_nutrition: per-user nutrient totals per day (non-cancelled
+  orders) for /api/analytics.
+
+The order pipeline (menu.place_order) and admin status changes call
+record_order / move_order_status inside their own transaction, so both tables
+are always consistent with the orders table.
+
+Backfill / repair:
+    python rollups.py rebuild [--since YYYY-MM-DD]
+"""
+import json
+from collections import defaultdict
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
+
+from models import DailySalesRollup, FoodItem, Order, UserDailyNutrition
+import cache
+
+ORDER_CATEGORY = ""          # category of the order-level totals rows
+UNCATEGORIZED = "Other"
+NUTRIENTS = ("calories", "sugar", "sodium", "protein", "carbs", "fat")
+
+
+def _bucket_time(created_at):
+    """Split an ISO created_at string into (date, hour); None if unusable."""
+    if not created_at or len(created_at) < 13:
+        return None
+    try:
+        return created_at[:10], int(created_at[11:13])
+    except ValueError:
+        return None
+
+
+def _line_items(order: Order):
+    """Return [(food_id, food_name, qty, subtotal)] for an order.
+
+    New orders carry order_items rows; legacy orders only have the JSON list of
+    food ids in Order.items (name and subtotal are then None).
+    """
+    if order.order_items:
+        return [(oi.food_id, oi.food_name, oi.qty or 1, oi.subtotal) for oi in order.order_items]
+    try:
+        ids = json.loads(order.items) if order.items else []
+    except (json.JSONDecodeError, TypeError):
+        ids = []
+    counts = defaultdict(int)
+    for fid in ids if isinstance(ids, list) else []:
+        if isinstance(fid, int):
+            counts[fid] += 1
+    return [(fid, None, qty, None) for fid, qty in counts.items()]
+
+
+def _foods_for(db: Session, items):
+    ids = [i[0] for i in items if i[0]]
+    return {f.id: f for f in db.query(FoodItem).filter(FoodItem.id.in_(ids)).all()} if ids else {}
+
+
+def _order_lines(db: Session, order: Order, foods: dict = None):
+    """Return [(food_id, food_name, category, qty, subtotal)] for an order.
+
+    Legacy orders are priced at the food's current price. `foods` is an
+    optional {id: FoodItem} map so bulk callers avoid a lookup per order.
+    """
+    items = _line_items(order)
+    if not items:
+        return []
+    if foods is None:
+        foods = _foods_for(db, items)
+
+    lines = []
+    for fid, name, qty, subtotal in items:
+        f = foods.get(fid)
+        if subtotal is None:
+            if not f:
+                continue  # legacy id of a deleted food — nothing to attribute
+            subtotal = (f.price or 0) * qty
+        lines.append((
+            fid or 0,
+            name or (f.name if f else None),
+            (f.category if f else None) or UNCATEGORIZED,
+            qty,
+            subtotal or 0,
+        ))
+    return lines
+
+
+def _order_nutrition(db: Session, order: Order, foods: dict = None):
+    """{nutrient: amount} for one order.
+
+    Calories, sugar and sodium come from the totals recorded at checkout when
+    present; protein, carbs and fat are summed from the foods ordered.
+    """
+    items = _line_items(order)
+    if foods is None:
+        foods = _foods_for(db, items)
+
+    totals = dict.fromkeys(NUTRIENTS, 0.0)
+    for fid, _, qty, _ in items:
+        f = foods.get(fid)
+        if f:
+            for n in NUTRIENTS:
+                totals[n] += (getattr(f, n) or 0) * qty
+    for n, recorded in (("calories", order.total_calories), ("sugar", order.total_sugar), ("sodium", order.total_sodium)):
+        if recorded:
+            totals[n] = recorded
+    return totals
+
+
+def _order_deltas(db: Session, order: Order, status: str, sign: int, foods: dict = None):
+    """Build {bucket_key: [food_name, orders, qty, revenue]} for one order."""
+    bt = _bucket_time(order.created_at)
+    if bt is None:
+        return {}
+    day, hour = bt
+
+    deltas = {
+        (day, hour, ORDER_CATEGORY, 0, status): [None, sign, 0, sign * (order.total_price or 0)]
+    }
+    for food_id, name, category, qty, subtotal in _order_lines(db, order, foods):
+        key = (day, hour, category, food_id, status)
+        row = deltas.setdefault(key, [name, 0, 0, 0.0])
+        row[1] += sign
+        row[2] += sign * qty
+        row[3] += sign * subtotal
+    return deltas
+
+
+def _apply(db: Session, deltas: dict):
+    if not deltas:
+        return
+    values = [
+        {
+            "date": k[0], "hour": k[1], "category": k[2], "food_id": k[3], "status": k[4],
+            "food_name": v[0], "orders": v[1], "qty": v[2], "revenue": v[3],
+        }
+        for k, v in deltas.items()
+    ]
+    stmt = sqlite_insert(DailySalesRollup).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["date", "hour", "category", "food_id", "status"],
+        set_={
+            "orders": DailySalesRollup.orders + stmt.excluded.orders,
+            "qty": DailySalesRollup.qty + stmt.excluded.qty,
+            "revenue": DailySalesRollup.revenue + stmt.excluded.revenue,
+        },
+    )
+    db.execute(stmt)
+
+
+def _nutrition_row(order: Order, totals: dict, sign: int):
+    return {
+        "user_id": order.user_id,
+        "date": order.created_at[:10],
+        "orders": sign,
+        **{n: sign * totals[n] for n in NUTRIENTS},
+    }
+
+
+def _apply_nutrition(db: Session, rows: list):
+    if not rows:
+        return
+    stmt = sqlite_insert(UserDailyNutrition).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "date"],
+        set_={
+            col: getattr(UserDailyNutrition, col) + getattr(stmt.excluded, col)
+            for col in ("orders",) + NUTRIENTS
+        },
+    )
+    db.execute(stmt)
+
+
+def _counts_for_nutrition(order: Order, status: str) -> bool:
+    return bool(order.user_id) and status != "cancelled" and _bucket_time(order.created_at) is not None
+
+
+def record_order(db: Session, order: Order):
+    """Add a freshly placed order to the rollups. Call BEFORE db.commit()."""
+    status = order.status or "completed"
+    _apply(db, _order_deltas(db, order, status, +1))
+    if _counts_for_nutrition(order, status):
+        _apply_nutrition(db, [_nutrition_row(order, _order_nutrition(db, order), +1)])
+    cache.mark_dirty(db, "orders")
+
+
+def move_order_status(db: Session, order: Order, old_status: str, new_status: str):
+    """Move an order's contribution between status buckets. Call BEFORE db.commit()."""
+    # Legacy orders with no status were rolled up as completed (record_order, rebuild)
+    old_status = old_status or "completed"
+    deltas = _order_deltas(db, order, old_status, -1)
+    for key, val in _order_deltas(db, order, new_status, +1).items():
+        deltas[key] = val
+    _apply(db, deltas)
+
+    # Nutrition only changes when an order enters or leaves "cancelled"
+    was, now = _counts_for_nutrition(order, old_status), _counts_for_nutrition(order, new_status)
+    if was != now:
+        _apply_nutrition(db, [_nutrition_row(order, _order_nutrition(db, order), +1 if now else -1)])
+    cache.mark_dirty(db, "orders")
+
+
+def rebuild(db: Session, since: str = None) -> int:
+    """Recompute both rollups from the orders table. Returns the number of orders scanned."""
+    q_del = db.query(DailySalesRollup)
+    q_del_nutrition = db.query(UserDailyNutrition)
+    q_orders = db.query(Order)
+    if since:
+        q_del = q_del.filter(DailySalesRollup.date >= since)
+        q_del_nutrition = q_del_nutrition.filter(UserDailyNutrition.date >= since)
+        q_orders = q_orders.filter(Order.created_at >= since)
+    q_del.delete(synchronize_session=False)
+    q_del_nutrition.delete(synchronize_session=False)
+
+    foods = {f.id: f for f in db.query(FoodItem).all()}
+    totals = {}
+    nutrition = {}
+    scanned = 0
+    for order in q_orders.options(selectinload(Order.order_items)).yield_per(1000):
+        status = order.status or "completed"
+        for key, val in _order_deltas(db, order, status, +1, foods).items():
+            row = totals.setdefault(key, [val[0], 0, 0, 0.0])
+            row[1] += val[1]
+            row[2] += val[2]
+            row[3] += val[3]
+        if _counts_for_nutrition(order, status):
+            day = nutrition.setdefault((order.user_id, order.created_at[:10]), dict.fromkeys(("orders",) + NUTRIENTS, 0))
+            day["orders"] += 1
+            for n, v in _order_nutrition(db, order, foods).items():
+                day[n] += v
+        scanned += 1
+
+    if totals:
+        db.bulk_insert_mappings(DailySalesRollup, [
+            {
+                "date": k[0], "hour": k[1], "category": k[2], "food_id": k[3], "status": k[4],
+                "food_name": v[0], "orders": v[1], "qty": v[2], "revenue": v[3],
+            }
+            for k, v in totals.items()
+        ])
+    if nutrition:
+        db.bulk_insert_mappings(UserDailyNutrition, [
+            {"user_id": uid, "date": day, **vals} for (uid, day), vals in nutrition.items()
+        ])
+    cache.mark_dirty(db, "orders")
+    db.commit()
+    return scanned
+
+
+def backfill_if_empty(db: Session) -> int:
+    """Build the rollups once for databases that predate them. Returns orders scanned."""
+    sales_missing = (
+        db.query(DailySalesRollup.id).first() is None
+        and db.query(Order.id).first() is not None
+    )
+    nutrition_missing = (
+        db.query(UserDailyNutrition.id).first() is None
+        and db.query(Order.id).filter(Order.user_id.isnot(None), Order.status != "cancelled").first() is not None
+    )
+    if sales_missing or nutrition_missing:
+        return rebuild(db)
+    return 0
+
+
+# ─── READ HELPERS ──────────────────────────────────────────────────────────────
+
+def _filtered(q, start=None, end=None, status=None):
+    if start:
+        q = q.filter(DailySalesRollup.date >= start)
+    if end:
+        q = q.filter(DailySalesRollup.date <= end)
+    if status:
+        q = q.filter(DailySalesRollup.status == status)
+    return q
+
+
+def order_totals(db: Session, start=None, end=None, status=None):
+    """(revenue, order_count) over a date range, from the order-level rows."""
+    q = db.query(
+        func.coalesce(func.sum(DailySalesRollup.revenue), 0),
+        func.coalesce(func.sum(DailySalesRollup.orders), 0),
+    ).filter(DailySalesRollup.category == ORDER_CATEGORY)
+    revenue, orders = _filtered(q, start, end, status).one()
+    return float(revenue or 0), int(orders or 0)
+
+
+def orders_by_hour(db: Session, start: str, end: str = None):
+    """{hour: order_count} for a single date, or a date range if `end` is given."""
+    q = db.query(DailySalesRollup.hour, func.sum(DailySalesRollup.orders)).filter(
+        DailySalesRollup.category == ORDER_CATEGORY
+    )
+    rows = _filtered(q, start, end or start).group_by(DailySalesRollup.hour).all()
+    return {h: int(n or 0) for h, n in rows}
+
+
+def daily_totals(db: Session, start=None, end=None, status=None):
+    """[(date, revenue, orders)] sorted by date."""
+    q = db.query(
+        DailySalesRollup.date, func.sum(DailySalesRollup.revenue), func.sum(DailySalesRollup.orders)
+    ).filter(DailySalesRollup.category == ORDER_CATEGORY)
+    rows = _filtered(q, start, end, status).group_by(DailySalesRollup.date).order_by(DailySalesRollup.date).all()
+    return [(d, float(r or 0), int(n or 0)) for d, r, n in rows]
+
+
+def revenue_by_category(db: Session, start=None, end=None, status="completed"):
+    """{category: revenue} from the per-food line rows."""
+    q = db.query(DailySalesRollup.category, func.sum(DailySalesRollup.revenue)).filter(
+        DailySalesRollup.category != ORDER_CATEGORY
+    )
+    rows = _filtered(q, start, end, status).group_by(DailySalesRollup.category).all()
+    return {c: float(r or 0) for c, r in rows}
+
+
+
+def food_totals(db: Session, start=None, end=None, status="completed", food_ids=None, limit=None):
+    """[(food_id, food_name, orders, qty, revenue)] ordered by orders desc."""
+    orders_sum = func.sum(DailySalesRollup.orders)
+    q = db.query(
+        DailySalesRollup.food_id,
+        func.max(DailySalesRollup.food_name),
+        orders_sum,
+        func.sum(DailySalesRollup.qty),
+        func.sum(DailySalesRollup.revenue),
+    ).filter(DailySalesRollup.category != ORDER_CATEGORY, DailySalesRollup.food_id != 0)
+    if food_ids is not None:
+        q = q.filter(DailySalesRollup.food_id.in_(food_ids))
+    q = _filtered(q, start, end, status).group_by(DailySalesRollup.food_id).order_by(orders_sum.desc())
+    if limit:
+        q = q.limit(limit)
+    return [(fid, name, int(o or 0), int(n or 0), float(r or 0)) for fid, name, o, n, r in q.all()]
+
+
+def category_weekday_orders(db: Session, start=None, end=None, status="completed"):
+    """{(category, weekday): orders} with weekday 0=Monday … 6=Sunday."""
+    weekday = func.strftime("%w", DailySalesRollup.date)   # SQLite: 0=Sunday
+    q = db.query(DailySalesRollup.category, weekday, func.sum(DailySalesRollup.orders)).filter(
+        DailySalesRollup.category != ORDER_CATEGORY
+    )
+    rows = _filtered(q, start, end, status).group_by(DailySalesRollup.category, weekday).all()
+    return {(c, (int(w) + 6) % 7): int(n or 0) for c, w, n in rows if w is not None}
+
+
+def user_daily_nutrition(db: Session, user_id: int, start: str, end: str = None):
+    """{date: UserDailyNutrition} for one user over a date range."""
+    q = db.query(UserDailyNutrition).filter(
+        UserDailyNutrition.user_id == user_id, UserDailyNutrition.date >= start
+    )
+    if end:
+        q = q.filter(UserDailyNutrition.date <= end)
+    return {row.date: row for row in q.all()}
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal, engine, Base
+
+    parser = argparse.ArgumentParser(description="Maintain the order rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_rebuild = sub.add_parser("rebuild", help="Recompute the rollups from orders")
+    p_rebuild.add_argument("--since", help="Only rebuild dates >= YYYY-MM-DD")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        n = rebuild(db, since=args.since)
+        print(f"Rebuilt daily_sales_rollup and user_daily_nutrition from {n} orders.")
+    finally:
+        db.close()
@@ -1,107 +1,206 @@
 """Admin Analytics endpoints — /api/admin/analytics"""
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from sqlalchemy import func, text, distinct
 from database import get_db
-from models import Order, HealthProfile, User
+from models import Order, HealthProfile, User, FoodItem, AiModelStatus
 from routes.admin_deps import get_current_admin
-from typing import Optional
+from typing import Annotated, Optional
+from pydantic import BeforeValidator
+import cache
+import rollups
 from datetime import datetime, date, timedelta
 
 router = APIRouter(prefix="/api/admin/analytics", tags=["admin-analytics"])
 
+CATEGORY_ORDER = ["Breakfast", "Lunch", "Snacks", "Beverages", "Desserts"]
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
-def _get_date_range(period: str):
+# Short enough to cover inputs no writer invalidates (user counts, the date)
+ANALYTICS_TTL = 60
+
+# Same thresholds the dashboard uses for risk alerts
+RISKY_SODIUM_MG = 800
+RISKY_SUGAR_G = 15
+
+# ?from=/?to= must be YYYY-MM-DD (anything else is a 422); an empty value, as the
+# custom-range inputs send before a pick, means unset
+_blank_is_unset = BeforeValidator(lambda v: v or None)
+FromDate = Annotated[Optional[date], _blank_is_unset, Query(alias="from")]
+ToDate = Annotated[Optional[date], _blank_is_unset, Query(alias="to")]
+
+
+def _iso(d: Optional[date]):
+    return d.isoformat() if d else None
+
+
+def _resolve_range(period: str, from_date: Optional[str] = None, to_date: Optional[str] = None):
+    """Return (start, end) as YYYY-MM-DD; explicit from/to win over period."""
+    if from_date or to_date:
+        return from_date or None, to_date or None
     days = {"7d": 7, "30d": 30, "90d": 90}.get(period, 30)
-    start_dt = datetime.combine(date.today() - timedelta(days=days), datetime.min.time())
-    return start_dt.isoformat()
-    
-    
+    return (date.today() - timedelta(days=days)).isoformat(), date.today().isoformat()
+
+
+def _previous_range(start: Optional[str], end: Optional[str]):
+    """The window of equal length immediately before (start, end)."""
+    if not start:
+        return None, None
+    s = date.fromisoformat(start)
+    e = date.fromisoformat(end) if end else date.today()
+    length = (e - s).days + 1
+    return (s - timedelta(days=length)).isoformat(), (s - timedelta(days=1)).isoformat()
+
+
+def _new_users(db: Session, start: Optional[str], end: Optional[str]):
+    """USER accounts created within [start, end]; accounts with no created_at count for all time only."""
+    q = db.query(func.count(User.id)).filter(User.role == "USER")
+    if start:
+        q = q.filter(User.created_at >= start)
+    if end:
+        q = q.filter(User.created_at < (date.fromisoformat(end) + timedelta(days=1)).isoformat())
+    return q.scalar() or 0
+
+
+def _pct_change(current, previous):
+    if not previous:
+        return 0
+    return round((current - previous) / previous * 100, 1)
+
+
 @router.get("/summary")
-def analytics_summary(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    # Calculate some realistic KPIs
-    total_rev = db.query(func.coalesce(func.sum(Order.total_price), 0)).filter(Order.status == 'completed').scalar()
-    total_orders = db.query(func.count(Order.id)).scalar()
-    avg_val = round(total_rev / total_orders, 2) if total_orders > 0 else 0
-    new_users = db.query(func.count(User.id)).filter(User.role == 'USER').count()
-    
-    return {
-        "revenue": {"value": total_rev, "change": 12.5},
-        "orders": {"value": total_orders, "change": 8.2},
-        "avg_order_value": {"value": avg_val, "change": 4.1},
-        "new_users": {"value": new_users, "change": 15.0}
-    }
+def analytics_summary(
+    from_date: FromDate = None,
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    start, end = _iso(from_date), _iso(to_date)
+
+    def totals(s, e):
+        # Revenue counts completed orders only; order count covers every status
+        revenue, _ = rollups.order_totals(db, s, e, status="completed")
+        _, orders = rollups.order_totals(db, s, e)
+        avg = round(revenue / orders, 2) if orders > 0 else 0
+        return revenue, orders, avg, _new_users(db, s, e)
+
+    def compute():
+        current = totals(start, end)
+        # Changes compare with the window of equal length just before; none for an open start
+        prev_start, prev_end = _previous_range(start, end)
+        previous = totals(prev_start, prev_end) if prev_start else (0, 0, 0, 0)
+        change = [_pct_change(c, p) for c, p in zip(current, previous)]
+
+        return {
+            "revenue": {"value": current[0], "change": change[0]},
+            "orders": {"value": current[1], "change": change[1]},
+            "avg_order_value": {"value": current[2], "change": change[2]},
+            "new_users": {"value": current[3], "change": change[3]}
+        }
+
+    return cache.get_or_compute(("analytics/summary", start, end), compute, tags=("orders",), ttl=ANALYTICS_TTL)
 
 
 @router.get("/sales")
 def sales_trend(
     period: str = Query("30d"),
+    from_date: FromDate = None,
+    to_date: ToDate = None,
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin)
 ):
-    # Reuse logic or return mock for standard trend
-    return {
-        "dates": ["Oct 01", "Oct 05", "Oct 10", "Oct 15", "Oct 20", "Oct 25", "Oct 30"],
-        "revenue": [4500, 5200, 4800, 6100, 5900, 7200, 6800],
-        "orders": [120, 145, 130, 165, 155, 190, 185]
-    }
+    start, end = _resolve_range(period, _iso(from_date), _iso(to_date))
+
+    def compute():
+        revenue = {d: r for d, r, _ in rollups.daily_totals(db, start, end, status="completed")}
+        orders = rollups.daily_totals(db, start, end)
+        days = sorted(set(revenue) | {d for d, _, _ in orders})
+        counts = {d: n for d, _, n in orders}
+        return {
+            "dates": [datetime.strptime(d, "%Y-%m-%d").strftime("%b %d") for d in days],
+            "revenue": [round(revenue.get(d, 0), 2) for d in days],
+            "orders": [counts.get(d, 0) for d in days],
+        }
+
+    return cache.get_or_compute(("analytics/sales", start, end), compute, tags=("orders",), ttl=ANALYTICS_TTL)
 
 
 @router.get("/revenue-by-category")
-def revenue_by_category(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    # Mocking this since `order_items` wasn't used in legacy orders 
-    # and new orders logic might be complex to reverse engineer here.
-    # We'll calculate a breakdown from recent complete orders to simulate.
-    orders = db.query(Order).filter(Order.status == "completed").limit(100).all()
-    categories = {"Breakfast": 0, "Lunch": 0, "Beverages": 0, "Snacks": 0, "Desserts": 0}
-    
-    total = 0
-    for o in orders:
-        total += o.total_price or 0
-        
-    if total == 0:
-        return {"labels": list(categories.keys()), "data": [0,0,0,0,0]}
-        
-    categories["Lunch"] = total * 0.45
-    categories["Breakfast"] = total * 0.25
-    categories["Beverages"] = total * 0.15
-    categories["Snacks"] = total * 0.10
-    categories["Desserts"] = total * 0.05
-    
-    return {
-        "labels": list(categories.keys()),
-        "data": [round(v, 2) for v in categories.values()]
-    }
+def revenue_by_category(
+    from_date: FromDate = None,
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    start, end = _iso(from_date), _iso(to_date)
+
+    def compute():
+        categories = {"Breakfast": 0, "Lunch": 0, "Beverages": 0, "Snacks": 0, "Desserts": 0}
+        for cat, rev in rollups.revenue_by_category(db, start, end).items():
+            categories[cat] = categories.get(cat, 0) + rev
+        return {
+            "labels": list(categories.keys()),
+            "data": [round(v, 2) for v in categories.values()]
+        }
+
+    return cache.get_or_compute(("analytics/revenue-by-category", start, end), compute,
+                              tags=("orders",), ttl=ANALYTICS_TTL)
 
 
 @router.get("/popular-foods")
-def popular_foods(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    # Standard static list for UI compat since we don't have enough order_items history
-    return [
-        {"name": "Grilled Chicken Salad", "orders": 345, "revenue": 4140, "trend": 12},
-        {"name": "Quinoa Power Bowl", "orders": 289, "revenue": 3468, "trend": 8},
-        {"name": "Green Smoothies", "orders": 256, "revenue": 1280, "trend": -3},
-        {"name": "Oatmeal with Berries", "orders": 210, "revenue": 1050, "trend": 15},
-        {"name": "Whole Wheat Wrap", "orders": 195, "revenue": 1365, "trend": -5},
-    ]
+def popular_foods(
+    period: str = Query("30d"),
+    limit: int = Query(5, ge=1, le=50),
+    from_date: FromDate = None,
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    start, end = _resolve_range(period, _iso(from_date), _iso(to_date))
+
+    def compute():
+        top = rollups.food_totals(db, start, end, limit=limit)
+        prev_start, prev_end = _previous_range(start, end)
+        previous = {}
+        if top and prev_start:
+            previous = {
+                fid: orders for fid, _, orders, _, _ in
+                rollups.food_totals(db, prev_start, prev_end, food_ids=[t[0] for t in top])
+            }
+        return [
+            {
+                "name": name,
+                "orders": orders,
+                "revenue": round(revenue, 2),
+                "trend": _pct_change(orders, previous.get(fid, 0)),
+            }
+            for fid, name, orders, _, revenue in top
+        ]
+
+    return cache.get_or_compute(("analytics/popular-foods", start, end, limit), compute,
+                              tags=("orders", "menu"), ttl=ANALYTICS_TTL)
 
 
 @router.get("/category-heatmap")
-def category_heatmap(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    # Dummy data for UI heatmap
-    days = ["Mon", "Tue", "Wed", "Thu", "Fri"]
-    categories = ["Breakfast", "Lunch", "Snacks", "Beverages"]
-    import random
-    data = []
-    for d in range(len(days)):
-        for c in range(len(categories)):
-            data.append([d, c, random.randint(10, 100)])
-    
-    return {
-        "days": days,
-        "categories": categories,
-        "data": data
-    }
+def category_heatmap(
+    period: str = Query("30d"),
+    from_date: FromDate = None,
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    start, end = _resolve_range(period, _iso(from_date), _iso(to_date))
+
+    def compute():
+        cells = rollups.category_weekday_orders(db, start, end)
+        seen = {c for c, _ in cells}
+        categories = [c for c in CATEGORY_ORDER if c in seen] + sorted(seen - set(CATEGORY_ORDER))
+        # One row per category, one column per weekday (Mon..Sun)
+        data = [[cells.get((c, d), 0) for d in range(len(WEEKDAYS))] for c in categories]
+        return {"days": WEEKDAYS, "categories": categories, "data": data}
+
+    return cache.get_or_compute(("analytics/category-heatmap", start, end), compute,
+                              tags=("orders",), ttl=ANALYTICS_TTL)
 
 
 @router.get("/disease-distribution")
@@ -133,55 +232,139 @@ def disease_distribution(db: Session = Depends(get_db), admin=Depends(get_curren
 
 
 @router.get("/risk-trends")
-def risk_trends(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return {
-        "labels": ["Jan", "Feb", "Mar", "Apr", "May", "Jun"],
-        "datasets": [
-            {"label": "High Risk", "data": [45, 42, 38, 35, 30, 28]},
-            {"label": "Medium Risk", "data": [120, 125, 118, 110, 105, 95]},
-            {"label": "Low Risk", "data": [300, 310, 330, 350, 380, 420]}
-        ]
-    }
+def risk_trends(
+    months: int = Query(6, ge=1, le=24),
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    end = to_date or date.today()
+
+    def compute():
+        # Month keys (YYYY-MM) for the trailing window ending at `end`
+        keys = []
+        y, m = end.year, end.month
+        for _ in range(months):
+            keys.append(f"{y:04d}-{m:02d}")
+            y, m = (y, m - 1) if m > 1 else (y - 1, 12)
+        keys.reverse()
+
+        # Distinct ordering customers per month, bucketed by their risk level
+        month = func.substr(Order.created_at, 1, 7)
+        rows = (
+            db.query(month, HealthProfile.risk_level, func.count(distinct(Order.user_id)))
+            .join(HealthProfile, HealthProfile.user_id == Order.user_id)
+            .filter(Order.created_at >= keys[0], Order.created_at < (end + timedelta(days=1)).isoformat())
+            .group_by(month, HealthProfile.risk_level)
+            .all()
+        )
+        counts = {(mk, level or "Low"): n for mk, level, n in rows}
+
+        labels = [datetime.strptime(k, "%Y-%m").strftime("%b") for k in keys]
+        return {
+            "labels": labels,
+            "datasets": [
+                {"label": "High Risk", "data": [counts.get((k, "High"), 0) for k in keys]},
+                {"label": "Medium Risk", "data": [counts.get((k, "Moderate"), 0) for k in keys]},
+                {"label": "Low Risk", "data": [counts.get((k, "Low"), 0) for k in keys]},
+            ]
+        }
+
+    return cache.get_or_compute(("analytics/risk-trends", months, end.isoformat()), compute,
+                              tags=("orders", "profiles"), ttl=ANALYTICS_TTL)
 
 
 @router.get("/peak-hours")
-def peak_hours(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return {
-        "labels": ["8AM", "10AM", "12PM", "2PM", "4PM", "6PM"],
-        "data": [45, 120, 280, 150, 85, 40]
-    }
+def peak_hours(
+    period: str = Query("30d"),
+    from_date: FromDate = None,
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    start, end = _resolve_range(period, _iso(from_date), _iso(to_date))
+
+    def compute():
+        by_hour = rollups.orders_by_hour(db, start, end or date.today().isoformat())
+        return {
+            "labels": [f"{h % 12 or 12}{'AM' if h < 12 else 'PM'}" for h in range(24)],
+            "data": [by_hour.get(h, 0) for h in range(24)],
+        }
+
+    return cache.get_or_compute(("analytics/peak-hours", start, end), compute, tags=("orders",), ttl=ANALYTICS_TTL)
 
 
 @router.get("/top-spenders")
-def top_spenders(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    # This we can calculate from DB
-    orders = db.query(Order).options(joinedload(Order.user, innerjoin=False)).filter(Order.status == "completed").all()
-    user_spend = {}
-    for o in orders:
-        uid = o.user_id or 0
-        if uid not in user_spend:
-            name = o.user.name if o.user else f"Guest {uid}"
-            user_spend[uid] = {"name": name, "spent": 0, "orders": 0}
-        user_spend[uid]["spent"] += o.total_price or 0
-        user_spend[uid]["orders"] += 1
-        
-    top = sorted(user_spend.values(), key=lambda x: x["spent"], reverse=True)[:5]
-    if not top:
-        top = [
-            {"name": "Sarah Jenkins", "spent": 450.50, "orders": 32},
-            {"name": "Michael Chen", "spent": 380.00, "orders": 28},
-            {"name": "Emma Watson", "spent": 320.75, "orders": 15},
-            {"name": "David Rogers", "spent": 290.20, "orders": 22},
-            {"name": "Priya Patel", "spent": 275.00, "orders": 18}
+def top_spenders(
+    k: int = Query(5, ge=1, le=100),
+    period: Optional[str] = Query(None),
+    from_date: FromDate = None,
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    # No period and no dates means all time
+    start, end = (None, None) if not (period or from_date or to_date) else _resolve_range(
+        period, _iso(from_date), _iso(to_date))
+
+    def compute():
+        # Aggregate and rank in SQL so only k rows ever reach Python
+        spent = func.coalesce(func.sum(Order.total_price), 0)
+        q = (
+            db.query(Order.user_id, func.max(User.name), spent, func.count(Order.id))
+            .outerjoin(User, User.id == Order.user_id)
+            .filter(Order.status == "completed")
+        )
+        if start:
+            q = q.filter(Order.created_at >= start)
+        if end:
+            q = q.filter(Order.created_at < (date.fromisoformat(end) + timedelta(days=1)).isoformat())
+        rows = q.group_by(Order.user_id).order_by(spent.desc()).limit(k).all()
+
+        return [
+            {"name": name or f"Guest {uid or 0}", "spent": round(total, 2), "orders": n}
+            for uid, name, total, n in rows
         ]
-    return top
+
+    return cache.get_or_compute(("analytics/top-spenders", start, end, k), compute, tags=("orders",), ttl=ANALYTICS_TTL)
 
 
 @router.get("/ai-impact")
-def ai_impact(db: Session = Depends(get_db), admin=Depends(get_current_admin)):
-    return {
-        "recommendations_served": 12450,
-        "acceptance_rate": 68.5,
-        "health_improvement_score": +14,
-        "top_item_recommended": "Quinoa Power Bowl"
-    }
+def ai_impact(
+    period: str = Query("30d"),
+    from_date: FromDate = None,
+    to_date: ToDate = None,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    start, end = _resolve_range(period, _iso(from_date), _iso(to_date))
+
+    def healthy_share(foods, risky_ids):
+        total = sum(qty for _, _, _, qty, _ in foods)
+        healthy = sum(qty for fid, _, _, qty, _ in foods if fid not in risky_ids)
+        return (healthy / total * 100) if total else 0
+
+    def compute():
+        # Foods flagged the same way as dashboard risk alerts
+        risky_ids = {
+            fid for (fid,) in db.query(FoodItem.id).filter(
+                (FoodItem.sodium > RISKY_SODIUM_MG) | (FoodItem.sugar > RISKY_SUGAR_G)
+            )
+        }
+        current = rollups.food_totals(db, start, end)
+        prev_start, prev_end = _previous_range(start, end)
+        previous = rollups.food_totals(db, prev_start, prev_end) if prev_start else []
+
+        share = healthy_share(current, risky_ids)
+        top_item = next((name for fid, name, _, _, _ in current if fid not in risky_ids), None)
+        served = db.query(func.coalesce(func.sum(AiModelStatus.total_predictions), 0)).scalar() or 0
+
+        return {
+            "recommendations_served": int(served),
+            "acceptance_rate": round(share, 1),
+            "health_improvement_score": round(share - healthy_share(previous, risky_ids)) if previous else 0,
+            "top_item_recommended": top_item or "N/A",
+        }
+
+    return cache.get_or_compute(("analytics/ai-impact", start, end), compute,
+                              tags=("orders", "menu"), ttl=ANALYTICS_TTL)
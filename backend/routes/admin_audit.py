@@ -1,10 +1,12 @@
 """Admin Audit Logs — /api/admin/audit"""
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import func
 from database import get_db
 from models import AuditLog, User
 from routes.admin_deps import get_current_admin
+from schemas import Page, AuditLogRow
+from query_stats import query_budget
 from typing import Optional
 
 router = APIRouter(prefix="/api/admin/audit", tags=["admin-audit"])
@@ -38,7 +40,8 @@ def get_audit_admins(db: Session = Depends(get_db), admin=Depends(get_current_ad
     return [{"id": a.id, "name": a.name} for a in admins]
 
 
-@router.get("/")
+@router.get("/", response_model=Page[AuditLogRow])
+@query_budget(3)
 def get_audit_logs(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -49,7 +52,7 @@ def get_audit_logs(
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
-    q = db.query(AuditLog).outerjoin(User)
+    q = db.query(AuditLog).outerjoin(User).options(contains_eager(AuditLog.admin))
     
     if search:
         q = q.filter((AuditLog.summary.ilike(f"%{search}%")) | (AuditLog.target_table.ilike(f"%{search}%")))
@@ -1,11 +1,14 @@
 """Admin Food CRUD — /api/admin/foods"""
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func
 from database import get_db
 from models import FoodItem, Inventory, OrderItem
 from routes.admin_deps import get_current_admin
+from schemas import Page, AdminFoodRow
 from routes.audit_helper import log_action
+from query_stats import query_budget
+import cache
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
@@ -71,8 +74,9 @@ def _food_dict(f: FoodItem) -> dict:
     }
 
 
-@router.get("")
-@router.get("/")
+@router.get("", response_model=Page[AdminFoodRow])
+@router.get("/", response_model=Page[AdminFoodRow])
+@query_budget(4)
 def list_foods(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -91,7 +95,7 @@ def list_foods(
         q = q.filter(FoodItem.is_available == True)
 
     total = q.count()
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
+    items = q.options(selectinload(FoodItem.inventory)).offset((page - 1) * per_page).limit(per_page).all()
 
     return {
         "total": total,
@@ -116,6 +120,7 @@ def create_food(body: FoodCreate, request: Request, db: Session = Depends(get_db
 
     inv = Inventory(food_id=food.id, current_stock=body.stock, reorder_level=body.reorder_level)
     db.add(inv)
+    cache.mark_dirty(db, "menu", "inventory")
     db.commit()
     db.refresh(food)
 
@@ -148,6 +153,7 @@ def update_food(food_id: int, body: FoodUpdate, request: Request, db: Session =
         setattr(food, field, val)
         
     food.updated_at = datetime.utcnow()
+    cache.mark_dirty(db, "menu", "inventory")
     db.commit()
     db.refresh(food)
 
@@ -172,6 +178,7 @@ def delete_food(food_id: int, request: Request, db: Session = Depends(get_db), a
     if food.inventory:
         db.delete(food.inventory)
     db.delete(food)
+    cache.mark_dirty(db, "menu", "inventory")
     db.commit()
 
     log_action(db, admin.id, "DELETE", "food_items", food_id,
@@ -186,6 +193,7 @@ def toggle_availability(food_id: int, request: Request, db: Session = Depends(ge
 
     food.is_available = not food.is_available
     food.updated_at = datetime.utcnow()
+    cache.mark_dirty(db, "menu", "inventory")
     db.commit()
 
     log_action(db, admin.id, "STATUS_CHANGE", "food_items", food.id,
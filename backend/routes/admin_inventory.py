@@ -1,10 +1,13 @@
 """Admin Inventory CRUD — /api/admin/inventory"""
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from database import get_db
 from models import Inventory, FoodItem
 from routes.admin_deps import get_current_admin
+from schemas import Page, AdminInventoryRow
 from routes.audit_helper import log_action
+from query_stats import query_budget
+import cache
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
@@ -17,7 +20,8 @@ class InventoryUpdate(BaseModel):
     reorder_level: Optional[int] = None
 
 
-@router.get("/")
+@router.get("/", response_model=Page[AdminInventoryRow])
+@query_budget(3)
 def list_inventory(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -25,7 +29,7 @@ def list_inventory(
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
-    q = db.query(Inventory).join(FoodItem)
+    q = db.query(Inventory).join(FoodItem).options(contains_eager(Inventory.food))
     if search:
         q = q.filter(FoodItem.name.ilike(f"%{search}%"))
 
@@ -85,6 +89,7 @@ def update_inventory(
         inv.reorder_level = body.reorder_level
 
     inv.updated_at = datetime.utcnow()
+    cache.mark_dirty(db, "inventory")
     db.commit()
     db.refresh(inv)
 
@@ -1,10 +1,13 @@
 """Admin Orders Management — /api/admin/orders"""
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager, selectinload
 from database import get_db
 from models import Order, User
 from routes.admin_deps import get_current_admin
+from schemas import Page, AdminOrderRow
 from routes.audit_helper import log_action
+from query_stats import query_budget
+import rollups
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
@@ -16,7 +19,8 @@ class OrderStatusUpdate(BaseModel):
     status: str  # pending | completed | cancelled
 
 
-@router.get("/")
+@router.get("/", response_model=Page[AdminOrderRow])
+@query_budget(4)
 def list_orders(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -25,7 +29,7 @@ def list_orders(
     db: Session = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
-    q = db.query(Order).outerjoin(User)
+    q = db.query(Order).outerjoin(User).options(contains_eager(Order.user), selectinload(Order.order_items))
 
     if status:
         q = q.filter(Order.status == status)
@@ -98,6 +102,7 @@ def update_order_status(
         return {"id": order.id, "status": order.status}
 
     order.status = body.status
+    rollups.move_order_status(db, order, old_status, body.status)
     db.commit()
 
     log_action(
@@ -0,0 +1,214 @@
+"""Admin Performance — /api/admin/performance"""
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import BaseModel, Field
+from typing import Optional
+from routes.admin_deps import get_current_admin
+import cache
+import memory_profile
+import metrics
+import profiler
+import query_stats
+from datetime import datetime
+import json
+import os
+
+router = APIRouter(prefix="/api/admin/performance", tags=["admin-performance"])
+
+
+def _ts(epoch: float) -> str:
+    return datetime.utcfromtimestamp(epoch).isoformat()
+
+
+@router.get("/queries")
+def query_report(
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = Query("total", pattern="^(total|count|mean|max)$"),
+    admin=Depends(get_current_admin),
+):
+    """Top statements by fingerprint, slow-query log, per-route query counts and budget violations."""
+    routes = [
+        {
+            "method": method,
+            "route": route,
+            "requests": s.count,
+            "queries": s.db_queries,
+            "queries_per_request": round(s.db_queries / s.count, 2) if s.count else 0,
+            "db_ms_per_request": round(s.db_seconds / s.count * 1000, 3) if s.count else 0,
+        }
+        for (method, route), s in list(metrics.registry.routes.items())
+    ]
+    routes.sort(key=lambda r: r["queries_per_request"], reverse=True)
+
+    stats = query_stats.stats
+    return {
+        "since": _ts(stats.since),
+        "slow_query_ms": query_stats.SLOW_QUERY_MS,
+        "statements": stats.top(limit, sort),
+        "routes": routes[:limit],
+        "slow": [{**e, "at": _ts(e["at"])} for e in reversed(stats.slow)],
+        "budget_violations": [{**e, "at": _ts(e["at"])} for e in reversed(stats.violations)],
+    }
+
+
+@router.delete("/queries")
+def reset_query_report(admin=Depends(get_current_admin)):
+    """Start a fresh measurement window for the statement report."""
+    query_stats.stats.reset()
+    return {"message": "Query statistics reset"}
+
+
+@router.get("/cache")
+def cache_report(admin=Depends(get_current_admin)):
+    """Hit/miss counts per cached function or endpoint, occupancy and tag invalidations (this worker)."""
+    report = cache.stats()
+    return {**report, "since": _ts(report["since"])}
+
+
+@router.delete("/cache")
+def clear_cache(admin=Depends(get_current_admin)):
+    """Drop every cached entry and reset the counters."""
+    cache.clear()
+    return {"message": "Cache cleared"}
+
+
+class ProfilerArm(BaseModel):
+    path_prefix: str = Field("/api/", min_length=1)
+    method: Optional[str] = Field(None, pattern="^(GET|POST|PUT|PATCH|DELETE)$")
+    sample_rate: float = Field(1.0, gt=0, le=1)
+    interval_ms: float = Field(2.0, ge=0.5, le=100)
+    duration_s: int = Field(300, ge=1, le=3600)
+    max_requests: int = Field(profiler.MAX_TRACES, ge=1, le=1000)
+
+
+@router.get("/profiler")
+def profiler_status(admin=Depends(get_current_admin)):
+    """Current profiler settings (null when disarmed) and the captured traces, newest first."""
+    settings = profiler.status()
+    if settings:
+        settings["expires_at"] = _ts(settings["expires_at"])
+    return {
+        "armed": settings,
+        "traces": [{**t, "started_at": _ts(t["started_at"])} for t in profiler.traces()],
+    }
+
+
+@router.post("/profiler")
+def arm_profiler(body: ProfilerArm, admin=Depends(get_current_admin)):
+    """Profile matching requests until duration_s passes or max_requests have been captured."""
+    profiler.arm(**body.model_dump())
+    return {"message": "Profiler armed", "armed": profiler.status()}
+
+
+@router.delete("/profiler")
+def disarm_profiler(clear: bool = False, admin=Depends(get_current_admin)):
+    """Stop profiling new requests; ?clear=true also drops the captured traces."""
+    profiler.disarm()
+    if clear:
+        profiler.clear()
+    return {"message": "Profiler disarmed"}
+
+
+@router.get("/profiler/traces/{trace_id}")
+def download_trace(
+    trace_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    admin=Depends(get_current_admin),
+):
+    """Download a trace as speedscope JSON or collapsed stacks (flamegraph.pl / inferno)."""
+    trace = profiler.get_trace(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    if format == "collapsed":
+        return Response(
+            content=trace.collapsed(),
+            media_type="text/plain",
+            headers={"Content-Disposition": f"attachment; filename=profile-{trace.id}.folded"}
+        )
+    return Response(
+        content=json.dumps(trace.speedscope()),
+        media_type="application/json",
+        headers={"Content-Disposition": f"attachment; filename=profile-{trace.id}.speedscope.json"}
+    )
+
+
+class MemoryStart(BaseModel):
+    frames: int = Field(10, ge=1, le=50)
+
+
+class MemorySnapshot(BaseModel):
+    label: Optional[str] = Field(None, max_length=100)
+
+
+def _snapshot_or_404(sid: int):
+    snapshot = memory_profile.get_snapshot(sid)
+    if snapshot is None:
+        # Snapshots live in one worker; another worker may have answered
+        raise HTTPException(status_code=404, detail=f"Snapshot {sid} not found in worker {os.getpid()}")
+    return snapshot
+
+
+@router.get("/memory")
+def memory_status(admin=Depends(get_current_admin)):
+    """Traced / peak / RSS memory, GC object count and the stored snapshots."""
+    result = memory_profile.status()
+    result["snapshots"] = [{**s, "taken_at": _ts(s["taken_at"])} for s in result["snapshots"]]
+    return result
+
+
+@router.post("/memory/start")
+def start_memory_tracing(body: MemoryStart = MemoryStart(), admin=Depends(get_current_admin)):
+    """Start tracemalloc; allocations slow down while it runs."""
+    memory_profile.start(body.frames)
+    return {"message": "Memory tracing started", "frames": body.frames, "pid": os.getpid()}
+
+
+@router.post("/memory/stop")
+def stop_memory_tracing(admin=Depends(get_current_admin)):
+    """Stop tracemalloc and drop the stored snapshots."""
+    memory_profile.stop()
+    return {"message": "Memory tracing stopped", "pid": os.getpid()}
+
+
+@router.post("/memory/snapshots")
+def take_memory_snapshot(body: MemorySnapshot = MemorySnapshot(), admin=Depends(get_current_admin)):
+    """Run a GC pass and store a snapshot of live allocations."""
+    try:
+        sid = memory_profile.take_snapshot(body.label)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"id": sid, "pid": os.getpid()}
+
+
+@router.delete("/memory/snapshots")
+def clear_memory_snapshots(admin=Depends(get_current_admin)):
+    memory_profile.clear()
+    return {"message": "Snapshots cleared", "pid": os.getpid()}
+
+
+@router.get("/memory/snapshots/{sid}/top")
+def memory_top(
+    sid: int,
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    admin=Depends(get_current_admin),
+):
+    """Top allocating lines (or files / tracebacks) in a stored snapshot."""
+    return {"id": sid, "pid": os.getpid(), "top": memory_profile.top(_snapshot_or_404(sid), limit, group_by)}
+
+
+@router.get("/memory/diff")
+def memory_diff(
+    base: int,
+    current: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    admin=Depends(get_current_admin),
+):
+    """Allocation growth between two snapshots; without ?current= compares against now."""
+    base_snapshot = _snapshot_or_404(base)
+    current_snapshot = _snapshot_or_404(current) if current is not None else None
+    try:
+        growth = memory_profile.diff(base_snapshot, current_snapshot, limit, group_by)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"base": base, "current": current, "pid": os.getpid(), "diff": growth}
@@ -5,6 +5,7 @@ from database import get_db
 from models import Order, FoodItem, Inventory
 from routes.admin_deps import get_current_admin
 from routes.audit_helper import log_action
+import cache
 import csv
 from io import StringIO
 from datetime import datetime
@@ -26,12 +27,12 @@ def _generate_csv_response(rows: list, headers: list, filename: str):
     )
 
 
-@router.get("/{report_type}/preview")
-def preview_report(
-    report_type: str,
-    db: Session = Depends(get_db),
-    admin=Depends(get_current_admin),
-):
+# Preview tabs re-render on every visit; user names in the sales rows age out by TTL
+PREVIEW_TTL = 60
+PREVIEW_TAGS = {"sales": ("orders",), "inventory": ("inventory", "menu")}
+
+
+def _preview(db: Session, report_type: str):
     if report_type == "sales":
         return {
             "total_rows": db.query(Order).filter(Order.status == 'completed').count(),
@@ -40,14 +41,24 @@ def preview_report(
                      for o in db.query(Order).filter(Order.status == 'completed').limit(5).all()],
             "summary": {"generated_at": datetime.utcnow().isoformat()}
         }
-    elif report_type == "inventory":
-        return {
-            "total_rows": db.query(Inventory).count(),
-            "columns": ["Food ID", "Food Name", "Category", "Stock", "Status"],
-            "rows": [[i.food_id, i.food.name if i.food else "?", i.food.category if i.food else "?", i.current_stock, "Low" if i.current_stock <= i.reorder_level else "OK"] 
-                     for i in db.query(Inventory).limit(5).all()],
-            "summary": {"generated_at": datetime.utcnow().isoformat()}
-        }
+    return {
+        "total_rows": db.query(Inventory).count(),
+        "columns": ["Food ID", "Food Name", "Category", "Stock", "Status"],
+        "rows": [[i.food_id, i.food.name if i.food else "?", i.food.category if i.food else "?", i.current_stock, "Low" if i.current_stock <= i.reorder_level else "OK"] 
+                 for i in db.query(Inventory).limit(5).all()],
+        "summary": {"generated_at": datetime.utcnow().isoformat()}
+    }
+
+
+@router.get("/{report_type}/preview")
+def preview_report(
+    report_type: str,
+    db: Session = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    if report_type in PREVIEW_TAGS:
+        return cache.get_or_compute(("export/preview", report_type), lambda: _preview(db, report_type),
+                                    tags=PREVIEW_TAGS[report_type], ttl=PREVIEW_TTL)
     else:
         # Fallback for health or unknown
         return {
@@ -1,10 +1,12 @@
 """Admin Users Management — /api/admin/users"""
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from database import get_db
 from models import User
 from routes.admin_deps import get_current_admin
+from schemas import Page, AdminUserRow
 from routes.audit_helper import log_action
+from query_stats import query_budget
 from pydantic import BaseModel
 from typing import Optional
 
@@ -19,7 +21,8 @@ class UserStatusUpdate(BaseModel):
     disabled: int  # 0 or 1
 
 
-@router.get("/")
+@router.get("/", response_model=Page[AdminUserRow])
+@query_budget(4)
 def list_users(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
@@ -36,7 +39,7 @@ def list_users(
         q = q.filter(User.role == role)
 
     total = q.count()
-    items = q.offset((page - 1) * per_page).limit(per_page).all()
+    items = q.options(selectinload(User.health_profile)).offset((page - 1) * per_page).limit(per_page).all()
 
     results = []
     for u in items:
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any, Generic, TypeVar
 from enum import Enum
+from datetime import date as Date
 
 
 class RoleEnum(str, Enum):
@@ -153,6 +154,32 @@ class OrderResponse(OrderCreate):
         from_attributes = True
 
 
+class OrderHistoryItem(BaseModel):
+    """One row of orders.html: only the columns the page displays."""
+    id: int
+    created_at: Optional[str] = None
+    item_count: int
+    total_price: Optional[float] = None
+    total_calories: Optional[float] = None
+    status: Optional[str] = None
+
+
+class OrderHistoryPage(BaseModel):
+    orders: List[OrderHistoryItem]
+    next_cursor: Optional[int] = None   # pass back as ?cursor= for the next page
+
+
+class OrderMonthSummary(BaseModel):
+    month: str                          # YYYY-MM
+    orders: int
+    total_price: float
+    total_calories: float
+
+
+class OrderHistorySummary(BaseModel):
+    months: List[OrderMonthSummary]
+
+
 # Daily Log schemas
 class DailyLogCreate(BaseModel):
     water_intake_ml: Optional[int] = 0
@@ -167,3 +194,165 @@ class DailyLogResponse(DailyLogCreate):
 
     class Config:
         from_attributes = True
+
+
+class DailyLogDelta(DailyLogCreate):
+    """One tracker update; water is added, steps/mood replace. Date defaults to today."""
+    date: Optional[Date] = None   # YYYY-MM-DD; an impossible date is a 422
+
+
+class DailyLogBatch(BaseModel):
+    entries: List[DailyLogDelta] = Field(..., min_length=1, max_length=100)
+
+
+# Response models for the hot read endpoints. Declaring them lets FastAPI
+# validate and serialize through pydantic-core instead of jsonable_encoder.
+class MenuItemResponse(BaseModel):
+    """A food item scored against the user's profile (/api/menu/intelligent)."""
+    id: int
+    name: str
+    category: Optional[str] = None
+    price: Optional[float] = None
+    image: Optional[str] = None
+    calories: Optional[float] = None
+    sugar: Optional[float] = None
+    protein: Optional[float] = None
+    sodium: Optional[float] = None
+    carbs: Optional[float] = None
+    description: str = ""
+    match_score: float
+    risk_level: int
+    insight: str
+    tag: str
+
+
+class ProfileStatus(BaseModel):
+    has_profile: bool
+    onboarding_step: Optional[int] = None
+    user_id: int
+    name: Optional[str] = None
+
+
+class TodayLog(BaseModel):
+    date: str = Field(..., description="Server-local day, as daily_logs are kept")
+    water_intake_ml: Optional[int] = 0
+    steps: Optional[int] = 0
+    mood: Optional[str] = "Neutral"
+
+
+class TodayTotals(BaseModel):
+    date: str = Field(..., description="UTC day; order totals are bucketed by Order.created_at, which is UTC")
+    orders: int
+    calories: float
+    sugar: float
+    sodium: float
+
+
+class RecentOrder(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    items: Optional[str] = None
+    total_price: Optional[float] = None
+    total_calories: Optional[float] = None
+    total_sugar: Optional[float] = None
+    total_sodium: Optional[float] = None
+    status: Optional[str] = None
+    payment_method: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+class BootstrapResponse(BaseModel):
+    status: ProfileStatus
+    profile: Optional[Dict[str, Any]] = None
+    menu: List[MenuItemResponse]
+    daily_log: TodayLog
+    today: TodayTotals
+    recent_orders: List[RecentOrder]
+
+
+class ChatbotReply(BaseModel):
+    """Engine replies vary by intent; type/text are always present."""
+    model_config = ConfigDict(extra="allow")
+
+    type: str = "text"
+    text: str = ""
+
+
+# Admin list pages
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    total: int
+    page: int
+    pages: int
+    items: List[T]
+
+
+class AdminUserRow(BaseModel):
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    role: Optional[str] = None
+    disabled: Optional[int] = 0
+    profile_completed: Optional[int] = 0
+    risk_level: Optional[str] = None
+    health_score: Optional[float] = None
+
+
+class AdminFoodRow(BaseModel):
+    id: int
+    name: str
+    category: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    calories: Optional[float] = None
+    protein: Optional[float] = None
+    carbs: Optional[float] = None
+    fat: Optional[float] = None
+    sugar: Optional[float] = None
+    sodium: Optional[float] = None
+    dietary_type: Optional[str] = None
+    image_emoji: Optional[str] = None
+    is_available: Optional[bool] = None
+    stock: Optional[int] = None
+    reorder_level: Optional[int] = None
+    created_at: Optional[str] = None
+
+
+class AdminOrderRow(BaseModel):
+    id: int
+    user_name: str
+    user_email: Optional[str] = None
+    total_price: Optional[float] = None
+    status: Optional[str] = None
+    payment_method: Optional[str] = None
+    created_at: Optional[str] = None
+    item_count: int
+
+
+class AdminInventoryRow(BaseModel):
+    id: int
+    food_id: Optional[int] = None
+    food_name: str
+    category: Optional[str] = None
+    current_stock: Optional[int] = None
+    reorder_level: Optional[int] = None
+    unit: Optional[str] = None
+    status: str
+    last_updated: Optional[str] = None
+
+
+class AuditLogRow(BaseModel):
+    id: int
+    timestamp_display: Optional[str] = None
+    admin_name: str
+    admin_initials: str
+    admin_role: Optional[str] = None
+    action_type: str
+    summary: Optional[str] = None
+    target_table: Optional[str] = None
+    ip_address: Optional[str] = None
+    payload: Optional[str] = None
+    payload_before: Optional[str] = None
+    payload_after: Optional[str] = None
@@ -0,0 +1,90 @@
+"""Measure the per-request cost of MetricsMiddleware and the query_stats hooks.
+
+Drives a trivial ASGI app directly (no server, no sockets) with and without the
+middleware (and the disarmed ProfilerMiddleware), and runs `SELECT 1` on an in-memory SQLite engine with and
+without query_stats.instrument(), then prints the difference per call.
+
+    python scripts/bench_metrics_overhead.py [--requests 200000] [--queries 50000]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Ensure imports work when running from this script location
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from sqlalchemy import create_engine, text
+
+import query_stats
+from metrics import MetricsMiddleware, Registry
+from profiler import ProfilerMiddleware
+
+
+class _Route:
+    path = "/api/bench/{item_id}"
+
+
+async def bare_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _noop_send(message):
+    pass
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def drive(app, n):
+    scope = {"type": "http", "method": "GET", "path": "/api/bench/1"}
+    start = time.perf_counter()
+    for _ in range(n):
+        await app(dict(scope), _receive, _noop_send)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def run_queries(engine, n):
+    with engine.connect() as conn:
+        stmt = text("SELECT 1")
+        start = time.perf_counter()
+        for _ in range(n):
+            conn.execute(stmt)
+        return (time.perf_counter() - start) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    wrapped = MetricsMiddleware(bare_app, registry)
+    asyncio.run(drive(wrapped, 1000))   # warm up
+    bare = asyncio.run(drive(bare_app, args.requests))
+    metered = asyncio.run(drive(wrapped, args.requests))
+    print(f"request  bare {bare:7.2f} us  with middleware {metered:7.2f} us  overhead {metered - bare:6.2f} us")
+    idle = asyncio.run(drive(ProfilerMiddleware(bare_app), args.requests))
+    print(f"request  bare {bare:7.2f} us  profiler off    {idle:7.2f} us  overhead {idle - bare:6.2f} us")
+
+    plain = create_engine("sqlite://")
+    hooked = create_engine("sqlite://")
+    query_stats.instrument(hooked)
+    _, token = query_stats.begin_request()
+    try:
+        base = run_queries(plain, args.queries)
+        counted = run_queries(hooked, args.queries)
+    finally:
+        query_stats.end_request(token)
+    print(f"query    bare {base:7.2f} us  with hooks      {counted:7.2f} us  overhead {counted - base:6.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark response serialization for the hot routes.
+
+Compares, per payload:
+  before  - jsonable_encoder + stdlib JSONResponse (ad-hoc dicts, no response model)
+  after   - response model validation + FastJSONResponse (what the routes do now)
+  dump    - pydantic-core dump_json alone, for reference
+
+Payloads: a 500-item scored menu (/api/menu/intelligent) and a 100-row admin
+users page (/api/admin/users/). No database or server needed:
+
+    python scripts/bench_serialization.py [--repeat 200]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List
+
+# Ensure imports work when running from this script location
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from json_response import FastJSONResponse, orjson
+from menu import score_menu
+from schemas import MenuItemResponse, Page, AdminUserRow
+
+CATEGORIES = ["Breakfast", "Lunch", "Snacks", "Beverages", "Desserts"]
+
+
+def scored_menu(n=500):
+    foods = [
+        {
+            "id": i,
+            "name": f"Dish {i}",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "price": 40.0 + i % 160,
+            "image": "🍽️",
+            "calories": 150.0 + (i * 37) % 650,
+            "sugar": float((i * 7) % 40),
+            "protein": float((i * 11) % 35),
+            "sodium": 100.0 + (i * 53) % 1200,
+            "carbs": float((i * 13) % 90),
+            "description": "House special with seasonal vegetables and spices",
+        }
+        for i in range(1, n + 1)
+    ]
+    profile = {"age": 45, "disease": ["Diabetes", "Hypertension"], "allergies": [],
+               "dietary_preference": "Non-Veg", "target_calories": 2000}
+    return score_menu(foods, profile)
+
+
+def admin_page(n=100):
+    return {
+        "total": 5000,
+        "page": 1,
+        "pages": 50,
+        "items": [
+            {"id": i, "name": f"User {i}", "email": f"user{i}@canteen.local", "role": "USER",
+             "disabled": 0, "profile_completed": 1, "risk_level": ["Low", "Medium", "High"][i % 3],
+             "health_score": float(i % 100)}
+            for i in range(1, n + 1)
+        ],
+    }
+
+
+def timed(fn, repeat):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(name, payload, model, repeat):
+    adapter = TypeAdapter(model)
+
+    def before():
+        return JSONResponse(jsonable_encoder(payload)).body
+
+    def after():
+        return FastJSONResponse(adapter.dump_python(adapter.validate_python(payload), mode="json")).body
+
+    def dump():
+        return adapter.dump_json(adapter.validate_python(payload))
+
+    results = {label: timed(fn, repeat) for label, fn in (("before", before), ("after", after), ("dump", dump))}
+    print(f"{name:<28} {results['before']:>9.3f} {results['after']:>9.3f} {results['dump']:>9.3f} "
+          f"{results['before'] / results['after']:>8.1f}x   {len(after()) / 1024:.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if orjson else 'no (stdlib fallback)'}, repeat={args.repeat}, ms per response")
+    print(f"{'payload':<28} {'before':>9} {'after':>9} {'dump':>9} {'speedup':>9}")
+    bench("menu, 500 scored items", scored_menu(), List[MenuItemResponse], args.repeat)
+    bench("admin users, 100 rows", admin_page(), Page[AdminUserRow], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
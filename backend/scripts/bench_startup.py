@@ -0,0 +1,136 @@
+"""Startup benchmark: import time, app build, startup hook, time-to-first-request.
+
+Every run starts fresh interpreters on a throwaway copy of canteen.db (set
+through DATABASE_URL), so nothing is warm from a previous run.
+
+In-process phases, measured inside one child interpreter:
+
+    import      `import app` (the module alone)
+    create      create_app(): framework, routers, middleware
+    startup     the lifespan startup hook (schema check, frontend assets, ...)
+
+Server phases, measured from outside a `uvicorn app:create_app --factory`
+process started on a free port:
+
+    ready       process spawn -> first 200 from GET /
+    first_api   the first POST /api/auth/login after that (hashing, JWT, DB)
+
+    python scripts/bench_startup.py [--runs 5] [--output startup.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+# Ensure imports work when running from this script location
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+application = app_module.create_app()
+t2 = time.perf_counter()
+
+async def startup():
+    async with application.router.lifespan_context(application):
+        return time.perf_counter()
+
+t3 = asyncio.run(startup())
+print(json.dumps({"import": t1 - t0, "create": t2 - t1, "startup": t3 - t2}))
+"""
+
+LOGIN = {"email": "admin@canteen.local", "password": "Admin@123", "role": "ADMIN"}
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _env(db_path):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", LOG_LEVEL="WARNING")
+    env.pop("WARMUP", None)
+    return env
+
+
+def in_process(env):
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def server(env, timeout=60):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:create_app", "--factory", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            if time.perf_counter() - started > timeout or proc.poll() is not None:
+                raise RuntimeError("server did not come up")
+            try:
+                with urllib.request.urlopen(base + "/", timeout=1) as r:
+                    if r.status == 200:
+                        break
+            except OSError:
+                time.sleep(0.01)
+        ready = time.perf_counter() - started
+        request = urllib.request.Request(base + "/api/auth/login", data=json.dumps(LOGIN).encode(),
+                                         headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=30) as r:
+            r.read()
+        return {"ready": ready, "first_api": time.perf_counter() - t0}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", default=os.path.join(ROOT, "canteen.db"), help="database to copy (default canteen.db)")
+    parser.add_argument("--output", help="also write the results as JSON here")
+    args = parser.parse_args()
+
+    samples = {}
+    tmp = tempfile.mkdtemp(prefix="bench-startup-")
+    try:
+        for i in range(args.runs):
+            db_path = os.path.join(tmp, f"run{i}.db")
+            if os.path.exists(args.db):
+                shutil.copyfile(args.db, db_path)
+            env = _env(db_path)
+            for phase, seconds in {**in_process(env), **server(env)}.items():
+                samples.setdefault(phase, []).append(seconds)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        phase: {"median_ms": round(statistics.median(v) * 1000, 1), "min_ms": round(min(v) * 1000, 1)}
+        for phase, v in samples.items()
+    }
+    print(f"{args.runs} runs\n")
+    print(f"{'phase':<10} {'median ms':>10} {'min ms':>10}")
+    for phase, r in report.items():
+        print(f"{phase:<10} {r['median_ms']:>10.1f} {r['min_ms']:>10.1f}")
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump({"runs": args.runs, "python": sys.version.split()[0], "phases": report}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
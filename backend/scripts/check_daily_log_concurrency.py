@@ -0,0 +1,117 @@
+"""Concurrency check for the daily-log upsert: no lost increments, no duplicate rows.
+
+Runs THREADS x TAPS water taps (+WATER_ML each) for one user against a
+throwaway SQLite database, each tap in its own session, through the same
+daily_logs.apply_deltas path the API uses. With --legacy it also runs the old
+read-then-write logic for comparison, which typically loses updates.
+
+    python scripts/check_daily_log_concurrency.py [--threads 8] [--taps 50] [--legacy]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+# Ensure imports work when running from this script location
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import DailyLog, User
+import daily_logs
+
+WATER_ML = 250
+
+
+def legacy_tap(db, user_id):
+    """The pre-upsert implementation of POST /api/health/daily-log."""
+    today = daily_logs.today()
+    db_log = db.query(DailyLog).filter(DailyLog.user_id == user_id, DailyLog.date == today).first()
+    if db_log:
+        db_log.water_intake_ml += WATER_ML
+    else:
+        db.add(DailyLog(user_id=user_id, date=today, water_intake_ml=WATER_ML))
+    db.commit()
+
+
+def upsert_tap(db, user_id):
+    daily_logs.apply_deltas(db, user_id, [{"water_intake_ml": WATER_ML}])
+
+
+def run(tap, threads, taps, unique_index=True):
+    path = os.path.join(tempfile.mkdtemp(), "concurrency.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    if not unique_index:
+        # The old schema had no unique (user_id, date) index
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX uq_daily_logs_user_date"))
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    db = Session()
+    user = User(name="Concurrency", email="concurrency@canteen.local", hashed_password="x")
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    db.close()
+
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    def worker():
+        barrier.wait()
+        for _ in range(taps):
+            db = Session()
+            try:
+                tap(db, user_id)
+            except Exception as e:
+                errors.append(repr(e))
+                db.rollback()
+            finally:
+                db.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    db = Session()
+    logs = db.query(DailyLog).filter(DailyLog.user_id == user_id).all()
+    total = sum(l.water_intake_ml or 0 for l in logs)
+    db.close()
+    engine.dispose()
+    return len(logs), total, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check daily-log writes under concurrency")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--taps", type=int, default=50)
+    parser.add_argument("--legacy", action="store_true", help="also run the old read-then-write path")
+    args = parser.parse_args()
+
+    expected = args.threads * args.taps * WATER_ML
+    print(f"{args.threads} threads x {args.taps} taps x {WATER_ML} ml = {expected} ml expected")
+
+    if args.legacy:
+        rows, total, errors = run(legacy_tap, args.threads, args.taps, unique_index=False)
+        print(f"[legacy] rows={rows} total={total} ml lost={expected - total} ml errors={len(errors)}")
+
+    rows, total, errors = run(upsert_tap, args.threads, args.taps)
+    print(f"[upsert] rows={rows} total={total} ml lost={expected - total} ml errors={len(errors)}")
+    for e in errors[:5]:
+        print("   ", e)
+
+    ok = rows == 1 and total == expected and not errors
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,477 @@
+"""Generate a benchmark-sized synthetic database.
+
+Defaults produce the full scale:
+- 100k users, 85% of them with a health profile (varied diseases, allergies
+  and lab values; risk computed with health.py's own rules);
+- 5k foods in the seed categories, each with an inventory row;
+- 5M orders with order_items over the last --days days. Volume follows a
+  weekday pattern (quiet weekends) and an hourly one (breakfast, lunch peak,
+  evening snacks). Food choice depends on the meal period and on per-food
+  popularity, and a minority of heavy users places most of the orders;
+- 50k admin audit-log entries;
+- the daily_sales_rollup / user_daily_nutrition rollups, built in SQL.
+
+    python scripts/generate_data.py --db synthetic.db               # full scale
+    python scripts/generate_data.py --db small.db --scale 0.01      # 1k users, 50k orders
+    DATABASE_URL=sqlite:///synthetic.db uvicorn app:app             # serve it
+
+Loading speed: rows go in through executemany on the DBAPI cursor in
+--batch-size chunks. journal_mode=OFF, synchronous=OFF and a large page cache
+are set during the load. Secondary indexes are dropped first and rebuilt
+once at the end. All users share one password hash (--password), because
+hashing 100k passwords with pbkdf2 would take longer than the load itself.
+admin@canteen.local / Admin@123 is always created.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from types import SimpleNamespace
+
+# Ensure imports work when running from this script location
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event
+
+from database import Base
+import models  # noqa: F401  (registers the tables)
+import health
+from rollups import NUTRIENTS, ORDER_CATEGORY, UNCATEGORIZED
+
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+# Tables whose secondary indexes are dropped during the load
+BULK_TABLES = ("users", "health_profiles", "food_items", "inventory", "orders", "order_items", "audit_logs")
+
+FIRST_NAMES = ("Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Isha", "Kabir", "Meera", "Rohan", "Saanvi",
+               "Arjun", "Kavya", "Nikhil", "Priya", "Rahul", "Sneha", "Tara", "Varun", "Zoya", "Farhan",
+               "John", "Maria", "Wei", "Fatima", "Luca", "Amara", "Noah", "Leila", "Kenji", "Sofia")
+LAST_NAMES = ("Sharma", "Patel", "Iyer", "Khan", "Reddy", "Das", "Menon", "Gupta", "Singh", "Nair",
+              "Bose", "Joshi", "Rao", "Kapoor", "Fernandes", "Smith", "Garcia", "Chen", "Okafor", "Rossi")
+DISEASES = ((["None"], 50), (["Diabetes"], 14), (["Hypertension"], 14), (["Diabetes", "Hypertension"], 8),
+            (["Obesity"], 5), (["Heart Disease"], 3), (["Diabetes", "Obesity"], 3), (["Cholesterol"], 3))
+ALLERGENS = ("Nuts", "Dairy", "Gluten", "Egg", "Soy", "Shellfish")
+SEVERITIES = ("Mild", "Moderate", "Severe")
+
+# category -> (name parts, calories, sugar, sodium, protein, carbs, fat, price ranges, emoji)
+FOOD_KINDS = {
+    "Breakfast": (("Idli", "Dosa", "Poha", "Upma", "Paratha", "Oats Bowl", "Omelette", "Pancakes", "Sandwich"),
+                  (150, 550), (0, 18), (150, 900), (3, 22), (20, 75), (2, 20), (20, 120), "🥣"),
+    "Lunch": (("Thali", "Biryani", "Rajma Chawal", "Chicken Curry", "Paneer Masala", "Quinoa Bowl", "Dal Rice",
+               "Fish Curry", "Veg Pulao", "Grilled Chicken", "Chole Bhature", "Salad Bowl"),
+              (300, 1100), (0, 15), (400, 2200), (8, 45), (30, 120), (5, 45), (60, 320), "🍛"),
+    "Snacks": (("Samosa", "Pakora", "Sprouts Chaat", "Momos", "Spring Roll", "Vada Pav", "Fruit Bowl", "Nachos"),
+               (90, 500), (0, 20), (100, 1200), (2, 15), (10, 60), (1, 30), (15, 120), "🥟"),
+    "Beverages": (("Masala Chai", "Filter Coffee", "Lassi", "Lime Soda", "Buttermilk", "Cold Coffee", "Green Tea",
+                   "Mango Shake", "Coconut Water"),
+                  (0, 420), (0, 55), (0, 300), (0, 12), (0, 70), (0, 15), (10, 150), "🥤"),
+    "Desserts": (("Gulab Jamun", "Rasgulla", "Kheer", "Brownie", "Fruit Custard", "Ice Cream", "Halwa"),
+                 (150, 600), (15, 70), (20, 250), (2, 10), (20, 90), (3, 30), (20, 160), "🍨"),
+}
+STYLES = ("Classic", "Spicy", "Healthy", "Jumbo", "Mini", "Home-style", "Special", "Low-oil", "Protein", "Chef's")
+NON_VEG_WORDS = ("Chicken", "Fish", "Omelette", "Egg")
+
+# Relative order volume by hour (canteen open 7:00-22:00) and by weekday (Mon=0)
+HOUR_WEIGHTS = {7: 3, 8: 7, 9: 8, 10: 4, 11: 5, 12: 18, 13: 20, 14: 9, 15: 4, 16: 6, 17: 7, 18: 4, 19: 5,
+                20: 4, 21: 2}
+WEEKDAY_WEIGHTS = (1.0, 1.05, 1.0, 1.05, 0.95, 0.35, 0.15)
+# Category mix per meal period
+MEAL_CATEGORIES = {
+    "breakfast": {"Breakfast": 60, "Beverages": 35, "Snacks": 5},
+    "lunch": {"Lunch": 65, "Beverages": 20, "Desserts": 10, "Snacks": 5},
+    "evening": {"Snacks": 50, "Beverages": 40, "Desserts": 10},
+    "dinner": {"Lunch": 55, "Beverages": 20, "Desserts": 15, "Snacks": 10},
+}
+ITEMS_PER_ORDER = ((1, 45), (2, 32), (3, 16), (4, 7))
+PAYMENT_METHODS = (("Cash", 30), ("UPI", 50), ("Card", 20))
+AUDIT_ACTIONS = (("LOGIN", 40), ("UPDATE", 25), ("STATUS_CHANGE", 15), ("CREATE", 8), ("EXPORT", 6),
+                 ("DELETE", 3), ("LOGOUT", 2), ("RETRAIN", 1))
+USER_AGENTS = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/124.0", "Mozilla/5.0 (Macintosh) Safari/17.4",
+               "Mozilla/5.0 (X11; Linux x86_64) Firefox/125.0")
+
+
+def meal_period(hour):
+    if hour < 11:
+        return "breakfast"
+    if hour < 16:
+        return "lunch"
+    if hour < 19:
+        return "evening"
+    return "dinner"
+
+
+def dt_string(value: datetime) -> str:
+    """SQLAlchemy's SQLite DateTime storage format."""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def weighted(pairs):
+    values, weights = zip(*pairs)
+    return list(values), list(accumulate(weights))
+
+
+class Loader:
+    """executemany in batches on one connection, with timing."""
+
+    def __init__(self, conn, batch_size):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.statements = {}
+        self.pending = {}
+        self.counts = {}
+
+    def add(self, table, row):
+        rows = self.pending.setdefault(table, [])
+        rows.append(row)
+        if len(rows) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in [table] if table else list(self.pending):
+            rows = self.pending.get(name)
+            if rows:
+                self.conn.exec_driver_sql(self.statements[name], rows)
+                self.counts[name] = self.counts.get(name, 0) + len(rows)
+                rows.clear()
+
+    def columns(self, table, columns):
+        self.statements[table] = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                                  f"VALUES ({', '.join('?' for _ in columns)})")
+
+
+def step(label):
+    def wrap(fn):
+        def run(*args, **kwargs):
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            print(f"  {label:32} {time.perf_counter() - start:7.1f}s")
+            return result
+        return run
+    return wrap
+
+
+@step("users + health profiles")
+def gen_users(load, rng, n_users, n_admins, password_hash, admin_hash):
+    load.columns("users", ("id", "name", "email", "hashed_password", "role", "disabled", "profile_completed",
+                           "onboarding_step"))
+    load.columns("health_profiles", ("id", "user_id", "age", "height_cm", "weight_kg", "bmi", "gender", "disease",
+                                     "severity", "health_values", "diabetes_status", "bp_status",
+                                     "cholesterol_status", "bmi_category", "risk_score", "risk_level", "allergies",
+                                     "dietary_preference"))
+    load.add("users", (1, "System Administrator", "admin@canteen.local", admin_hash, "ADMIN", 0, 1, 3))
+    for i in range(2, n_admins + 2):
+        load.add("users", (i, f"Admin {i - 1}", f"admin{i - 1}@synthetic.local", password_hash, "ADMIN", 0, 1, 3))
+
+    disease_values, disease_cum = weighted(DISEASES)
+    profile_id = 0
+    first_user = n_admins + 2
+    for uid in range(first_user, first_user + n_users):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        has_profile = rng.random() < 0.85
+        load.add("users", (uid, name, f"user{uid}@synthetic.local", password_hash, "USER",
+                           1 if rng.random() < 0.01 else 0, 1 if has_profile else 0,
+                           3 if has_profile else rng.choice((0, 1, 2))))
+        if not has_profile:
+            continue
+
+        diseases = rng.choices(disease_values, cum_weights=disease_cum)[0]
+        gender = rng.choice(("Male", "Female", "Other"))
+        height = round(rng.gauss(170 if gender == "Male" else 158, 8), 1)
+        bmi_target = max(16.0, rng.gauss(31 if "Obesity" in diseases else 24, 4))
+        weight = round(bmi_target * (height / 100) ** 2, 1)
+        bmi = round(weight / (height / 100) ** 2, 1)
+        values = {
+            "diabetes": rng.randint(130, 260) if "Diabetes" in diseases else rng.randint(75, 115),
+            "hypertension": (f"{rng.randint(140, 180)}/{rng.randint(90, 110)}" if "Hypertension" in diseases
+                             else f"{rng.randint(105, 135)}/{rng.randint(65, 88)}"),
+            "cholesterol": rng.randint(160, 240) if "Cholesterol" in diseases else rng.randint(90, 150),
+        }
+        severity = {d: rng.choice(SEVERITIES) for d in diseases if d != "None"}
+        allergies = ([{"name": a, "severity": rng.choice(SEVERITIES)} for a in rng.sample(ALLERGENS, rng.randint(1, 2))]
+                     if rng.random() < 0.3 else [])
+        profile = SimpleNamespace(
+            bmi=bmi, severity=json.dumps(severity), allergies=json.dumps(allergies) if allergies else "None",
+            diabetes_status=health.calculate_status("diabetes", values["diabetes"]),
+            bp_status=health.calculate_status("hypertension", values["hypertension"]),
+        )
+        score, level = health.calculate_overall_risk(profile)
+        profile_id += 1
+        load.add("health_profiles", (
+            profile_id, uid, rng.randint(18, 65), height, weight, bmi, gender, json.dumps(diseases),
+            profile.severity, json.dumps(values), profile.diabetes_status, profile.bp_status,
+            health.calculate_status("cholesterol", values["cholesterol"]), health.get_bmi_category(bmi),
+            score, level, profile.allergies, rng.choice(("Veg", "Non-Veg", "Non-Veg", "Vegan")),
+        ))
+    load.flush()
+    return list(range(first_user, first_user + n_users)), list(range(1, n_admins + 2))
+
+
+@step("foods + inventory")
+def gen_foods(load, rng, n_foods, now):
+    load.columns("food_items", ("id", "name", "category", "description", "price", "calories", "protein", "carbs",
+                                "fat", "sugar", "sodium", "dietary_type", "image_emoji", "is_available",
+                                "created_at", "updated_at"))
+    load.columns("inventory", ("id", "food_id", "current_stock", "reorder_level", "unit", "updated_at"))
+    stamp = dt_string(now)
+    foods = {}
+    categories = list(FOOD_KINDS)
+    for fid in range(1, n_foods + 1):
+        category = categories[(fid - 1) % len(categories)]
+        names, cal, sugar, sodium, protein, carbs, fat, price, emoji = FOOD_KINDS[category]
+        base = rng.choice(names)
+        name = f"{rng.choice(STYLES)} {base} #{fid}"
+        dietary = "Non-Veg" if any(w in base for w in NON_VEG_WORDS) else rng.choice(("Veg", "Veg", "Vegan"))
+        row = {
+            "price": round(rng.uniform(*price), 0), "calories": round(rng.uniform(*cal)),
+            "protein": round(rng.uniform(*protein), 1), "carbs": round(rng.uniform(*carbs), 1),
+            "fat": round(rng.uniform(*fat), 1), "sugar": round(rng.uniform(*sugar), 1),
+            "sodium": round(rng.uniform(*sodium)),
+        }
+        available = rng.random() < 0.95
+        load.add("food_items", (fid, name, category, f"{base}, {category.lower()} special", row["price"],
+                                row["calories"], row["protein"], row["carbs"], row["fat"], row["sugar"],
+                                row["sodium"], dietary, emoji, 1 if available else 0, stamp, stamp))
+        load.add("inventory", (fid, fid, rng.randint(0, 300), 20, "portions", stamp))
+        if available:
+            foods[fid] = (name, category, row)
+    load.flush()
+    return foods
+
+
+def _food_pickers(rng, foods):
+    """Per meal period: (categories, cum weights) and per category: (food ids, cum popularity)."""
+    by_category = {}
+    for fid, (_, category, _) in foods.items():
+        by_category.setdefault(category, []).append(fid)
+    popularity = {}
+    for category, ids in by_category.items():
+        rng.shuffle(ids)
+        # Zipf-like: a few bestsellers per category, a long tail
+        popularity[category] = (ids, list(accumulate(1 / (rank + 1) ** 0.9 for rank in range(len(ids)))))
+    periods = {}
+    for period, mix in MEAL_CATEGORIES.items():
+        mix = {c: w for c, w in mix.items() if c in popularity}
+        periods[period] = weighted(mix.items())
+    return periods, popularity
+
+
+@step("orders + order_items")
+def gen_orders(load, rng, n_orders, days, users, foods, today):
+    load.columns("orders", ("id", "user_id", "items", "total_price", "total_calories", "total_sugar",
+                            "total_sodium", "status", "payment_method", "created_at"))
+    load.columns("order_items", ("id", "order_id", "food_id", "food_name", "qty", "unit_price", "subtotal",
+                                 "health_flag"))
+    periods, popularity = _food_pickers(rng, foods)
+    # Heavy users: order frequency ~ Pareto, so ~20% of users place most orders
+    user_cum = list(accumulate(rng.paretovariate(1.3) for _ in users))
+    hours, hour_cum = weighted(HOUR_WEIGHTS.items())
+    counts_cum = weighted(ITEMS_PER_ORDER)
+    payments = weighted(PAYMENT_METHODS)
+
+    start = today - timedelta(days=days - 1)
+    day_list = [start + timedelta(days=d) for d in range(days)]
+    # Weekday pattern plus ~30% growth over the period
+    day_weights = [WEEKDAY_WEIGHTS[d.weekday()] * (1 + 0.3 * i / max(1, days - 1)) for i, d in enumerate(day_list)]
+    scale = n_orders / sum(day_weights)
+    per_day = [int(w * scale) for w in day_weights]
+    per_day[-1] += n_orders - sum(per_day)
+
+    order_id = item_id = 0
+    choices, random_ = rng.choices, rng.random
+    for day, count in zip(day_list, per_day):
+        if count <= 0:
+            continue
+        day_s = day.isoformat()
+        is_today = day == today
+        order_hours = sorted(choices(hours, cum_weights=hour_cum, k=count))
+        buyers = choices(users, cum_weights=user_cum, k=count)
+        sizes = choices(counts_cum[0], cum_weights=counts_cum[1], k=count)
+        for hour, user_id, size in zip(order_hours, buyers, sizes):
+            order_id += 1
+            categories, category_cum = periods[meal_period(hour)]
+            picked = []
+            for category in choices(categories, cum_weights=category_cum, k=size):
+                ids, cum = popularity[category]
+                picked.append(ids[bisect_left(cum, random_() * cum[-1])])
+            price = calories = sugar = sodium = 0.0
+            qty_by_food = {}
+            for fid in picked:
+                qty_by_food[fid] = qty_by_food.get(fid, 0) + 1
+            for fid, qty in qty_by_food.items():
+                name, _, f = foods[fid]
+                item_id += 1
+                subtotal = f["price"] * qty
+                price += subtotal
+                calories += f["calories"] * qty
+                sugar += f["sugar"] * qty
+                sodium += f["sodium"] * qty
+                load.add("order_items", (item_id, order_id, fid, name, qty, f["price"], subtotal,
+                                         1 if f["sugar"] > 30 or f["sodium"] > 1500 else 0))
+            r = random_()
+            if is_today and r < 0.3:
+                status = "pending"
+            else:
+                status = "cancelled" if r < 0.04 else "completed"
+            created = (f"{day_s}T{hour:02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+                       f".{rng.randrange(1_000_000):06d}")
+            load.add("orders", (order_id, user_id, json.dumps(picked), round(price, 2), round(calories, 1),
+                                round(sugar, 1), round(sodium, 1), status,
+                                choices(payments[0], cum_weights=payments[1])[0], created))
+    load.flush()
+    return order_id, item_id
+
+
+@step("audit logs")
+def gen_audit_logs(load, rng, n_logs, days, admins, today):
+    load.columns("audit_logs", ("id", "admin_id", "action_type", "target_table", "target_id", "summary",
+                                "payload", "ip_address", "user_agent", "timestamp"))
+    actions, action_cum = weighted(AUDIT_ACTIONS)
+    targets = {"LOGIN": None, "LOGOUT": None, "EXPORT": "orders", "RETRAIN": "ai_model_status",
+               "STATUS_CHANGE": "orders", "UPDATE": "food_items", "CREATE": "food_items", "DELETE": "food_items"}
+    start = datetime.combine(today - timedelta(days=days - 1), datetime.min.time())
+    span = days * 86400
+    stamps = sorted(rng.random() * span for _ in range(n_logs))
+    for i, offset in enumerate(stamps, start=1):
+        action = rng.choices(actions, cum_weights=action_cum)[0]
+        table = targets[action]
+        target_id = str(rng.randint(1, 5000)) if table else None
+        summary = f"{action.replace('_', ' ').title()} {table or 'session'}{f' #{target_id}' if target_id else ''}"
+        payload = json.dumps({"status": rng.choice(("completed", "cancelled"))}) if action == "STATUS_CHANGE" else None
+        load.add("audit_logs", (i, rng.choice(admins), action, table, target_id, summary, payload,
+                                f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}", rng.choice(USER_AGENTS),
+                                dt_string(start + timedelta(seconds=offset))))
+    load.flush()
+
+
+@step("indexes")
+def rebuild_indexes(conn, indexes):
+    for index in indexes:
+        index.create(bind=conn)
+
+
+@step("rollups")
+def build_rollups(conn):
+    """Set-based equivalent of rollups.rebuild() for orders that carry order_items (all generated ones do)."""
+    conn.exec_driver_sql("DELETE FROM daily_sales_rollup")
+    conn.exec_driver_sql("DELETE FROM user_daily_nutrition")
+    # Order-level totals rows
+    conn.exec_driver_sql(f"""
+        INSERT INTO daily_sales_rollup (date, hour, category, food_id, status, food_name, orders, qty, revenue)
+        SELECT substr(created_at, 1, 10), CAST(substr(created_at, 12, 2) AS INTEGER), '{ORDER_CATEGORY}', 0,
+               COALESCE(status, 'completed'), NULL, COUNT(*), 0, SUM(COALESCE(total_price, 0))
+        FROM orders WHERE length(created_at) >= 13
+        GROUP BY 1, 2, 5
+    """)
+    # Per-food line rows
+    conn.exec_driver_sql(f"""
+        INSERT INTO daily_sales_rollup (date, hour, category, food_id, status, food_name, orders, qty, revenue)
+        SELECT substr(o.created_at, 1, 10), CAST(substr(o.created_at, 12, 2) AS INTEGER),
+               COALESCE(f.category, '{UNCATEGORIZED}'), COALESCE(oi.food_id, 0), COALESCE(o.status, 'completed'),
+               MIN(COALESCE(oi.food_name, f.name)), COUNT(*), SUM(COALESCE(oi.qty, 1)), SUM(COALESCE(oi.subtotal, 0))
+        FROM order_items oi
+        JOIN orders o ON o.id = oi.order_id
+        LEFT JOIN food_items f ON f.id = oi.food_id
+        WHERE length(o.created_at) >= 13
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+    # Per-user daily nutrition: recorded checkout totals win, other nutrients summed from the foods
+    sums = ", ".join(f"SUM(COALESCE(f.{n}, 0) * COALESCE(oi.qty, 1)) AS {n}" for n in NUTRIENTS)
+    picks = ", ".join(
+        f"SUM(CASE WHEN o.total_{n} THEN o.total_{n} ELSE p.{n} END)" if n in ("calories", "sugar", "sodium")
+        else f"SUM(p.{n})"
+        for n in NUTRIENTS
+    )
+    conn.exec_driver_sql(f"""
+        INSERT INTO user_daily_nutrition (user_id, date, orders, {', '.join(NUTRIENTS)})
+        SELECT o.user_id, substr(o.created_at, 1, 10), COUNT(*), {picks}
+        FROM orders o
+        JOIN (SELECT oi.order_id, {sums}
+              FROM order_items oi LEFT JOIN food_items f ON f.id = oi.food_id
+              GROUP BY oi.order_id) p ON p.order_id = o.id
+        WHERE o.user_id IS NOT NULL AND COALESCE(o.status, 'completed') != 'cancelled'
+              AND length(o.created_at) >= 13
+        GROUP BY 1, 2
+    """)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic HealthBite database")
+    parser.add_argument("--db", default=os.path.join(ROOT, "synthetic.db"), help="SQLite file to create")
+    parser.add_argument("--force", action="store_true", help="overwrite --db if it exists")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every row count by this")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--admins", type=int, default=5)
+    parser.add_argument("--foods", type=int, default=5_000)
+    parser.add_argument("--orders", type=int, default=5_000_000)
+    parser.add_argument("--audit-logs", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=365, help="order history length, ending today")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="Synthetic@123", help="password of every generated account")
+    parser.add_argument("--skip-rollups", action="store_true")
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        if not args.force:
+            sys.exit(f"{args.db} exists; pass --force to overwrite it")
+        os.remove(args.db)
+
+    n_users = max(1, int(args.users * args.scale))
+    n_foods = max(len(FOOD_KINDS), int(args.foods * args.scale))
+    n_orders = int(args.orders * args.scale)
+    n_logs = int(args.audit_logs * args.scale)
+    rng = random.Random(args.seed)
+    today = date.today()
+    print(f"Generating {n_users} users, {n_foods} foods, {n_orders} orders, {n_logs} audit logs into {args.db}")
+
+    engine = create_engine(f"sqlite:///{args.db}")
+
+    @event.listens_for(engine, "connect")
+    def _bulk_pragmas(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        for pragma in ("journal_mode=OFF", "synchronous=OFF", "cache_size=-262144", "temp_store=MEMORY",
+                       "locking_mode=EXCLUSIVE"):
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+    started = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    dropped = [index for table in Base.metadata.sorted_tables if table.name in BULK_TABLES
+               for index in table.indexes]
+
+    password_hash = pwd_context.hash(args.password)
+    admin_hash = pwd_context.hash("Admin@123")
+    with engine.begin() as conn:
+        for index in dropped:
+            index.drop(bind=conn)
+        load = Loader(conn, args.batch_size)
+        users, admins = gen_users(load, rng, n_users, args.admins, password_hash, admin_hash)
+        foods = gen_foods(load, rng, n_foods, datetime.utcnow())
+        gen_orders(load, rng, n_orders, args.days, users, foods, today)
+        gen_audit_logs(load, rng, n_logs, args.days, admins, today)
+        rebuild_indexes(conn, dropped)
+        if not args.skip_rollups:
+            build_rollups(conn)
+
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    engine.dispose()
+
+    for table, count in load.counts.items():
+        print(f"  {table:20} {count:>10,} rows")
+    size_mb = os.path.getsize(args.db) / 1e6
+    print(f"Done in {time.perf_counter() - started:.1f}s, {size_mb:,.0f} MB. "
+          f"Log in as admin@canteen.local / Admin@123 or user<N>@synthetic.local / {args.password}")
+
+
+if __name__ == "__main__":
+    main()
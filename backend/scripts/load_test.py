@@ -0,0 +1,288 @@
+"""Lunch-rush load test: virtual users replaying real flows, with a JSON report.
+
+Each virtual user logs in (registering loadtest<N>@canteen.local with a
+health profile the first time), loads /api/me/bootstrap, then loops until the
+test ends, picking one action per iteration:
+
+    browse the scored menu        GET  /api/menu/intelligent      45%
+    place an order (1-3 items)    POST /api/menu/order            20%
+    ask the chatbot               POST /api/chatbot/query         15%
+    page through order history    GET  /api/menu/history          10%
+    log a glass of water          POST /api/health/daily-log      10%
+
+Users sleep a random think time between iterations (--think-min/--think-max).
+They all start within --ramp seconds, so a short ramp models the 12:30
+spike, including the mass login at the start. Admin users poll the dashboard
+overview, stats, alerts and today's orders-by-hour every --admin-poll seconds.
+
+The report gives, per route and overall: request count, throughput,
+p50/p95/p99/max latency and error rate. It goes to stdout and, as JSON, to
+--output so runs can be kept as baselines and compared.
+
+    python scripts/load_test.py --in-process --users 50 --duration 60
+    python scripts/load_test.py --url http://127.0.0.1:8000 --users 200 --ramp 5
+
+--in-process drives the app through httpx's ASGI transport, with no sockets.
+It runs on a throwaway copy of canteen.db, set through DATABASE_URL. A live
+run writes orders and daily logs into the server's database, so point it at
+a staging copy.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+# Ensure imports work when running from this script location
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+import httpx
+
+# httpx logs every request at INFO; that would swamp the report
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+PASSWORD = "Loadtest@123"
+DISEASES = ([], [], ["Diabetes"], ["Hypertension"], ["Diabetes", "Hypertension"], ["Heart Disease"], ["Obesity"])
+ALLERGIES = ([], [], [], [{"name": "Nuts", "severity": "Severe"}], [{"name": "Dairy", "severity": "Mild"}])
+CHAT_MESSAGES = (
+    "What should I eat for lunch?",
+    "Is the chicken salad good for my sugar?",
+    "Suggest something low in sodium",
+    "How many calories have I had today?",
+    "I want something high protein",
+)
+USER_ACTIONS = (("menu", 45), ("order", 20), ("chatbot", 15), ("history", 10), ("water", 10))
+ADMIN_PATHS = (
+    "/api/admin/overview",
+    "/api/admin/dashboard-stats",
+    "/api/admin/alerts",
+    "/api/admin/analytics/orders-by-hour-today",
+)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)    # route -> [seconds]
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.errors = defaultdict(int)
+        self.started = self.finished = None
+
+    async def call(self, client, method, path, ok=None, **kwargs):
+        """Issue one request and time it under "METHOD path" (query strings go in params=).
+
+        Statuses >= 400 count as errors unless listed in `ok`.
+        """
+        key = f"{method} {path}"
+        start = time.perf_counter()
+        try:
+            r = await client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.latencies[key].append(time.perf_counter() - start)
+            self.statuses[key][type(e).__name__] += 1
+            self.errors[key] += 1
+            return None
+        self.latencies[key].append(time.perf_counter() - start)
+        self.statuses[key][str(r.status_code)] += 1
+        if r.status_code >= 400 and not (ok and r.status_code in ok):
+            self.errors[key] += 1
+        return r
+
+    def report(self, config):
+        elapsed = self.finished - self.started
+        routes = {key: _summarize(lat, self.errors[key], elapsed, self.statuses[key])
+                  for key, lat in sorted(self.latencies.items())}
+        everything = [x for lat in self.latencies.values() for x in lat]
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "config": config,
+            "duration_s": round(elapsed, 3),
+            "overall": _summarize(everything, sum(self.errors.values()), elapsed, None),
+            "routes": routes,
+        }
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    return sorted_values[max(0, math.ceil(q / 100 * len(sorted_values)) - 1)]
+
+
+def _summarize(latencies, errors, elapsed, statuses):
+    values = sorted(latencies)
+    n = len(values)
+    summary = {
+        "requests": n,
+        "throughput_rps": round(n / elapsed, 2) if elapsed else 0,
+        "error_rate": round(errors / n, 4) if n else 0,
+        "mean_ms": round(sum(values) / n * 1000, 2) if n else 0,
+        "p50_ms": round(_percentile(values, 50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if n else 0,
+    }
+    if statuses is not None:
+        summary["statuses"] = dict(statuses)
+    return summary
+
+
+async def think(args):
+    await asyncio.sleep(random.uniform(args.think_min, args.think_max))
+
+
+async def sign_in(client, rec, email, role):
+    # 401 on the first run just means the account doesn't exist yet
+    r = await rec.call(client, "POST", "/api/auth/login", ok=(401,),
+                       json={"email": email, "password": PASSWORD, "role": role})
+    if r is not None and r.status_code == 200:
+        return {"Authorization": f"Bearer {r.json()['token']}"}, False
+    r = await rec.call(client, "POST", "/api/auth/register",
+                       json={"name": email.split("@")[0], "email": email, "password": PASSWORD, "role": role})
+    if r is None or r.status_code != 200:
+        return None, False
+    return {"Authorization": f"Bearer {r.json()['token']}"}, True
+
+
+async def virtual_user(n, client, rec, args, deadline):
+    await asyncio.sleep(random.uniform(0, args.ramp))
+    headers, new = await sign_in(client, rec, f"loadtest{n}@canteen.local", "USER")
+    if headers is None:
+        return
+    if new:
+        await rec.call(client, "POST", "/api/health/profile", headers=headers, json={
+            "age": random.randint(18, 65), "height_cm": random.randint(150, 190),
+            "weight_kg": random.randint(45, 110), "gender": random.choice(("Male", "Female")),
+            "disease": random.choice(DISEASES), "allergies": random.choice(ALLERGIES),
+            "dietary_preference": random.choice(("Veg", "Non-Veg")),
+            "health_values": {"diabetes": random.randint(80, 220), "hypertension": random.randint(110, 170)},
+        })
+    await rec.call(client, "GET", "/api/me/bootstrap", headers=headers)
+
+    menu = []
+    cursor = None
+    actions, weights = zip(*USER_ACTIONS)
+    while time.monotonic() < deadline:
+        action = random.choices(actions, weights)[0]
+        if action == "menu" or (action == "order" and not menu):
+            r = await rec.call(client, "GET", "/api/menu/intelligent", headers=headers)
+            if r is not None and r.status_code == 200:
+                menu = r.json()
+        elif action == "order":
+            picks = random.sample(menu, min(len(menu), random.randint(1, 3)))
+            await rec.call(client, "POST", "/api/menu/order", headers=headers, json={
+                "items": [p["id"] for p in picks],
+                "total_price": sum(p.get("price") or 0 for p in picks),
+                "total_calories": sum(p.get("calories") or 0 for p in picks),
+                "total_sugar": sum(p.get("sugar") or 0 for p in picks),
+                "total_sodium": sum(p.get("sodium") or 0 for p in picks),
+            })
+            cursor = None
+        elif action == "chatbot":
+            await rec.call(client, "POST", "/api/chatbot/query", headers=headers,
+                           json={"message": random.choice(CHAT_MESSAGES)})
+        elif action == "history":
+            r = await rec.call(client, "GET", "/api/menu/history", headers=headers,
+                               params={"limit": 20, **({"cursor": cursor} if cursor else {})})
+            cursor = r.json().get("next_cursor") if r is not None and r.status_code == 200 else None
+        elif action == "water":
+            await rec.call(client, "POST", "/api/health/daily-log", headers=headers, json={"water_intake_ml": 250})
+        await think(args)
+
+
+async def admin_poller(n, client, rec, args, deadline):
+    await asyncio.sleep(random.uniform(0, args.ramp))
+    r = await rec.call(client, "POST", "/api/auth/login",
+                       json={"email": args.admin_email, "password": args.admin_password, "role": "ADMIN"})
+    if r is None or r.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {r.json()['token']}"}
+    while time.monotonic() < deadline:
+        await asyncio.gather(*(rec.call(client, "GET", path, headers=headers) for path in ADMIN_PATHS))
+        await asyncio.sleep(args.admin_poll)
+
+
+def make_client(args):
+    limits = httpx.Limits(max_connections=args.users + args.admins * len(ADMIN_PATHS))
+    if args.in_process:
+        tmp = tempfile.mkdtemp(prefix="loadtest-")
+        db_path = os.path.join(tmp, "canteen.db")
+        source = os.path.join(ROOT, "canteen.db")
+        if os.path.exists(source):
+            shutil.copyfile(source, db_path)
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        os.chdir(ROOT)
+        from app import app, prepare_database
+        # The ASGI transport does not run the startup hook
+        prepare_database()
+        if not os.path.exists(source):
+            import seed
+            seed.seed_db()
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60, limits=limits)
+    return httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits)
+
+
+async def run(args):
+    rec = Recorder()
+    async with make_client(args) as client:
+        rec.started = time.perf_counter()
+        deadline = time.monotonic() + args.ramp + args.duration
+        tasks = [virtual_user(i, client, rec, args, deadline) for i in range(args.users)]
+        tasks += [admin_poller(i, client, rec, args, deadline) for i in range(args.admins)]
+        await asyncio.gather(*tasks)
+        rec.finished = time.perf_counter()
+    return rec
+
+
+def print_report(report):
+    print(f"{'route':52} {'reqs':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6}")
+    rows = list(report["routes"].items()) + [("TOTAL", report["overall"])]
+    for route, s in rows:
+        print(f"{route:52} {s['requests']:7d} {s['throughput_rps']:7.1f} {s['p50_ms']:8.1f} "
+              f"{s['p95_ms']:8.1f} {s['p99_ms']:8.1f} {s['error_rate'] * 100:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lunch-rush load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true", help="drive the ASGI app directly on a copy of canteen.db")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=60, help="seconds after the ramp")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds over which users arrive")
+    parser.add_argument("--think-min", type=float, default=0.5)
+    parser.add_argument("--think-max", type=float, default=3.0)
+    parser.add_argument("--admin-poll", type=float, default=5.0)
+    parser.add_argument("--admin-email", default="admin@canteen.local")
+    parser.add_argument("--admin-password", default="Admin@123")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for repeatable runs")
+    parser.add_argument("--output", default=None, help="JSON report path (default loadtest-<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    rec = asyncio.run(run(args))
+    config = {k: v for k, v in vars(args).items() if k not in ("admin_password", "output")}
+    report = rec.report(config)
+    print_report(report)
+
+    output = args.output or f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Soak test: drive the hot endpoints for N minutes and check memory stays bounded.
+
+Logs in as an admin and a regular user, then loops over the menu, bootstrap,
+chatbot, order history and admin report endpoints. Every --sample seconds it
+reads traced memory and RSS from /api/admin/performance/memory. Traced memory
+needs tracemalloc, which the script starts over the API.
+
+The first --warmup seconds fill caches and connection pools and don't count.
+After that, the script compares the median of the first three samples with
+the median of the last three. If either traced memory or RSS grew by more
+than --max-growth-mb, it prints the top growing lines from a tracemalloc diff
+and exits with status 1.
+
+    python scripts/soak_memory.py [--minutes 10] [--url http://127.0.0.1:8000]
+    python scripts/soak_memory.py --in-process --minutes 2
+
+--in-process imports the app and drives it with TestClient against the local
+canteen.db. Every request in the loop is a read.
+
+Against a live server, run it with a single worker that is not recycled
+(`python serve.py --workers 1 --max-requests 0`). tracemalloc and its snapshots are per process; with several
+workers the samples would come from whichever worker answered. Every memory
+response carries the worker's pid, and the script stops if it changes (a
+second worker, or the worker being recycled by --max-requests).
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+# Ensure imports work when running from this script location
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+MEMORY = "/api/admin/performance/memory"
+CHAT_MESSAGES = ("What should I eat for lunch?", "Is the chicken salad good for diabetes?", "low sugar snacks")
+
+
+def make_client(args):
+    if args.in_process:
+        from fastapi.testclient import TestClient
+        os.chdir(ROOT)
+        from app import app, prepare_database
+        prepare_database()
+        # TestClient logs every request through httpx; keep the output to the samples
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        return TestClient(app)
+    import httpx
+    return httpx.Client(base_url=args.url, timeout=30)
+
+
+def login(client, email, password, role):
+    r = client.post("/api/auth/login", json={"email": email, "password": password, "role": role})
+    if r.status_code != 200:
+        sys.exit(f"Login failed for {email}: {r.status_code} {r.text}")
+    return {"Authorization": f"Bearer {r.json()['token']}"}
+
+
+def hot_requests(admin, user):
+    """(method, path, headers, json) for one pass over the endpoints under suspicion."""
+    calls = [
+        ("GET", "/api/menu/intelligent", user, None),
+        ("GET", "/api/me/bootstrap", user, None),
+        ("GET", "/api/menu/history?limit=20", user, None),
+        ("GET", "/api/admin/export/sales/preview", admin, None),
+        ("GET", "/api/admin/export/inventory", admin, None),
+        ("GET", "/api/admin/orders?page=1&per_page=50", admin, None),
+    ]
+    calls += [("POST", "/api/chatbot/query", user, {"message": m}) for m in CHAT_MESSAGES]
+    return calls
+
+
+def same_worker(response, pid):
+    """The JSON of a memory endpoint response, after checking it came from worker `pid`."""
+    body = response.json()
+    if body.get("pid") != pid:
+        sys.exit(f"Worker changed: pid {pid} started tracing, pid {body.get('pid')} answered. "
+                 f"Memory state is per process; soak a single worker (serve.py --workers 1) "
+                 f"with recycling off (--max-requests 0).")
+    return body
+
+
+def sample(client, admin, pid):
+    status = same_worker(client.get(MEMORY, headers=admin), pid)
+    return status["traced_kb"] / 1024, (status["rss_kb"] or 0) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory soak test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--in-process", action="store_true", help="drive the app in this process via TestClient")
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--warmup", type=float, default=30, help="seconds before the baseline is taken")
+    parser.add_argument("--sample", type=float, default=10, help="seconds between memory samples")
+    parser.add_argument("--max-growth-mb", type=float, default=20)
+    parser.add_argument("--admin-email", default="admin@canteen.local")
+    parser.add_argument("--admin-password", default="Admin@123")
+    parser.add_argument("--user-email", default="test@example.com")
+    parser.add_argument("--user-password", default="Test@1234!")
+    args = parser.parse_args()
+
+    client = make_client(args)
+    admin = login(client, args.admin_email, args.admin_password, "ADMIN")
+    user = login(client, args.user_email, args.user_password, "USER")
+    pid = client.post(f"{MEMORY}/start", headers=admin, json={"frames": 10}).json()["pid"]
+    calls = hot_requests(admin, user)
+
+    start = time.monotonic()
+    end = start + args.warmup + args.minutes * 60
+    baseline_id = None
+    samples = []
+    requests = errors = 0
+    next_sample = start + args.warmup
+
+    while time.monotonic() < end:
+        for method, path, headers, body in calls:
+            r = client.request(method, path, headers=headers, json=body)
+            requests += 1
+            if r.status_code >= 400:
+                errors += 1
+        now = time.monotonic()
+        if now >= next_sample:
+            if baseline_id is None:
+                baseline_id = same_worker(client.post(f"{MEMORY}/snapshots", headers=admin,
+                                                      json={"label": "soak baseline"}), pid)["id"]
+            traced, rss = sample(client, admin, pid)
+            samples.append((traced, rss))
+            print(f"{now - start:7.0f}s  requests {requests:7d}  errors {errors:5d}  traced {traced:8.1f} MB  rss {rss:8.1f} MB")
+            next_sample = now + args.sample
+
+    if len(samples) < 6:
+        sys.exit("Not enough samples; run longer or sample more often")
+
+    first = [statistics.median(v) for v in zip(*samples[:3])]
+    last = [statistics.median(v) for v in zip(*samples[-3:])]
+    growth = [b - a for a, b in zip(first, last)]
+    print(f"growth after warm-up: traced {growth[0]:+.1f} MB  rss {growth[1]:+.1f} MB  (limit {args.max_growth_mb} MB)")
+
+    if max(growth) > args.max_growth_mb:
+        report = same_worker(client.get(f"{MEMORY}/diff", headers=admin, params={"base": baseline_id, "limit": 15}), pid)
+        print("Top growth since baseline:")
+        for row in report["diff"]:
+            print(f"  {row['size_diff_kb']:+10.1f} KB  {row['count_diff']:+8d} blocks  {row['where']}  {row.get('code', '')}")
+        print("FAIL: memory grew beyond the limit")
+        sys.exit(1)
+    print("PASS")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+HealthBite Smart Canteen - Production Launcher
+==============================================
+Runs the app on several worker processes, one per core by default, so the
+lunch rush is not served by a single CPU.
+
+    python serve.py                         # auto: gunicorn if available, else uvicorn
+    python serve.py --workers 4 --port 8000
+    python serve.py --server uvicorn --max-requests 0
+
+Two servers, picked with --server (default auto):
+
+- gunicorn (Linux/macOS, when installed): UvicornWorker processes, with the
+  app imported once in the master and forked (--preload). Workers share the
+  master's memory pages until they write to them.
+- uvicorn (everywhere, including Windows): uvicorn's own supervisor. Each
+  worker builds the app itself (app:create_app).
+
+The launcher runs app.prepare_database() once before starting any worker,
+and the workers skip it (PREPARE_DB=0).
+
+Either way:
+
+- The event loop and HTTP parser are uvloop and httptools when installed
+  (`uvicorn[standard]`), and the stock asyncio/h11 otherwise.
+- Each worker runs warmup.run() in its startup hook (WARMUP=1). It reports
+  ready and takes traffic only after that.
+- A worker is replaced after --max-requests requests, give or take
+  --max-requests-jitter. This bounds slow memory growth, and the jitter keeps
+  workers from recycling together.
+- `kill -HUP <launcher pid>` restarts the workers gracefully. A retiring
+  worker stops accepting and finishes its in-flight requests (an order being
+  placed, say) for up to --graceful-timeout seconds. Under uvicorn the
+  restart is rolling: each replacement must be ready before the old worker is
+  retired. Windows has no SIGHUP; restart the launcher instead.
+- With more than one worker and the memory cache backend, CACHE_BUS=1 is set
+  so an invalidation in one worker reaches the others (see cache_bus.py).
+
+`python app.py` still runs a single process with no warm-up, for development.
+"""
+import argparse
+import logging
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger("serve")
+
+
+def default_workers():
+    # SQLite takes one writer at a time; past a handful of workers, more
+    # processes mostly queue on the database
+    return int(os.environ.get("WEB_CONCURRENCY", min(os.cpu_count() or 1, 8)))
+
+
+def have_gunicorn():
+    if sys.platform == "win32":
+        return False
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def after_fork():
+    """Per-process state a preloaded app must not share with its parent."""
+    import cache
+    import log_config
+    from database import engine
+
+    # Pooled SQLite connections and the log listener thread do not survive a fork
+    engine.dispose(close=False)
+    log_config.after_fork()
+    cache.after_fork()
+
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    try:
+        import uvicorn_worker  # noqa: F401
+        worker_class = "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        worker_class = "uvicorn.workers.UvicornWorker"
+
+    class Launcher(BaseApplication):
+        def load_config(self):
+            options = {
+                "bind": f"{args.host}:{args.port}",
+                "workers": args.workers,
+                "worker_class": worker_class,
+                "preload_app": True,
+                "max_requests": args.max_requests,
+                "max_requests_jitter": args.max_requests_jitter,
+                "graceful_timeout": args.graceful_timeout,
+                # A worker still warming up must not be mistaken for a hung one
+                "timeout": max(args.ready_timeout, 30),
+                "keepalive": args.keep_alive,
+                "post_fork": lambda server, worker: after_fork(),
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import create_app
+            return create_app()
+
+    Launcher().run()
+
+
+def run_uvicorn(args):
+    import uvicorn
+    from uvicorn.supervisors import Multiprocess
+
+    config = uvicorn.Config(
+        "app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="auto",
+        http="auto",
+        limit_max_requests=args.max_requests or None,
+        limit_max_requests_jitter=args.max_requests_jitter,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keep_alive,
+        timeout_worker_healthcheck=args.ready_timeout,
+        # Keep the workers on the queue-backed JSON handlers from log_config
+        log_config=None,
+    )
+    # Supervise even a single worker, so recycling and SIGHUP restarts still work
+    Multiprocess(config, sockets=[config.bind_socket()]).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("auto", "gunicorn", "uvicorn"), default="auto")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="worker processes (default WEB_CONCURRENCY, else one per core up to 8)")
+    parser.add_argument("--max-requests", type=int, default=5000, help="recycle a worker after this many; 0 = never")
+    parser.add_argument("--max-requests-jitter", type=int, default=500)
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="seconds a retiring worker gets to finish in-flight requests")
+    parser.add_argument("--keep-alive", type=int, default=5)
+    parser.add_argument("--ready-timeout", type=int, default=60,
+                        help="seconds a new worker gets to start and warm up")
+    parser.add_argument("--no-warmup", action="store_true")
+    args = parser.parse_args()
+
+    os.chdir(BASE_DIR)
+    sys.path.insert(0, BASE_DIR)
+    # Workers inherit these: spawned uvicorn workers read them when they import
+    # the app, and gunicorn's master reads them before it preloads the app
+    os.environ.setdefault("WARMUP", "0" if args.no_warmup else "1")
+    if args.workers > 1 and os.environ.get("CACHE_BACKEND", "memory") == "memory":
+        os.environ.setdefault("CACHE_BUS", "1")
+
+    server = args.server
+    if server == "auto":
+        server = "gunicorn" if have_gunicorn() else "uvicorn"
+
+    import log_config
+    log_config.configure()
+    # Once, here: several workers creating the same tables at once collide
+    from app import prepare_database
+    prepare_database()
+    os.environ["PREPARE_DB"] = "0"
+    logger.info("HealthBite starting %d %s worker(s) on http://%s:%d", args.workers, server, args.host, args.port)
+    if server == "gunicorn":
+        run_gunicorn(args)
+    else:
+        run_uvicorn(args)
+
+
+if __name__ == "__main__":
+    main()
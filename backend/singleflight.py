@@ -0,0 +1,83 @@
+"""Single-flight: concurrent calls for the same key share one computation.
+
+When the lunch bell rings, hundreds of identical dashboard and menu requests
+miss the cache at the same instant. Without coalescing, each one runs the
+same queries. With it, the first caller for a key (the leader) computes and
+the others wait for its result, or its exception.
+
+    value, leader = group.do(key, fn)                  # sync code / threadpool
+    value, leader = await group.do_async(key, fn)      # async handlers
+
+Both forms share one registry of in-flight futures, so a sync handler running
+in the threadpool and an async handler on the event loop coalesce with each
+other. A key is only registered by a leader that is already running on a
+thread: do_async awaits a call that is in flight, and otherwise leads (or
+joins) through do() inside the threadpool. Sync followers blocked in do()
+hold threadpool tokens, so a registered leader that still had to wait for a
+token could be starved by its own followers.
+
+Coalescing is per process. SINGLEFLIGHT=0 turns it off for A/B measurements
+(scripts/bench_singleflight.py).
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future
+
+from starlette.concurrency import run_in_threadpool
+
+ENABLED = os.environ.get("SINGLEFLIGHT", "1") != "0"
+
+
+class Group:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}    # key -> Future of the leader's result
+
+    def _join(self, key):
+        """(future, is_leader); the leader must call _finish."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def _finish(self, key, future, fn):
+        try:
+            value = fn()
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._calls[key]
+        future.set_result(value)
+        return value
+
+    def do(self, key, fn):
+        """Return (fn(), True) as the leader, or (leader's result, False) after waiting for it."""
+        if not ENABLED:
+            return fn(), True
+        future, leader = self._join(key)
+        if leader:
+            return self._finish(key, future, fn), True
+        return future.result(), False
+
+    async def do_async(self, key, fn):
+        """Like do() for async callers: `fn` is sync and runs in the threadpool, followers await."""
+        if not ENABLED:
+            return await run_in_threadpool(fn), True
+        with self._lock:
+            future = self._calls.get(key)
+        if future is not None:
+            return await asyncio.wrap_future(future), False
+        return await run_in_threadpool(self.do, key, fn)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+group = Group()
@@ -0,0 +1,171 @@
+"""In-memory, precompressed frontend asset store.
+
+Everything under frontend/ is read once, at construction or, with
+preload=False, by the first ensure_built() or request:
+- each file gets a strong ETag (sha256 of its bytes) and, for text types,
+  gzip (and brotli when the `brotli` package is installed) variants;
+- every .css/.js file is also published under a content-hashed name
+  (style.css -> style.3f2a9c1e.css) served with immutable caching, and the
+  src/href references in HTML pages are rewritten to those names.
+
+HTML and un-hashed URLs are served with `no-cache` so browsers revalidate
+with If-None-Match and get a 304 when nothing changed. Restart the server to
+pick up frontend edits. Directories listed in `exclude` (images, which have
+their own derivative pipeline in image_service.py) are not loaded.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_BYTES = 512
+HASHED_EXTENSIONS = (".css", ".js")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_REF_RE = re.compile(r'(\b(?:src|href)=")([^"#?:]+\.(?:css|js))(")')
+
+
+class _Asset:
+    __slots__ = ("media_type", "etag", "bodies", "cache_control")
+
+    def __init__(self, data: bytes, media_type: str, cache_control: str):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        self.bodies = {"identity": data}
+        if media_type.startswith(COMPRESSIBLE_TYPES) and len(data) >= MIN_COMPRESS_BYTES:
+            gz = gzip.compress(data, compresslevel=9, mtime=0)
+            if len(gz) < len(data):
+                self.bodies["gzip"] = gz
+            if brotli is not None:
+                br = brotli.compress(data, quality=11)
+                if len(br) < len(data):
+                    self.bodies["br"] = br
+
+    def pick(self, accept_encoding: str):
+        """Choose the smallest body the client accepts."""
+        accepted = set()
+        for part in accept_encoding.split(","):
+            token, _, params = part.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(token.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+class StaticAssets:
+    def __init__(self, root: str, index: str = "index.html", exclude=(), preload: bool = True):
+        self.root = os.path.abspath(root)
+        self.index = index
+        self.exclude = tuple(exclude)
+        self.assets = {}     # url path (no leading slash) -> _Asset
+        self.hashed = {}     # original url path -> hashed url path
+        self.built = False
+        self._lock = threading.Lock()
+        if preload:
+            self.build()
+
+    def ensure_built(self):
+        if not self.built:
+            with self._lock:
+                if not self.built:
+                    self.build()
+
+    def build(self):
+        files = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                rel = os.path.relpath(full, self.root).replace(os.sep, "/")
+                if rel.startswith(self.exclude):
+                    continue
+                with open(full, "rb") as fh:
+                    files[rel] = fh.read()
+
+        assets, hashed = {}, {}
+        for rel, data in files.items():
+            if rel.endswith(HASHED_EXTENSIONS):
+                stem, ext = posixpath.splitext(rel)
+                hashed_rel = f"{stem}.{hashlib.sha256(data).hexdigest()[:8]}{ext}"
+                hashed[rel] = hashed_rel
+                assets[hashed_rel] = _Asset(data, self._media_type(rel), IMMUTABLE)
+
+        for rel, data in files.items():
+            if rel.endswith(".html"):
+                data = self._rewrite_html(rel, data, hashed)
+            assets[rel] = _Asset(data, self._media_type(rel), REVALIDATE)
+
+        self.assets, self.hashed = assets, hashed
+        self.built = True
+
+    @staticmethod
+    def _media_type(rel: str) -> str:
+        if rel.endswith(".js"):
+            return "application/javascript"
+        media_type, _ = mimetypes.guess_type(rel)
+        media_type = media_type or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+        return media_type
+
+    @staticmethod
+    def _rewrite_html(rel: str, data: bytes, hashed: dict) -> bytes:
+        """Point src/href references at the content-hashed asset names."""
+        base = posixpath.dirname(rel)
+        text = data.decode("utf-8")
+
+        def swap(match):
+            ref = match.group(2)
+            target = posixpath.normpath(ref.lstrip("/") if ref.startswith("/") else posixpath.join(base, ref))
+            if target not in hashed:
+                return match.group(0)
+            new = hashed[target]
+            if ref.startswith("/"):
+                new_ref = "/" + new
+            else:
+                new_ref = posixpath.relpath(new, base or ".")
+            return f"{match.group(1)}{new_ref}{match.group(3)}"
+
+        return _REF_RE.sub(swap, text).encode("utf-8")
+
+    def response(self, request: Request, path: str) -> Response:
+        """Serve `path` (or index.html for unknown paths) with caching headers."""
+        self.ensure_built()
+        path = path.lstrip("/")
+        if path.startswith("frontend/"):
+            path = path[len("frontend/"):]
+        asset = self.assets.get(path) or self.assets.get(self.index)
+        if asset is None:
+            return Response(status_code=404)
+
+        encoding = asset.pick(request.headers.get("accept-encoding", ""))
+        etag = asset.etag if encoding == "identity" else f'{asset.etag[:-1]}-{encoding}"'
+        headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+            if "*" in tags or etag in tags:
+                return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=asset.bodies[encoding], media_type=asset.media_type, headers=headers)
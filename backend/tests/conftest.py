@@ -0,0 +1,130 @@
+"""Shared fixtures: the app driven in-process on a throwaway database.
+
+Each process builds a template database once, at import: the schema, indexes
+and seed data. Under pytest-xdist that means once per worker. Every test then
+starts from a fresh copy of the template in the process's own temp dir, so
+tests can run in any order and in parallel. The app reads DATABASE_URL at
+import time, which is why it is set before `app` is imported.
+
+    cd backend && python -m pytest -q            # serial
+    cd backend && python -m pytest -q -n auto    # pytest-xdist
+
+Query budgets are strict here (QUERY_BUDGET_STRICT=1). A route that goes over
+its @query_budget fails its test instead of only logging a warning.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+TMP_DIR = tempfile.mkdtemp(prefix=f"healthbite-tests-{WORKER}-")
+DB_PATH = os.path.join(TMP_DIR, "test.db")
+TEMPLATE_PATH = os.path.join(TMP_DIR, "template.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ.setdefault("QUERY_BUDGET_STRICT", "1")
+
+from fastapi.testclient import TestClient
+
+from app import app, prepare_database
+from database import engine
+import cache
+import seed
+
+ADMIN = {"email": "admin@canteen.local", "password": "Admin@123", "role": "ADMIN"}
+PASSWORD = "Test@1234!"
+
+prepare_database()
+seed.seed_db()
+engine.dispose()
+shutil.copyfile(DB_PATH, TEMPLATE_PATH)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _cleanup_tmp_dir():
+    yield
+    engine.dispose()
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def fresh_db():
+    """Put the template back before every test."""
+    engine.dispose()
+    shutil.copyfile(TEMPLATE_PATH, DB_PATH)
+    cache.clear()
+    yield
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def admin(client):
+    r = client.post("/api/auth/login", json=ADMIN)
+    assert r.status_code == 200, r.text
+    return bearer(r.json()["token"])
+
+
+@pytest.fixture
+def register(client):
+    """Factory: register a new USER and return its auth headers."""
+    def make(name="Test User", email=None, password=PASSWORD):
+        email = email or f"user_{uuid.uuid4().hex[:8]}@example.com"
+        r = client.post("/api/auth/register", json={"name": name, "email": email, "password": password, "role": "USER"})
+        assert r.status_code == 200, r.text
+        return bearer(r.json()["token"])
+    return make
+
+
+@pytest.fixture
+def user(register):
+    return register()
+
+
+@pytest.fixture
+def onboarded_user(client, user):
+    """A user who finished all three onboarding steps (diabetic, nut allergy)."""
+    steps = [
+        ("/api/health/step1", {"age": 34, "gender": "Female", "weight_kg": 68, "height_cm": 165,
+                               "dietary_preference": "Non-Veg"}),
+        ("/api/health/step2", {"disease": ["Diabetes"], "severity": {"Diabetes": "Moderate"},
+                               "health_values": {"diabetes": 160}, "allergies": [{"name": "Nuts", "severity": "Severe"}]}),
+        ("/api/health/finalize", None),
+    ]
+    for path, body in steps:
+        r = client.post(path, json=body, headers=user)
+        assert r.status_code == 200, r.text
+    return user
+
+
+@pytest.fixture
+def place_order(client):
+    """Factory: order the given food ids (with repeats) as `headers`; returns the order JSON."""
+    def order(headers, food_ids):
+        menu = {f["id"]: f for f in client.get("/api/menu/intelligent", headers=headers).json()}
+        picks = [menu[i] for i in food_ids]
+        r = client.post("/api/menu/order", headers=headers, json={
+            "items": food_ids,
+            "total_price": sum(p["price"] for p in picks),
+            "total_calories": sum(p["calories"] or 0 for p in picks),
+            "total_sugar": sum(p["sugar"] or 0 for p in picks),
+            "total_sodium": sum(p["sodium"] or 0 for p in picks),
+        })
+        assert r.status_code == 200, r.text
+        return r.json()
+    return order
@@ -0,0 +1,224 @@
+import os
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import rollups
+from database import SessionLocal
+from models import Order, User
+from routes import admin_ai
+
+FOOD = {
+    "name": "Verification Burger", "category": "Lunch", "description": "Testing", "price": 99.99,
+    "calories": 500, "protein": 20, "carbs": 30, "fat": 10, "sugar": 5, "sodium": 100,
+    "dietary_type": "Non-Veg", "image_url": "🍔", "stock": 50, "reorder_level": 10, "available": True,
+}
+
+
+def _audit(client, admin, **filters):
+    return client.get("/api/admin/audit/", headers=admin, params=filters).json()["items"]
+
+
+def test_food_crud(client, admin):
+    r = client.post("/api/admin/foods/", headers=admin, json=FOOD)
+    assert r.status_code == 201
+    food = r.json()
+    assert food["stock"] == 50
+
+    r = client.put(f"/api/admin/foods/{food['id']}", headers=admin, json={"price": 105.0, "stock": 70})
+    assert r.status_code == 200
+    assert r.json()["price"] == 105.0 and r.json()["stock"] == 70
+
+    r = client.patch(f"/api/admin/foods/{food['id']}/availability", headers=admin)
+    assert r.json() == {"id": food["id"], "is_available": False}
+
+    listing = client.get("/api/admin/foods", headers=admin, params={"search": "Verification"}).json()
+    assert [f["id"] for f in listing["items"]] == [food["id"]]
+
+    assert client.delete(f"/api/admin/foods/{food['id']}", headers=admin).status_code == 204
+    assert client.put(f"/api/admin/foods/{food['id']}", headers=admin, json={"price": 1}).status_code == 404
+
+    actions = [a["action_type"] for a in _audit(client, admin, target_table="food_items")]
+    assert actions == ["DELETE", "STATUS_CHANGE", "UPDATE", "CREATE"]
+
+
+def test_food_with_orders_cannot_be_deleted(client, admin, onboarded_user, place_order):
+    food_id = client.get("/api/menu/intelligent", headers=onboarded_user).json()[0]["id"]
+    place_order(onboarded_user, [food_id])
+    assert client.delete(f"/api/admin/foods/{food_id}", headers=admin).status_code == 422
+
+
+def test_inventory_update(client, admin):
+    items = client.get("/api/admin/inventory/", headers=admin).json()["items"]
+    assert items
+    inv_id = items[0]["id"]
+    r = client.put(f"/api/admin/inventory/{inv_id}", headers=admin, json={"current_stock": 150})
+    assert r.status_code == 200
+    assert _audit(client, admin, target_table="inventory")
+    assert client.put("/api/admin/inventory/999999", headers=admin, json={"current_stock": 1}).status_code == 404
+
+
+def test_disable_user(client, admin, register):
+    register(email="dave@example.com")
+    users = client.get("/api/admin/users/", headers=admin, params={"search": "dave"}).json()["items"]
+    uid = users[0]["id"]
+    r = client.patch(f"/api/admin/users/{uid}/status", headers=admin, json={"disabled": 1})
+    assert r.status_code == 200
+    me = client.get("/api/admin/users/", headers=admin, params={"search": "admin@canteen.local"}).json()["items"][0]
+    assert client.patch(f"/api/admin/users/{me['id']}/status", headers=admin,
+                        json={"disabled": 1}).status_code == 400
+
+
+@pytest.mark.parametrize("path", [
+    "/api/admin/overview",
+    "/api/admin/dashboard-stats",
+    "/api/admin/alerts",
+    "/api/admin/analytics/orders-by-hour-today",
+    "/api/admin/analytics/sales?period=7d",
+    "/api/admin/analytics/summary",
+    "/api/admin/analytics/revenue-by-category",
+    "/api/admin/analytics/popular-foods",
+    "/api/admin/analytics/category-heatmap",
+    "/api/admin/analytics/disease-distribution",
+    "/api/admin/analytics/risk-trends",
+    "/api/admin/analytics/peak-hours",
+    "/api/admin/analytics/top-spenders",
+    "/api/admin/analytics/ai-impact",
+    "/api/admin/ai/status",
+    "/api/admin/ai/features",
+    "/api/admin/ai/accuracy-history",
+    "/api/admin/ai/logs",
+    "/api/admin/ai/training-history",
+    "/api/admin/audit/summary",
+    "/api/admin/audit/admins",
+])
+def test_admin_read_endpoints(client, admin, path):
+    assert client.get(path, headers=admin).status_code == 200
+
+
+@pytest.mark.parametrize("path", [
+    "/api/admin/analytics/summary",
+    "/api/admin/analytics/revenue-by-category",
+    "/api/admin/analytics/popular-foods",
+    "/api/admin/analytics/category-heatmap",
+    "/api/admin/analytics/risk-trends",
+    "/api/admin/analytics/peak-hours",
+    "/api/admin/analytics/top-spenders",
+    "/api/admin/analytics/ai-impact",
+])
+def test_analytics_date_range(client, admin, path):
+    assert client.get(path, headers=admin, params={"to": "2024-13-01"}).status_code == 422
+    assert client.get(path, headers=admin, params={"from": "x", "to": "x"}).status_code == 422
+    # The custom-range inputs send empty values until a date is picked
+    assert client.get(path, headers=admin, params={"from": "", "to": ""}).status_code == 200
+    assert client.get(path, headers=admin, params={"from": "2024-01-01", "to": "2024-01-31"}).status_code == 200
+
+
+def test_analytics_summary_changes(client, admin, onboarded_user, register, place_order):
+    food_id = client.get("/api/menu/intelligent", headers=onboarded_user).json()[0]["id"]
+    orders = [place_order(onboarded_user, [food_id]) for _ in range(3)]
+    for email in ("new1@example.com", "new2@example.com", "old@example.com"):
+        register(email=email)
+    with SessionLocal() as db:
+        # Previous window Jan 1-10: one order, one sign-up; current window Jan 11-20: two of each
+        for order, day in zip(orders, ("2026-01-05", "2026-01-15", "2026-01-20")):
+            db.get(Order, order["id"]).created_at = f"{day}T12:00:00"
+        for email, day in (("old@example.com", "2026-01-10"), ("new1@example.com", "2026-01-11"),
+                           ("new2@example.com", "2026-01-20")):
+            db.query(User).filter(User.email == email).one().created_at = f"{day}T23:59:59"
+        db.commit()
+        rollups.rebuild(db)
+        db.commit()
+
+    r = client.get("/api/admin/analytics/summary", headers=admin, params={"from": "2026-01-11", "to": "2026-01-20"})
+    assert r.status_code == 200
+    price = orders[0]["total_price"]
+    assert r.json() == {
+        "revenue": {"value": 2 * price, "change": 100.0},
+        "orders": {"value": 2, "change": 100.0},
+        "avg_order_value": {"value": round(price, 2), "change": 0},
+        "new_users": {"value": 2, "change": 100.0},
+    }
+    # No start date means no previous window to compare with
+    r = client.get("/api/admin/analytics/summary", headers=admin, params={"to": "2026-01-20"})
+    assert {k: v["change"] for k, v in r.json().items()} == dict.fromkeys(r.json(), 0)
+
+
+def test_top_spenders_range(client, admin, onboarded_user, place_order):
+    food_id = client.get("/api/menu/intelligent", headers=onboarded_user).json()[0]["id"]
+    order = place_order(onboarded_user, [food_id])
+    today = date.today()
+
+    def spenders(**params):
+        r = client.get("/api/admin/analytics/top-spenders", headers=admin, params=params)
+        assert r.status_code == 200
+        return r.json()
+
+    assert [s["spent"] for s in spenders()] == [order["total_price"]]
+    assert len(spenders(**{"from": today.isoformat(), "to": today.isoformat()})) == 1
+    assert spenders(**{"to": (today - timedelta(days=1)).isoformat()}) == []
+
+
+def test_profiler_skips_its_own_endpoints(client, admin):
+    r = client.post("/api/admin/performance/profiler", headers=admin, json={"path_prefix": "/api/admin/", "max_requests": 2})
+    assert r.status_code == 200
+    try:
+        # Polling the profiler neither gets traced nor uses up a capture
+        for _ in range(3):
+            assert client.get("/api/admin/performance/profiler", headers=admin).json()["armed"]["remaining"] == 2
+        assert client.get("/api/admin/overview", headers=admin).status_code == 200
+        status = client.get("/api/admin/performance/profiler", headers=admin).json()
+        assert status["armed"]["remaining"] == 1
+        assert [t["path"] for t in status["traces"]] == ["/api/admin/overview"]
+        trace_id = status["traces"][0]["id"]
+        assert client.get(f"/api/admin/performance/profiler/traces/{trace_id}", headers=admin).status_code == 200
+        assert len(client.get("/api/admin/performance/profiler", headers=admin).json()["traces"]) == 1
+    finally:
+        client.delete("/api/admin/performance/profiler", headers=admin, params={"clear": True})
+
+
+def test_memory_endpoints_report_the_worker(client, admin):
+    memory = "/api/admin/performance/memory"
+    try:
+        assert client.post(f"{memory}/start", headers=admin, json={"frames": 1}).json()["pid"] == os.getpid()
+        snapshot = client.post(f"{memory}/snapshots", headers=admin).json()
+        assert snapshot["pid"] == os.getpid()
+        assert client.get(memory, headers=admin).json()["pid"] == os.getpid()
+        assert client.get(f"{memory}/diff", headers=admin, params={"base": snapshot["id"]}).json()["pid"] == os.getpid()
+        r = client.get(f"{memory}/diff", headers=admin, params={"base": snapshot["id"] + 100})
+        assert r.status_code == 404 and str(os.getpid()) in r.json()["detail"]
+    finally:
+        client.post(f"{memory}/stop", headers=admin)
+
+
+def test_sales_export(client, admin, onboarded_user, place_order):
+    food_id = client.get("/api/menu/intelligent", headers=onboarded_user).json()[0]["id"]
+    order = place_order(onboarded_user, [food_id])
+
+    preview = client.get("/api/admin/export/sales/preview", headers=admin)
+    assert preview.status_code == 200
+
+    r = client.get("/api/admin/export/sales", headers=admin)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    lines = r.text.strip().splitlines()
+    assert len(lines) == 2 and lines[1].startswith(str(order["id"]))
+    assert _audit(client, admin, action_type="EXPORT")
+
+
+@pytest.mark.parametrize("report", ["health", "inventory"])
+def test_other_exports(client, admin, report):
+    r = client.get(f"/api/admin/export/{report}", headers=admin)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+
+
+def test_retrain(client, admin, monkeypatch):
+    # The background task simulates training with a 10 s sleep
+    monkeypatch.setattr(admin_ai, "time", SimpleNamespace(sleep=lambda seconds: None))
+    r = client.post("/api/admin/ai/retrain", headers=admin)
+    assert r.status_code == 202
+    assert _audit(client, admin, action_type="RETRAIN")
+    history = client.get("/api/admin/ai/training-history", headers=admin).json()["history"]
+    assert history[0]["id"] == r.json()["training_id"] and history[0]["status"] == "success"
@@ -0,0 +1,43 @@
+from conftest import ADMIN, PASSWORD, bearer
+
+
+def test_admin_login(client):
+    r = client.post("/api/auth/login", json=ADMIN)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["role"] == "ADMIN" and body["token"]
+
+
+def test_login_rejects_bad_password_and_role(client, register):
+    register(email="alice@example.com")
+    assert client.post("/api/auth/login", json={**ADMIN, "password": "nope"}).status_code == 401
+    r = client.post("/api/auth/login", json={"email": "alice@example.com", "password": PASSWORD, "role": "ADMIN"})
+    assert r.status_code == 401
+    assert client.post("/api/auth/login", json={"email": "ghost@example.com", "password": PASSWORD,
+                                               "role": "USER"}).status_code == 401
+
+
+def test_register_then_login(client):
+    r = client.post("/api/auth/register", json={"name": "Bob", "email": "bob@example.com", "password": PASSWORD,
+                                               "role": "USER"})
+    assert r.status_code == 200
+    assert r.json()["profile_completed"] is False
+    r = client.post("/api/auth/login", json={"email": "bob@example.com", "password": PASSWORD, "role": "USER"})
+    assert r.status_code == 200
+    assert r.json()["name"] == "Bob"
+
+
+def test_register_validation(client, register):
+    register(email="carol@example.com")
+    dup = {"name": "Carol", "email": "carol@example.com", "password": PASSWORD, "role": "USER"}
+    assert client.post("/api/auth/register", json=dup).status_code == 400
+    weak = {**dup, "email": "carol2@example.com", "password": "short"}
+    assert client.post("/api/auth/register", json=weak).status_code == 400
+    no_symbol = {**dup, "email": "carol3@example.com", "password": "Password123"}
+    assert client.post("/api/auth/register", json=no_symbol).status_code == 400
+
+
+def test_admin_routes_need_an_admin_token(client, user):
+    assert client.get("/api/admin/overview").status_code == 401
+    assert client.get("/api/admin/overview", headers=bearer("not-a-jwt")).status_code == 401
+    assert client.get("/api/admin/overview", headers=user).status_code == 403
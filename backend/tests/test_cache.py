@@ -0,0 +1,137 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import cache
+import cache_bus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        b = cache.MemoryBackend(max_entries=3)
+    else:
+        b = cache.SQLiteBackend(str(tmp_path / "cache.db"), max_entries=3)
+        monkeypatch.setattr(cache.SQLiteBackend, "TRIM_EVERY", 1)
+    monkeypatch.setattr(cache, "backend", b)
+    return b
+
+
+def test_hit_miss_and_tag_invalidation(backend):
+    calls = []
+
+    @cache.cached("menu")
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9 and square(3) == 9
+    assert square(4) == 16
+    assert calls == [3, 4]
+    cache.invalidate("orders")
+    square(3)
+    assert calls == [3, 4]
+    cache.invalidate("menu")
+    square(3)
+    assert calls == [3, 4, 3]
+    namespace = cache.stats()["namespaces"][f"{__name__}.test_hit_miss_and_tag_invalidation.<locals>.square"]
+    assert namespace == {"hits": 2, "misses": 3, "coalesced": 0, "hit_rate": 0.4}
+
+
+def test_ttl(backend):
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    assert cache.get_or_compute(("ttl",), compute, ttl=0.05) == 1
+    assert cache.get_or_compute(("ttl",), compute, ttl=0.05) == 1
+    time.sleep(0.06)
+    assert cache.get_or_compute(("ttl",), compute, ttl=0.05) == 2
+
+
+def test_size_bound(backend):
+    for i in range(5):
+        cache.get_or_compute(("k", i), lambda: i)
+    assert backend.size() == 3
+    assert backend.evictions == 2
+    # The oldest entries went first
+    assert backend.get(repr(("k", 0))) is cache.MISSING
+    assert backend.get(repr(("k", 4))) == 4
+
+
+def test_invalidation_during_compute_is_not_cached(backend):
+    def compute():
+        cache.invalidate("orders")
+        return "stale"
+
+    cache.get_or_compute(("racy",), compute, tags=("orders",))
+    assert cache.get_or_compute(("racy",), lambda: "fresh", tags=("orders",)) == "fresh"
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    path = str(tmp_path / "shared.db")
+    a, b = cache.SQLiteBackend(path), cache.SQLiteBackend(path)
+    a.set("key", {"v": 1}, ("menu",), a.versions(("menu",)), 60)
+    assert b.get("key") == {"v": 1}
+    b.invalidate(("menu",))
+    assert a.get("key") is cache.MISSING
+
+
+def test_menu_is_invalidated_by_admin_writes(client, admin, user):
+    before = {f["name"] for f in client.get("/api/menu/intelligent", headers=user).json()}
+    r = client.post("/api/admin/foods/", headers=admin, json={"name": "Cache Probe Salad", "category": "Lunch",
+                                                              "price": 50})
+    food_id = r.json()["id"]
+    after = {f["name"] for f in client.get("/api/menu/intelligent", headers=user).json()}
+    assert after - before == {"Cache Probe Salad"}
+
+    client.patch(f"/api/admin/foods/{food_id}/availability", headers=admin)
+    menu = client.get("/api/me/bootstrap", headers=user).json()["menu"]
+    assert "Cache Probe Salad" not in {f["name"] for f in menu}
+
+
+def test_kpis_are_invalidated_by_orders(client, admin, onboarded_user, place_order):
+    assert client.get("/api/admin/overview", headers=admin).json()["orders"]["value"] == 0
+    food_id = client.get("/api/menu/intelligent", headers=onboarded_user).json()[0]["id"]
+    place_order(onboarded_user, [food_id])
+    assert client.get("/api/admin/overview", headers=admin).json()["orders"]["value"] == 1
+
+    report = client.get("/api/admin/performance/cache", headers=admin).json()
+    assert report["namespaces"]["admin/overview"] == {"hits": 0, "misses": 2, "coalesced": 0, "hit_rate": 0.0}
+    assert report["invalidations"]["orders"] >= 1
+    assert "app_cache_requests_total" in client.get("/metrics").text
+
+
+def _publish_from_another_process(path, *tags):
+    code = f"import cache_bus; cache_bus.Bus({path!r}).publish({tags!r})"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_bus_carries_invalidations_between_processes(tmp_path, monkeypatch):
+    path = str(tmp_path / "bus.db")
+    monkeypatch.setattr(cache, "backend", cache.MemoryBackend())
+    monkeypatch.setattr(cache, "bus", cache_bus.Bus(path, interval=0))
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+
+    assert cache.get_or_compute(("bus",), compute, tags=("menu",)) == 1
+    _publish_from_another_process(path, "orders")
+    assert cache.get_or_compute(("bus",), compute, tags=("menu",)) == 1
+    _publish_from_another_process(path, "menu")
+    assert cache.get_or_compute(("bus",), compute, tags=("menu",)) == 2
+    _publish_from_another_process(path, cache_bus.CLEAR)
+    assert cache.get_or_compute(("bus",), compute, tags=("menu",)) == 3
+    assert cache.bus.received == 3
+
+
+def test_bus_skips_own_invalidations_and_waits_for_interval(tmp_path):
+    path = str(tmp_path / "bus.db")
+    bus = cache_bus.Bus(path, interval=60)
+    bus.publish(("menu",))
+    assert bus.poll(force=True) == set()
+    _publish_from_another_process(path, "inventory")
+    assert bus.poll() == set()      # within the interval
+    assert bus.poll(force=True) == {"inventory"}
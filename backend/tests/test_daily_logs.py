@@ -0,0 +1,140 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import text
+
+import daily_logs
+from database import SessionLocal, create_missing_indexes
+from models import DailyLog
+
+DAY = "2026-03-01"
+
+
+def _logs():
+    with SessionLocal() as db:
+        return [(l.user_id, l.date, l.water_intake_ml, l.steps, l.mood) for l in db.query(DailyLog)]
+
+
+def _user_id(client, headers):
+    return client.get("/api/me/bootstrap", headers=headers).json()["status"]["user_id"]
+
+
+def test_concurrent_increments_add_up(client, user):
+    uid = _user_id(client, user)
+
+    def tap(i):
+        # Each writer on its own session and connection, as separate requests would be
+        with SessionLocal() as db:
+            daily_logs.apply_deltas(db, uid, [{"date": DAY, "water_intake_ml": 10, "steps": 0}])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(tap, range(200)))
+
+    assert _logs() == [(uid, DAY, 2000, 0, "Neutral")]
+
+
+def test_concurrent_daily_log_requests(client, user):
+    uid = _user_id(client, user)
+
+    def tap(i):
+        r = client.post("/api/health/daily-log", headers=user, json={"water_intake_ml": 250})
+        assert r.status_code == 200, r.text
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(tap, range(40)))
+
+    assert _logs() == [(uid, daily_logs.today(), 40 * 250, 0, "Neutral")]
+
+
+def test_daily_log_batch(client, user):
+    uid = _user_id(client, user)
+    r = client.post("/api/health/daily-log/batch", headers=user, json={"entries": [
+        {"date": DAY, "water_intake_ml": 250, "steps": 1000},
+        {"date": "2026-03-02", "water_intake_ml": 500},
+        {"date": DAY, "water_intake_ml": 250, "mood": "Happy"},
+    ]})
+    assert r.status_code == 200, r.text
+    # One row per date, in input order
+    assert [(e["date"], e["water_intake_ml"], e["steps"], e["mood"]) for e in r.json()] == [
+        (DAY, 500, 1000, "Happy"), ("2026-03-02", 500, 0, "Neutral"),
+    ]
+
+    # A later tap adds water and keeps the steps and mood it does not set
+    r = client.post("/api/health/daily-log/batch", headers=user, json={"entries": [{"date": DAY, "water_intake_ml": 100}]})
+    assert r.json()[0] | {"id": None} == {"id": None, "user_id": uid, "date": DAY, "water_intake_ml": 600,
+                                          "steps": 1000, "mood": "Happy"}
+
+    assert client.post("/api/health/daily-log/batch", headers=user, json={"entries": []}).status_code == 422
+    for bad in ("2026-13-45", "2026-02-30", "yesterday"):
+        r = client.post("/api/health/daily-log/batch", headers=user, json={"entries": [{"date": bad, "water_intake_ml": 1}]})
+        assert r.status_code == 422, bad
+    assert [row[1] for row in _logs()] == [DAY, "2026-03-02"]
+
+
+def test_merge_duplicates(client, user):
+    uid = _user_id(client, user)
+    with SessionLocal() as db:
+        # Databases from before the unique index can hold several rows per day
+        db.execute(text("DROP INDEX uq_daily_logs_user_date"))
+        db.add_all([
+            DailyLog(user_id=uid, date=DAY, water_intake_ml=250, steps=4000, mood="Tired"),
+            DailyLog(user_id=uid, date=DAY, water_intake_ml=500, steps=1000, mood="Happy"),
+            DailyLog(user_id=uid, date="2026-03-02", water_intake_ml=100, steps=10),
+        ])
+        db.commit()
+        assert daily_logs.merge_duplicates(db) == 1
+
+    assert sorted(_logs()) == [(uid, DAY, 750, 4000, "Happy"), (uid, "2026-03-02", 100, 10, "Neutral")]
+    create_missing_indexes()
+    with SessionLocal() as db:
+        assert daily_logs.merge_duplicates(db) == 0
+
+
+@pytest.mark.parametrize("sample", [
+    {"date": DAY, "steps": True},
+    {"date": DAY, "water_intake_ml": False},
+    {"date": DAY, "steps": 100, "user_id": True},
+    {"date": DAY, "steps": -1},
+    {"date": DAY, "steps": 1.5},
+    {"date": "yesterday", "steps": 100},
+])
+def test_parse_sample_rejects(sample):
+    with pytest.raises(ValueError):
+        daily_logs.parse_sample(sample, 1, any_user=True)
+
+
+def test_parse_sample():
+    assert daily_logs.parse_sample({"timestamp": f"{DAY}T08:00:00", "steps": 100}, 1, any_user=False) == (1, DAY, 0, 100)
+    assert daily_logs.parse_sample({"date": DAY, "user_id": 7, "water_intake_ml": None}, 1, any_user=True) == (7, DAY, 0, 0)
+    with pytest.raises(ValueError):
+        daily_logs.parse_sample({"date": DAY, "user_id": 7}, 1, any_user=False)
+
+
+def test_ingest(client, user):
+    uid = _user_id(client, user)
+    body = "\n".join(json.dumps(s) for s in [
+        {"date": DAY, "steps": 100, "water_intake_ml": 250},
+        {"date": DAY, "steps": 50},
+        {"date": DAY, "steps": True},
+        "not json",
+    ])
+    r = client.post("/api/health/ingest", headers=user, content=body)
+    assert r.status_code == 200, r.text
+    assert {k: r.json()[k] for k in ("samples", "accepted", "rejected", "rows_written")} == {
+        "samples": 4, "accepted": 2, "rejected": 2, "rows_written": 1,
+    }
+    assert _logs() == [(uid, DAY, 250, 150, "Neutral")]
+
+
+@pytest.mark.parametrize("trailing", ["", "\n"])
+def test_ingest_line_too_long(client, user, monkeypatch, trailing):
+    uid = _user_id(client, user)
+    monkeypatch.setattr(daily_logs, "INGEST_FLUSH_KEYS", 2)
+    samples = [json.dumps({"date": f"2026-03-0{d}", "steps": 10}) for d in (1, 2, 3)]
+    long_line = json.dumps({"date": DAY, "note": "x" * daily_logs.INGEST_MAX_LINE_BYTES})
+    r = client.post("/api/health/ingest", headers=user, content="\n".join(samples + [long_line]) + trailing)
+    assert r.status_code == 413
+    # The first two days were flushed before the long line; the third was not
+    assert r.json()["detail"] == {"error": "NDJSON line 4 is too long", "samples_saved": 2, "rows_written": 2}
+    assert sorted(_logs()) == [(uid, "2026-03-01", 0, 10, "Neutral"), (uid, "2026-03-02", 0, 10, "Neutral")]
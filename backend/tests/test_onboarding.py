@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import daily_logs
+
+
+def test_new_user_starts_at_step_zero(client, user):
+    r = client.get("/api/health/check", headers=user)
+    assert r.status_code == 200
+    assert r.json()["has_profile"] is False
+    assert r.json()["onboarding_step"] == 0
+
+
+def test_step2_requires_step1(client, user):
+    r = client.post("/api/health/step2", headers=user, json={"disease": [], "severity": {}, "health_values": {},
+                                                             "allergies": []})
+    assert r.status_code == 400
+    assert client.post("/api/health/finalize", headers=user).status_code == 400
+
+
+def test_onboarding_steps(client, user):
+    r = client.post("/api/health/step1", headers=user, json={"age": 40, "gender": "Male", "weight_kg": 90,
+                                                             "height_cm": 175, "dietary_preference": "Veg"})
+    assert r.status_code == 200
+    assert r.json()["bmi_category"] == "Overweight"
+    assert client.get("/api/health/check", headers=user).json()["onboarding_step"] == 1
+
+    r = client.post("/api/health/step2", headers=user, json={
+        "disease": ["Diabetes", "Hypertension"], "severity": {"Diabetes": "Severe", "Hypertension": "Mild"},
+        "health_values": {"diabetes": 210, "hypertension": "150/95"}, "allergies": [],
+    })
+    assert r.status_code == 200
+
+    r = client.post("/api/health/finalize", headers=user)
+    assert r.status_code == 200
+    assert r.json()["risk_level"] in ("Low", "Moderate", "High")
+    check = client.get("/api/health/check", headers=user).json()
+    assert check["has_profile"] is True and check["onboarding_step"] == 3
+
+    report = client.get("/api/health/report", headers=user)
+    assert report.status_code == 200
+    assert report.json()["disease"] == ["Diabetes", "Hypertension"]
+
+
+def test_bootstrap_after_onboarding(client, onboarded_user):
+    r = client.get("/api/me/bootstrap", headers=onboarded_user)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["menu"], "scored menu should not be empty"
+
+
+def test_bootstrap_dates(client, user, monkeypatch):
+    # Local midnight has passed but UTC midnight hasn't (or the other way round)
+    monkeypatch.setattr(daily_logs, "today", lambda: "2030-01-01")
+    body = client.get("/api/me/bootstrap", headers=user).json()
+    assert body["daily_log"]["date"] == "2030-01-01"
+    assert body["today"]["date"] == datetime.utcnow().date().isoformat()
+
+
+def test_daily_log(client, onboarded_user):
+    for _ in range(2):
+        r = client.post("/api/health/daily-log", headers=onboarded_user, json={"water_intake_ml": 250})
+        assert r.status_code == 200
+    assert r.json()["water_intake_ml"] == 500
@@ -0,0 +1,77 @@
+from database import SessionLocal
+from models import DailySalesRollup, Order, OrderItem, UserDailyNutrition
+
+
+def _menu_ids(client, headers, n=2):
+    return [f["id"] for f in client.get("/api/menu/intelligent", headers=headers).json()[:n]]
+
+
+def test_intelligent_menu_is_scored(client, onboarded_user):
+    r = client.get("/api/menu/intelligent", headers=onboarded_user)
+    assert r.status_code == 200
+    items = r.json()
+    assert items and all({"match_score", "risk_level", "tag"} <= set(i) for i in items)
+
+
+def test_place_order_writes_items_and_rollups(client, onboarded_user, place_order):
+    first, second = _menu_ids(client, onboarded_user)
+    order = place_order(onboarded_user, [first, first, second])
+
+    with SessionLocal() as db:
+        lines = {oi.food_id: oi.qty for oi in db.query(OrderItem).filter(OrderItem.order_id == order["id"])}
+        assert lines == {first: 2, second: 1}
+        totals = db.query(DailySalesRollup).filter(DailySalesRollup.category == "").one()
+        assert totals.orders == 1
+        assert totals.revenue == order["total_price"]
+        nutrition = db.query(UserDailyNutrition).one()
+        assert nutrition.orders == 1
+
+
+def test_order_history_pages(client, onboarded_user, place_order):
+    food = _menu_ids(client, onboarded_user, 1)
+    for _ in range(3):
+        place_order(onboarded_user, food)
+    page = client.get("/api/menu/history", headers=onboarded_user, params={"limit": 2}).json()
+    assert len(page["orders"]) == 2 and page["next_cursor"]
+    rest = client.get("/api/menu/history", headers=onboarded_user,
+                      params={"limit": 2, "cursor": page["next_cursor"]}).json()
+    assert len(rest["orders"]) == 1 and rest["next_cursor"] is None
+
+
+def test_admin_status_change_moves_rollups(client, admin, onboarded_user, place_order):
+    order = place_order(onboarded_user, _menu_ids(client, onboarded_user, 1))
+
+    listing = client.get("/api/admin/orders/", headers=admin).json()
+    assert order["id"] in [o["id"] for o in listing["items"]]
+
+    r = client.patch(f"/api/admin/orders/{order['id']}/status", headers=admin, json={"status": "cancelled"})
+    assert r.status_code == 200
+    with SessionLocal() as db:
+        assert db.get(Order, order["id"]).status == "cancelled"
+        statuses = {r.status: r.orders for r in db.query(DailySalesRollup).filter(DailySalesRollup.category == "")}
+        assert statuses.get("completed", 0) == 0 and statuses["cancelled"] == 1
+        # Cancelled orders leave the user's nutrition totals
+        assert db.query(UserDailyNutrition).one().orders == 0
+
+    # A legacy order with no status was rolled up as completed
+    legacy = place_order(onboarded_user, _menu_ids(client, onboarded_user, 1))
+    with SessionLocal() as db:
+        db.get(Order, legacy["id"]).status = None
+        db.commit()
+    r = client.patch(f"/api/admin/orders/{legacy['id']}/status", headers=admin, json={"status": "pending"})
+    assert r.status_code == 200
+    with SessionLocal() as db:
+        statuses = {r.status: r.orders for r in db.query(DailySalesRollup).filter(DailySalesRollup.category == "")}
+        assert statuses.get("completed", 0) == 0 and statuses["pending"] == 1
+        assert None not in statuses
+
+    assert client.patch(f"/api/admin/orders/{order['id']}/status", headers=admin,
+                        json={"status": "lost"}).status_code == 400
+    assert client.patch("/api/admin/orders/999999/status", headers=admin,
+                        json={"status": "completed"}).status_code == 404
+
+
+def test_chatbot_answers(client, onboarded_user):
+    r = client.post("/api/chatbot/query", headers=onboarded_user, json={"message": "What should I eat for lunch?"})
+    assert r.status_code == 200
+    assert r.json()["text"]
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio.to_thread
+import pytest
+
+import cache
+import singleflight
+
+
+def test_concurrent_callers_share_one_call():
+    group = singleflight.Group()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "value"
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: group.do("key", slow), range(8)))
+    assert calls == [1]
+    assert {value for value, _ in results} == {"value"}
+    assert sum(leader for _, leader in results) == 1
+    assert group.in_flight() == 0
+
+
+def test_exception_reaches_followers():
+    group = singleflight.Group()
+    started = threading.Event()
+
+    def boom():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(group.do, "key", boom)
+        started.wait()
+        follower = pool.submit(group.do, "key", lambda: "unused")
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+    # A failed call is not remembered
+    assert group.do("key", lambda: "retry") == ("retry", True)
+
+
+def test_async_and_threadpool_callers_coalesce():
+    group = singleflight.Group()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return 42
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        async_calls = [group.do_async("key", slow) for _ in range(5)]
+        sync_calls = [loop.run_in_executor(None, group.do, "key", slow) for _ in range(5)]
+        return await asyncio.gather(*async_calls, *sync_calls)
+
+    results = asyncio.run(main())
+    assert calls == [1]
+    assert [value for value, _ in results] == [42] * 10
+
+
+def test_sync_followers_cannot_starve_an_async_leader():
+    group = singleflight.Group()
+    calls = []
+    inside, go = threading.Barrier(3), threading.Event()
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    def sync_handler():
+        # Already on a worker thread, as a sync endpoint is, when it reaches the key
+        inside.wait()
+        go.wait()
+        return group.do("key", slow)
+
+    async def main():
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 2
+        followers = [asyncio.ensure_future(anyio.to_thread.run_sync(sync_handler)) for _ in range(2)]
+        await asyncio.get_running_loop().run_in_executor(None, inside.wait)
+        # Every threadpool token is taken when the async caller arrives
+        leader = asyncio.ensure_future(group.do_async("key", slow))
+        await asyncio.sleep(0.05)
+        go.set()
+        return await asyncio.gather(leader, *followers)
+
+    # A deadlock would also block the loop's shutdown; keep it off the test thread
+    results = []
+    runner = threading.Thread(target=lambda: results.extend(asyncio.run(main())), daemon=True)
+    runner.start()
+    runner.join(timeout=10)
+    assert not runner.is_alive(), "async leader starved by its sync followers"
+    assert [value for value, _ in results] == [42] * 3
+    assert 1 <= len(calls) <= 2 and group.in_flight() == 0
+
+
+def test_cache_misses_are_coalesced(monkeypatch):
+    monkeypatch.setattr(cache, "backend", cache.MemoryBackend())
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "report"
+
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(lambda _: cache.get_or_compute(("coalesce",), compute), range(6)))
+    assert results == ["report"] * 6 and calls == [1]
+    namespace = cache.stats()["namespaces"]["coalesce"]
+    assert namespace["misses"] == 1 and namespace["coalesced"] == 5
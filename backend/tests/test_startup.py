@@ -0,0 +1,30 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import asyncio, os, sys
+import app as app_module
+assert "fastapi" not in sys.modules and "database" not in sys.modules, "import did work"
+application = app_module.create_app()
+assert not os.path.exists(DB), "create_app() touched the database"
+
+async def startup():
+    async with application.router.lifespan_context(application):
+        pass
+
+asyncio.run(startup())
+"""
+
+
+def test_import_and_create_app_have_no_side_effects(tmp_path):
+    db = str(tmp_path / "fresh.db")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db}", LOG_LEVEL="WARNING")
+    env.pop("WARMUP", None)
+    subprocess.run([sys.executable, "-c", f"DB = {db!r}\n" + CHILD], cwd=ROOT, env=env, check=True)
+    # The startup hook created the schema
+    tables = {row[0] for row in sqlite3.connect(db).execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert {"users", "food_items", "orders"} <= tables
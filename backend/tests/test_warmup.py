@@ -0,0 +1,9 @@
+import cache
+import warmup
+
+
+def test_warmup_runs_every_step_and_fills_the_cache(client):
+    timings = warmup.run()
+    assert set(timings) == {name for name, _ in warmup.STEPS}
+    assert None not in timings.values()
+    assert cache.stats()["entries"] >= 3     # menu, default scored menu, overview
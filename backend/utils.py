@@ -1,11 +1,14 @@
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 from pydantic import EmailStr
 from typing import List
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Email Configuration
 # You must set these environment variables or replace them with your actual credentials
 conf = ConnectionConfig(
@@ -52,8 +55,8 @@ async def send_reset_email(email: str, token: str):
     fm = FastMail(conf)
     try:
         await fm.send_message(message)
-        print(f"Email sent successfully to {email}")
+        logger.info("password reset email sent", extra={"recipient": email})
         return True
     except Exception as e:
-        print(f"Error sending email: {e}")
+        logger.exception("password reset email failed", extra={"recipient": email})
         return False
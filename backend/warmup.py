@@ -0,0 +1,79 @@
+"""Startup warm-up: pay the first-request costs before a worker takes traffic.
+
+A fresh worker would otherwise make the first diners of the lunch rush wait:
+
+- The connection pool is empty.
+- The menu and the default scored menu are not cached.
+- The dashboard KPIs are not computed.
+- The password hasher has not been initialised.
+
+run() does all of that once, in the app's startup hook. The server reports
+a worker ready only after startup finishes, so warm-up happens before the
+worker is put into rotation, both under uvicorn's supervisor and under
+gunicorn. serve.py sets WARMUP=1; plain `python app.py` and the tests skip it.
+
+Each step is timed and logged. A failing step is logged and skipped: a cold
+worker is better than one that never starts.
+"""
+import contextlib
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("WARMUP", "0") == "1"
+POOL_CONNECTIONS = 5    # the default SQLAlchemy pool_size
+
+
+def _pool():
+    from database import engine
+    from sqlalchemy import text
+
+    with contextlib.ExitStack() as stack:
+        for _ in range(POOL_CONNECTIONS):
+            stack.enter_context(engine.connect()).execute(text("SELECT 1"))
+
+
+def _menu():
+    import menu
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        menu.available_menu(db)
+        menu.scored_menu(db, menu.scoring_profile(None))
+
+
+def _dashboard():
+    from database import SessionLocal
+    from routes import admin_dashboard
+
+    with SessionLocal() as db:
+        admin_dashboard.overview(db=db, admin=None)
+        admin_dashboard.get_alerts(db=db, admin=None)
+
+
+def _auth():
+    from auth import pwd_context
+
+    pwd_context.verify("warmup", pwd_context.hash("warmup"))
+
+
+STEPS = (("pool", _pool), ("menu", _menu), ("dashboard", _dashboard), ("auth", _auth))
+
+
+def run():
+    """Run every step; returns {step: seconds} (None for a step that failed)."""
+    timings = {}
+    started = time.perf_counter()
+    for name, step in STEPS:
+        t0 = time.perf_counter()
+        try:
+            step()
+            timings[name] = round(time.perf_counter() - t0, 4)
+        except Exception:
+            logger.exception("warm-up step %s failed", name)
+            timings[name] = None
+    logger.info("worker %d warmed up in %.3fs", os.getpid(), time.perf_counter() - started,
+                extra={"warmup": timings})
+    return timings
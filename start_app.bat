@@ -7,7 +7,7 @@ echo.
 echo [1/2] Starting Backend Server...
 cd /d "%~dp0"
 :: Start the backend in a new minimized window so it stays running
-start /min cmd /k "cd backend && python app.py"
+start /min cmd /k "cd backend && python serve.py"
 
 echo Backend is launching in the background...
 echo.